@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-from app.database import get_db
+from app.database import engine, get_db, get_pool_metrics
 from app.models.exam import ExamType, ExamSection, ExamQuestion, PracticeExam
 from app.models.user import User
 from app.models.subject import Subject, Topic
@@ -16,10 +16,21 @@ from app.schemas.admin import (
     CourseTopic, CourseTopicCreate, CourseTopicUpdate
 )
 from app.schemas.exam import ExamSectionCreate, ExamSectionUpdate
-from app.core.auth_deps import get_current_user, require_admin_access
+from app.core.auth_deps import get_current_user, require_admin_access, invalidate_user_principal
+from app.core.exam_config import exam_config
 from app.agents.exam_agent import ExamAgent
+from app.agents.registry import agent_registry, get_exam_agent
+from app.utils.cache import get_cache_stats
+from app.services.question_pool_service import question_pool_service
+from app.services.http_client import http_client
+from app.services.job_queue import job_queue
+from app.services.intent_router import intent_router
+from app.services.performance_rollup_service import performance_rollup_service
+from app.utils.index_advisor import index_advisor
+from app.utils.async_bridge import async_bridge
+from app.services.question_dedup_index import question_dedup_index
 from datetime import datetime, timedelta
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, text
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -144,11 +155,11 @@ async def get_practice_exams(
 async def create_practice_exam_admin(
     exam_data: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_access)
+    current_user: User = Depends(require_admin_access),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Admin için deneme sınavı oluştur"""
     from app.schemas.exam import PracticeExamCreate
-    from app.agents.exam_agent import ExamAgent
     
     # Gerekli alanları kontrol et
     required_fields = ['exam_section_id', 'user_id', 'name']
@@ -166,8 +177,6 @@ async def create_practice_exam_admin(
         exam_section_id=exam_data['exam_section_id']
     )
     
-    # ExamAgent kullanarak sınav oluştur
-    exam_agent = ExamAgent()
     try:
         practice_exam = exam_agent.create_practice_exam(
             db=db,
@@ -198,13 +207,10 @@ async def create_practice_exam_admin(
 async def get_practice_exam_questions_admin(
     exam_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_access)
+    current_user: User = Depends(require_admin_access),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Admin için sınav sorularını getir (doğru cevaplarla birlikte)"""
-    from app.agents.exam_agent import ExamAgent
-    
-    exam_agent = ExamAgent()
-    
     try:
         # Admin için doğru cevapları da dahil et
         questions = exam_agent.get_practice_exam_questions_with_answers(db, exam_id)
@@ -225,6 +231,7 @@ async def delete_question(
     
     question.is_active = False
     db.commit()
+    question_dedup_index.remove([question_id])
     
     return {"message": "Soru başarıyla silindi"}
 
@@ -241,6 +248,7 @@ async def toggle_user_status(
     
     user.is_active = not user.is_active
     db.commit()
+    invalidate_user_principal(user_id)
     
     return {
         "message": f"Kullanıcı durumu {'aktif' if user.is_active else 'pasif'} yapıldı",
@@ -256,15 +264,14 @@ async def get_system_health(
     """Sistem sağlık durumu"""
     try:
         # Database bağlantı testi
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         db_status = "healthy"
     except Exception:
         db_status = "unhealthy"
     
-    # ExamAgent testi
+    # Sınav konfigürasyonu testi (önbellekteki snapshot, disk okuması yok)
     try:
-        agent = ExamAgent()
-        agent_counts = agent.get_exam_question_counts()
+        agent_counts = exam_config.snapshot().question_counts
         agent_status = "healthy" if agent_counts else "unhealthy"
     except Exception:
         agent_status = "unhealthy"
@@ -273,9 +280,126 @@ async def get_system_health(
         "timestamp": datetime.now(),
         "database": db_status,
         "exam_agent": agent_status,
+        "database_pool": get_pool_metrics(),
         "overall_status": "healthy" if db_status == "healthy" and agent_status == "healthy" else "unhealthy"
     }
 
+@router.get("/cache-stats")
+async def get_cache_statistics(
+    current_user: User = Depends(require_admin_access)
+):
+    """Process içi cache'lerin hit/miss istatistikleri"""
+    return {
+        "timestamp": datetime.now(),
+        "caches": get_cache_stats(),
+        "http_client": http_client.stats(),
+        "agents": agent_registry.stats(),
+        "async_bridge": async_bridge.stats()
+    }
+
+@router.get("/intent-router")
+async def get_intent_router_stats(
+    current_user: User = Depends(require_admin_access)
+):
+    """Genel sorgu yönlendirici: yerel karar oranı (hit_rate) ve LLM'e düşen sorgular"""
+    return {
+        "timestamp": datetime.now(),
+        "router": intent_router.stats()
+    }
+
+@router.get("/index-advisor")
+async def get_index_advisor_report(
+    limit: int = Query(20, ge=1, le=200),
+    reset: bool = False,
+    current_user: User = Depends(require_admin_access)
+):
+    """Yavaş SQL ifadeleri ve mevcut index'lerle karşılanmayan kolonlar (eksik index adayları)"""
+    report = index_advisor.report(engine, limit=limit)
+    if reset:
+        index_advisor.reset()
+    return {
+        "timestamp": datetime.now(),
+        "enabled": index_advisor.enabled,
+        **report
+    }
+
+@router.get("/question-dedup")
+async def get_question_dedup_stats(
+    current_user: User = Depends(require_admin_access)
+):
+    """Yakın-kopya soru indeksi: indekslenen bölüm/soru sayısı ve reddedilen adaylar"""
+    return {
+        "timestamp": datetime.now(),
+        "index": question_dedup_index.stats()
+    }
+
+@router.post("/question-dedup/{section_id}/rebuild")
+async def rebuild_question_dedup_section(
+    section_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin_access)
+):
+    """Bölümün yakın-kopya indeksini veritabanındaki aktif sorulardan yeniden kur"""
+    question_dedup_index.drop_section(section_id)
+    question_dedup_index.ensure_section(db, section_id)
+    return {
+        "timestamp": datetime.now(),
+        "section_id": section_id,
+        "index": question_dedup_index.stats()
+    }
+
+@router.get("/question-pool")
+async def get_question_pool_status(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin_access)
+):
+    """Bölüm bazlı soru havuzu hedef/stok durumu"""
+    return {
+        "timestamp": datetime.now(),
+        "pool": question_pool_service.stats(),
+        "sections": question_pool_service.get_status(db)
+    }
+
+@router.post("/question-pool/refill")
+async def trigger_question_pool_refill(
+    current_user: User = Depends(require_admin_access)
+):
+    """Havuz doldurucuyu hemen çalıştır"""
+    if not question_pool_service.enabled:
+        raise HTTPException(status_code=400, detail="Soru havuzu devre dışı")
+    question_pool_service.wake()
+    return {"message": "Soru havuzu doldurma tetiklendi", "pool": question_pool_service.stats()}
+
+@router.post("/performance-rollups/rebuild")
+async def rebuild_performance_rollups(
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin_access)
+):
+    """Dashboard günlük özetlerini ham analizlerden yeniden hesapla (tüm kullanıcılar ya da biri)"""
+    result = performance_rollup_service.rebuild(db, user_id=user_id)
+    return {"message": "Performans özetleri yeniden oluşturuldu", **result}
+
+@router.get("/jobs")
+async def get_job_queue_status(
+    current_user: User = Depends(require_admin_access)
+):
+    """Arka plan iş kuyruğu (sınav analizi vb.) durumu"""
+    return {
+        "timestamp": datetime.now(),
+        "jobs": job_queue.stats()
+    }
+
+@router.post("/jobs/{job_id}/retry")
+async def retry_failed_job(
+    job_id: int,
+    current_user: User = Depends(require_admin_access)
+):
+    """Kalıcı olarak başarısız olmuş işi tekrar kuyruğa al"""
+    if not job_queue.retry(job_id):
+        raise HTTPException(status_code=404, detail="Başarısız iş bulunamadı")
+    return {"message": "İş tekrar kuyruğa alındı", "job_id": job_id}
+
 # ============ USER MANAGEMENT ENDPOINTS ============
 
 @router.post("/users", response_model=UserAdmin)
@@ -344,6 +468,7 @@ async def update_user(
     
     db.commit()
     db.refresh(db_user)
+    invalidate_user_principal(user_id)
     
     return UserAdmin(
         id=db_user.id,
@@ -370,6 +495,7 @@ async def delete_user(
     
     db.delete(db_user)
     db.commit()
+    invalidate_user_principal(user_id)
     
     return {"message": "User deleted successfully"}
 
@@ -386,6 +512,7 @@ async def activate_user(
     
     db_user.is_active = True
     db.commit()
+    invalidate_user_principal(user_id)
     
     return {"message": "User activated successfully"}
 
@@ -405,6 +532,7 @@ async def deactivate_user(
     
     db_user.is_active = False
     db.commit()
+    invalidate_user_principal(user_id)
     
     return {"message": "User deactivated successfully"}
 
@@ -421,6 +549,7 @@ async def make_admin(
     
     db_user.is_admin = True
     db.commit()
+    invalidate_user_principal(user_id)
     
     return {"message": "User made admin successfully"}
 
@@ -440,6 +569,7 @@ async def remove_admin(
     
     db_user.is_admin = False
     db.commit()
+    invalidate_user_principal(user_id)
     
     return {"message": "Admin rights removed successfully"}
 
@@ -735,12 +865,15 @@ async def delete_exam_type(
     
     # İlgili bölümleri ve soruları da sil
     sections = db.query(ExamSection).filter(ExamSection.exam_type_id == exam_type_id).all()
+    section_ids = [section.id for section in sections]
     for section in sections:
         db.query(ExamQuestion).filter(ExamQuestion.exam_section_id == section.id).delete()
     
     db.query(ExamSection).filter(ExamSection.exam_type_id == exam_type_id).delete()
     db.delete(db_exam_type)
     db.commit()
+    for section_id in section_ids:
+        question_dedup_index.drop_section(section_id)
     
     return {"message": "Exam type deleted successfully"}
 
@@ -1092,6 +1225,7 @@ async def delete_exam_section_admin(
     db.query(ExamQuestion).filter(
         ExamQuestion.exam_section_id == section_id
     ).update({"is_active": False})
+    question_dedup_index.drop_section(section_id)
     
     # İlgili practice examları kontrol et
     practice_exams_count = db.query(PracticeExam).filter(
@@ -1115,11 +1249,10 @@ async def delete_exam_section_admin(
 async def delete_practice_exam_admin(
     exam_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_access)
+    current_user: User = Depends(require_admin_access),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Deneme sınavını sil (Admin)"""
-    from app.agents.exam_agent import ExamAgent
-    exam_agent = ExamAgent()
     success = exam_agent.delete_practice_exam(db, exam_id, user_id=None, admin_delete=True)
     if not success:
         raise HTTPException(status_code=404, detail="Sınav bulunamadı")
@@ -1129,11 +1262,10 @@ async def update_practice_exam_status_admin(
     exam_id: int,
     status_data: dict,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_access)
+    current_user: User = Depends(require_admin_access),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Sınav durumunu güncelle (Admin)"""
-    from app.agents.exam_agent import ExamAgent
-    exam_agent = ExamAgent()
     new_status = status_data.get("status")
     if not new_status:
         raise HTTPException(status_code=400, detail="Status gerekli")
@@ -1147,11 +1279,10 @@ async def update_practice_exam_status_admin(
 @router.get("/system-exam-statistics", response_model=Dict[str, Any])
 async def get_admin_exam_statistics(
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin_access)
+    current_user: User = Depends(require_admin_access),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Tüm sistem sınav istatistiklerini al (Admin)"""
-    from app.agents.exam_agent import ExamAgent
-    exam_agent = ExamAgent()
     return exam_agent.get_exam_statistics(db, user_id=None)
 
 @router.get("/exam-system-config")
@@ -1159,12 +1290,11 @@ async def get_exam_system_config(
     current_user: User = Depends(require_admin_access)
 ):
     """Exam system konfigürasyonunu al (JSON'dan)"""
-    from app.agents.exam_agent import ExamAgent
-    exam_agent = ExamAgent()
     
     # JSON konfigürasyonlarını al
-    question_counts = exam_agent.get_exam_question_counts()
-    distribution_data = exam_agent.get_subject_question_distribution_data()
+    snapshot = exam_config.snapshot()
+    question_counts = snapshot.question_counts_dict()
+    distribution_data = snapshot.distributions_dict()
     
     # Exam sections listesi oluştur
     exam_sections = []
@@ -1186,5 +1316,14 @@ async def get_exam_system_config(
         "exam_types": list(question_counts.keys()),
         "exam_sections": exam_sections,
         "question_counts": question_counts,
-        "subject_distributions": distribution_data
+        "subject_distributions": distribution_data,
+        "config_store": exam_config.stats()
     }
+
+@router.post("/exam-system-config/reload")
+async def reload_exam_system_config(
+    current_user: User = Depends(require_admin_access)
+):
+    """data/*.json dosyalarını beklemeden yeniden yükle (mtime kontrolünü atlar)"""
+    exam_config.reload(force=True)
+    return {"message": "Sınav konfigürasyonu yeniden yüklendi", **exam_config.stats()}
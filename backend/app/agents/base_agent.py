@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 from langchain_google_genai import ChatGoogleGenerativeAI
 from app.core.config import settings
+from app.services.llm_cache import get_llm_cache
 
 class BaseAgent(ChatGoogleGenerativeAI):
     """Base class for all agents in the system - extends ChatGoogleGenerativeAI"""
@@ -13,7 +14,8 @@ class BaseAgent(ChatGoogleGenerativeAI):
             google_api_key=settings.GEMINI_API_KEY,
             temperature=0.0,
             **kwargs,
-            cache=False
+            # Opt-in yanıt cache'i (LLM_CACHE_ENABLED + agent için TTL tanımlıysa)
+            cache=get_llm_cache(name) or False
         )
         # Store agent metadata separately (not as Pydantic fields)
         self._agent_name = name
@@ -32,6 +34,16 @@ class BaseAgent(ChatGoogleGenerativeAI):
         """Return the underlying LLM (self). Useful for LangChain pipelines."""
         return self
     
+    def with_temperature(self, temperature: float) -> "BaseAgent":
+        """Return a shallow copy with a different temperature.
+        
+        Agents are shared across requests, so per-call settings must not be
+        assigned on ``self``; the copy reuses the same underlying client.
+        """
+        if temperature == self.temperature:
+            return self
+        return self.model_copy(update={"temperature": temperature})
+    
     @abstractmethod
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process the input and return results"""
@@ -2,16 +2,27 @@ from typing import Dict, Any, List
 
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
-from langchain_tavily import TavilySearch
 
 from app.agents.base_agent import BaseAgent
 from app.models.book_recommendation import BookRecommendationList
 from app.models.book_recommendation import StockStatus, BookRecommendation
+from app.services.search_executor import get_tavily_executor
+from app.services.http_client import http_client
+from app.services.recommendation_history_service import recommendation_history_service
+from app.database import AsyncSessionLocal
+from app.core.config import settings
+from app.utils.cache import MISSING, TTLCache
 
-import aiohttp
 from bs4 import BeautifulSoup
 import asyncio
 
+# URL -> (in_stock, confidence); aynı kitaplar tekrar önerildiğinde ağ isteği yapılmaz
+_stock_cache = TTLCache(
+    maxsize=settings.BOOK_STOCK_CACHE_SIZE,
+    ttl=settings.BOOK_STOCK_CACHE_TTL_SECONDS,
+    name="book_stock",
+)
+
 
 class BookAgent(BaseAgent):
     """Agent responsible for recommending books based on weak topics using Tavily search"""
@@ -21,20 +32,12 @@ class BookAgent(BaseAgent):
             name="Book Agent",
             description="Recommends relevant Turkish educational books using Tavily web search"
         )
-        # Tavily search tool – ensure API key is supplied
-        from app.core.config import settings
+        # Tavily search – paylaşılan async yürütücü (cache + rate limit); API key yoksa mock mod
+        self._search_executor = get_tavily_executor()
+        self._api_key_available = self._search_executor is not None
 
-        self._api_key_available = bool(settings.TAVILY_API_KEY)
-        
-        if self._api_key_available:
-            self._search_tool = TavilySearch(
-                max_results=35,  # Daha fazla sonuç al
-                topic="general",
-                tavily_api_key=settings.TAVILY_API_KEY,
-            )
-        else:
+        if not self._api_key_available:
             print("⚠️ TAVILY_API_KEY bulunamadı. BookAgent mock modda çalışacak.")
-            self._search_tool = None
 
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Return book recommendations structured as BookRecommendationList.
@@ -47,6 +50,7 @@ class BookAgent(BaseAgent):
         weak_topics: List[str] = input_data.get("weak_topics", [])
         custom_query: str | None = input_data.get("search_query")
         education_level: str = input_data.get("education_level", "lise")
+        user_id = input_data.get("user_id")
 
         try:
             # API key yoksa mock data döndür
@@ -87,23 +91,12 @@ class BookAgent(BaseAgent):
                 search_queries.append(f"{main_topic} kurs kitabı Trendyol")
 
             # -----------------------------
-            # 2. Execute multiple Tavily searches and combine results
+            # 2. Execute Tavily searches concurrently and combine results
             # -----------------------------
-            all_search_results = []
-            used_queries = []
-            
-            for query in search_queries[:6]:  # Maksimum 6 farklı arama
-                try:
-                    tavily_response = self._search_tool.invoke({"query": query})
-                    search_results = tavily_response.get("results", [])
-                    all_search_results.extend(search_results)
-                    used_queries.append(query)
-                    
-                    # Rate limiting için kısa bekleme
-                    await asyncio.sleep(0.5)
-                except Exception as e:
-                    print(f"Search failed for query '{query}': {e}")
-                    continue
+            used_queries = search_queries[:6]  # Maksimum 6 farklı arama
+            results_by_query = await self._search_executor.search_many(used_queries)
+            used_queries = [q for q in used_queries if q in results_by_query]
+            all_search_results = [item for q in used_queries for item in results_by_query[q]]
 
             # Remove duplicates based on URL
             seen_urls = set()
@@ -120,6 +113,13 @@ class BookAgent(BaseAgent):
                 if ("-p-" in item.get("url", "") or "/pd/" in item.get("url", ""))
             ]
             
+            # Kullanıcıya daha önce önerilmiş kitapları ele (indeksli tek sorgu + küme üyeliği)
+            if user_id:
+                seen_books = await self._get_recommended_book_ids(user_id)
+                trendy_results, _skipped = recommendation_history_service.filter_new(
+                    "book", trendy_results, seen_books, url_key="url"
+                )
+
             if len(trendy_results) > 8:
                 trendy_results = trendy_results[:8]  # En fazla 8 kitap
             
@@ -186,7 +186,7 @@ class BookAgent(BaseAgent):
                     {
                         "education_level": education_level,
                         "weak_topics": ", ".join(weak_topics) if weak_topics else "Genel",
-                        "query": query,
+                        "query": " | ".join(used_queries),
                         "search_results": formatted_results,
                     }
                 )
@@ -214,8 +214,8 @@ class BookAgent(BaseAgent):
                     "agent": "Book Agent",
                     "data": {
                         "recommendations": [],
-                        "search_query": query,
-                        "total_found": len(search_results),
+                        "search_query": " | ".join(used_queries),
+                        "total_found": len(trendy_results),
                         "note": "Structured parse failed; please refine your query.",
                     },
                 }
@@ -227,26 +227,54 @@ class BookAgent(BaseAgent):
                 "error": str(e),
             }
 
+    async def _get_recommended_book_ids(self, user_id) -> set:
+        try:
+            async with AsyncSessionLocal() as db:
+                return await recommendation_history_service.get_recommended_ids_async(db, int(user_id), "book")
+        except Exception as e:
+            print(f"⚠️ Book recommendation history unavailable: {e}")
+            return set()
+
+    def _get_mock_book_recommendations(self, weak_topics: List[str], education_level: str) -> Dict[str, Any]:
+        """API key olmadan boş ama geçerli bir yanıt döndür"""
+        return {
+            "status": "success",
+            "agent": "Book Agent",
+            "data": {
+                "recommendations": [],
+                "search_query": "",
+                "search_summary": "Kitap araması yapılandırılmadı (TAVILY_API_KEY eksik).",
+                "total_found": 0,
+                "mock": True,
+            },
+        }
+
     # -------------------------------------------------
     # Helper: Stock checking
     # -------------------------------------------------
     async def _update_stock_info(self, recs: List[BookRecommendation]) -> List[BookRecommendation]:
         async def _check(rec: BookRecommendation) -> BookRecommendation:
-            try:
-                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
-                    async with session.get(str(rec.url), headers={"User-Agent": "Mozilla/5.0"}) as resp:
-                        html = await resp.text()
-                        in_stock, conf = self._parse_stock(html)
-                        rec.stock_status = StockStatus.AVAILABLE if in_stock else StockStatus.OUT_OF_STOCK
-                        rec.stock_confidence = conf
-                        rec.availability_note = (
-                            "Stokta mevcut" if in_stock else "Ürün muhtemelen tükenmiş"
-                        )
-            except Exception:
-                # On error mark as CHECK_REQUIRED
-                rec.stock_status = StockStatus.CHECK_REQUIRED
-                rec.stock_confidence = 3
-                rec.availability_note = "Stok durumu doğrulanamadı, manuel kontrol önerilir"
+            url = str(rec.url)
+            cached = _stock_cache.get(url)
+            if cached is MISSING:
+                try:
+                    html = await http_client.fetch_text(url, max_bytes=settings.BOOK_STOCK_MAX_BYTES)
+                    # lxml ayrıştırması CPU-bound; event loop'u bloklamasın
+                    cached = await asyncio.to_thread(self._parse_stock, html)
+                    _stock_cache.set(url, cached)
+                except Exception:
+                    # On error mark as CHECK_REQUIRED (cache'lenmez, bir sonraki istekte tekrar denenir)
+                    rec.stock_status = StockStatus.CHECK_REQUIRED
+                    rec.stock_confidence = 3
+                    rec.availability_note = "Stok durumu doğrulanamadı, manuel kontrol önerilir"
+                    return rec
+
+            in_stock, conf = cached
+            rec.stock_status = StockStatus.AVAILABLE if in_stock else StockStatus.OUT_OF_STOCK
+            rec.stock_confidence = conf
+            rec.availability_note = (
+                "Stokta mevcut" if in_stock else "Ürün muhtemelen tükenmiş"
+            )
             return rec
 
         return await asyncio.gather(*[_check(r) for r in recs])
@@ -5,15 +5,16 @@ from app.models.exam import ExamType, ExamSection, ExamQuestion, PracticeExam, P
 from app.models.education_level import CourseTopic, Course
 from app.schemas.exam import PracticeExamCreate, PracticeExamResult
 from app.agents.base_agent import BaseAgent
+from app.core.exam_config import exam_config, DEFAULT_QUESTION_COUNT
+from app.utils.async_bridge import async_bridge
 from app.services.memory_service import memory_service
+from app.services.question_dedup_index import question_dedup_index
+from app.services.question_pool_service import question_pool_service
+from app.services.question_sampler import question_sampler
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 import random
-import json
-import os
-import asyncio
-import concurrent.futures
 from datetime import datetime, timedelta
 
 # Pydantic Models for AI Question Generation
@@ -34,46 +35,6 @@ class ExamQuestionGenerationResponse(BaseModel):
     exam_type: str = Field(description="Sınav tipi")
     questions: List[AIGeneratedExamQuestion] = Field(description="Üretilen sorular")
 
-# JSON dosyalarını okuma fonksiyonları
-def load_json_data(filename: str) -> Dict:
-    """JSON dosyasından verileri yükle"""
-    try:
-        # exam_agent.py dosyasının bulunduğu klasörü bul
-        current_file = os.path.abspath(__file__)
-        current_dir = os.path.dirname(current_file)
-        # app/agents -> app -> app/data
-        app_dir = os.path.dirname(current_dir)
-        data_dir = os.path.join(app_dir, "data")
-        file_path = os.path.join(data_dir, filename)
-        
-        print(f"📁 JSON dosyası okunuyor: {file_path}")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            print(f"✅ JSON dosyası başarıyla okundu: {filename} ({len(data)} keys)")
-            return data
-    except FileNotFoundError:
-        print(f"⚠️  JSON dosyası bulunamadı: {file_path}")
-        return {}
-    except json.JSONDecodeError as e:
-        print(f"⚠️  JSON format hatası: {filename} - {e}")
-        return {}
-    except Exception as e:
-        print(f"⚠️  JSON okuma hatası: {filename} - {e}")
-        return {}
-
-def get_exam_question_counts() -> Dict:
-    """Sabit soru sayıları konfigürasyonunu yükle"""
-    return load_json_data("exam_question_counts.json")
-
-def get_subject_question_distribution() -> Dict:
-    """Konu bazlı soru dağılımı konfigürasyonunu yükle"""
-    return load_json_data("subject_question_distribution.json")
-
-def get_ai_prompts() -> Dict:
-    """AI prompt talimatlarını yükle"""
-    return load_json_data("ai_prompts.json")
-
 class ExamAgent(BaseAgent):
     """Sınav yönetimi ve soru üretimi için AI destekli agent"""
     
@@ -84,16 +45,16 @@ class ExamAgent(BaseAgent):
         )
     
     def get_exam_question_counts(self) -> Dict:
-        """Sabit soru sayıları konfigürasyonunu al"""
-        return get_exam_question_counts()
+        """Sabit soru sayıları konfigürasyonunu al (önbellekteki snapshot'tan kopya)"""
+        return exam_config.snapshot().question_counts_dict()
     
     def get_subject_question_distribution_data(self) -> Dict:
-        """Konu bazlı soru dağılımı konfigürasyonunu al"""
-        return get_subject_question_distribution()
+        """Konu bazlı soru dağılımı konfigürasyonunu al (önbellekteki snapshot'tan kopya)"""
+        return exam_config.snapshot().distributions_dict()
     
     def get_ai_prompts_data(self) -> Dict:
-        """AI prompt talimatlarını al"""
-        return get_ai_prompts()
+        """AI prompt talimatlarını al (önbellekteki snapshot'tan kopya)"""
+        return exam_config.snapshot().prompts_dict()
     """Sınav yönetimi ve soru üretimi için AI destekli agent"""
     
     def __init__(self):
@@ -101,6 +62,8 @@ class ExamAgent(BaseAgent):
             name="ExamAgent",
             description="AI destekli sınav yönetimi ve soru üretimi agent"
         )
+        # Konfigürasyonu şimdi yükle; sınav oluşturma sırasında disk okuması olmasın
+        exam_config.snapshot()
         
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """BaseAgent abstract metodunu implement et"""
@@ -125,41 +88,19 @@ class ExamAgent(BaseAgent):
         else:
             print(f"🎯 {exam_type_name} {section.name} için belirtilen soru sayısı: {count}")
         
-        import asyncio
-        
-        try:
-            # Mevcut event loop'u kontrol et
-            loop = asyncio.get_running_loop()
-            # Eğer zaten bir loop çalışıyorsa, task olarak çalıştır
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(self._sync_generate_questions, db, exam_section_id, count)
-                return future.result()
-        except RuntimeError:
-            # Hiç event loop çalışmıyorsa, yeni bir tane oluştur
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(self.generate_ai_questions_async(db, exam_section_id, count))
-            finally:
-                loop.close()
+        return self._sync_generate_questions(db, exam_section_id, count)
     
     def _sync_generate_questions(self, db: Session, exam_section_id: int, count: int = 10) -> List[ExamQuestion]:
-        """Sync wrapper for async question generation"""
-        import asyncio
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(self.generate_ai_questions_async(db, exam_section_id, count))
-        finally:
-            loop.close()
+        """Sync wrapper for async question generation - paylaşılan arka plan loop'unda çalışır"""
+        return async_bridge.run(self.generate_ai_questions_async(db, exam_section_id, count))
 
     async def generate_ai_questions_async(self, db: Session, exam_section_id: int, count: int = 10) -> List[ExamQuestion]:
         """Bölüm için AI destekli soru üret - Top-off ile tam sayıyı garanti et.
 
         Davranış:
         - İlk AI çağrısı eksik dönerse (ör. 36/40), eksik kadar ek üretim yapılır.
-        - Duplikasyon kontrolü yapılır; deduplikasyon sonrası eksik varsa tekrar üstüne üretim yapılır.
+        - Yakın-kopya kontrolü (MinHash/LSH) bölümün tüm soru bankasına ve bu turda kabul
+          edilenlere karşı yapılır; eleme sonrası eksik varsa tekrar üstüne üretim yapılır.
         - Maksimum güvenli deneme sayısı uygulanır.
         """
         # Bölümü bul
@@ -176,7 +117,7 @@ class ExamAgent(BaseAgent):
 
         # Biriktirilecek ham AI soruları (DB'ye yazmadan önce)
         accumulated = []
-        seen_texts = set()
+        dedup = question_dedup_index.batch(db, exam_section_id)
 
         max_attempts = 6  # ilk deneme + en fazla 5 top-off
         attempt = 0
@@ -195,14 +136,13 @@ class ExamAgent(BaseAgent):
                 attempt += 1
                 continue
 
-            # Gelenleri dedup ederek biriktir
+            # Gelenleri yakın-kopya kontrolünden geçirerek biriktir
             added_this_round = 0
             for ai_q in ai_resp.questions:
                 q_text = ai_q.question.strip() if hasattr(ai_q, "question") and ai_q.question else ""
-                if not q_text or q_text in seen_texts:
+                if not q_text or not dedup.accept(q_text):
                     continue
                 accumulated.append(ai_q)
-                seen_texts.add(q_text)
                 added_this_round += 1
                 if len(accumulated) == target_count:
                     break
@@ -243,6 +183,7 @@ class ExamAgent(BaseAgent):
             generated_questions.append(question)
 
         db.commit()
+        question_dedup_index.add_questions(generated_questions)
         print(f"🎯 Nihai üretilen soru sayısı: {len(generated_questions)} (hedef: {target_count})")
         return generated_questions
 
@@ -279,15 +220,13 @@ class ExamAgent(BaseAgent):
                 db=db, exam_section_id=exam_section_id
             )
             
-            # Birleştir ve duplikasyon kontrolü
+            # Birleştir ve parçalar arası yakın-kopya kontrolü (banka kontrolü çağıranda yapılır)
             all_questions = part1.questions[:]
-            seen_questions = {q.question.strip().lower() for q in part1.questions}
+            dedup = question_dedup_index.batch().seed(q.question for q in part1.questions)
             
             for q in part2.questions:
-                q_text = q.question.strip().lower()
-                if q_text not in seen_questions:
+                if dedup.accept(q.question):
                     all_questions.append(q)
-                    seen_questions.add(q_text)
                 else:
                     print(f"⚠️ Duplikasyon önlendi: {q.question[:50]}...")
             
@@ -417,11 +356,9 @@ class ExamAgent(BaseAgent):
             ("human", human_msg),
         ])
 
-        # Temperature'ı sabit değerde tut - Çeşitlilik için yeterli
-        original_temp = self.temperature
-        # Sabit yüksek temperature - çeşitlilik için
-        self.temperature = 0.3  # Sabit değer
-        print(f"🌡️ Temperature ayarlandı: {self.temperature}")
+        # Sabit yüksek temperature - çeşitlilik için (agent paylaşıldığı için kopya üzerinde)
+        llm = self.with_temperature(0.3)
+        print(f"🌡️ Temperature ayarlandı: {llm.temperature}")
 
         # Yardımcı: LLM metninden JSON'ı çıkar
         def _extract_json(text: str) -> str:
@@ -522,7 +459,7 @@ class ExamAgent(BaseAgent):
             payload["questions"] = fixed
             return payload
 
-        chain = prompt | self.llm
+        chain = prompt | llm
 
         import json as _json
 
@@ -634,7 +571,7 @@ class ExamAgent(BaseAgent):
         for attempt in range(max_retries):
             try:
                 # Temperature sabit kalsın - artırmaya gerek yok
-                print(f"🔄 AI soru üretimi denemesi {attempt + 1}/{max_retries} (temp: {self.temperature})")
+                print(f"🔄 AI soru üretimi denemesi {attempt + 1}/{max_retries} (temp: {llm.temperature})")
                 raw_text_msg = await chain.ainvoke({})  # ham metin veya mesaj
 
                 raw_text = raw_text_msg.content if hasattr(raw_text_msg, "content") else str(raw_text_msg)
@@ -700,9 +637,6 @@ class ExamAgent(BaseAgent):
                 # Sonraki denemeye geç
                 continue
 
-        # Son durumda temperature'ı garanti geri al
-        self.temperature = original_temp
-        
         # Eğer hiçbir deneme başarılı olmadıysa fallback soru üretimi
         print(f"🚨 Tüm AI denemeleri başarısız! Fallback soru üretimi devreye giriyor...")
         fallback_questions = self._generate_fallback_questions(section_name, exam_type, count)
@@ -717,32 +651,21 @@ class ExamAgent(BaseAgent):
         
         raise ValueError(f"AI soru üretimi ve fallback sistemi başarısız oldu: {last_error or 'bilinmeyen hata'}")
 
-    def _get_existing_question_texts(self, db, exam_section_id: int) -> List[str]:
-        """Mevcut soruların çeşitliliği artırmak için detaylı analiz"""
+    def _get_existing_question_texts(self, db, exam_section_id: int, limit: int = 5) -> List[str]:
+        """Prompt'a örnek olarak eklenecek en yeni birkaç soru başlangıcı.
+
+        Bankanın tamamına karşı kopya kontrolü ``question_dedup_index`` ile üretim sonrası
+        yapılır; prompt bağlamı bu yüzden banka büyüdükçe büyümez.
+        """
         if not db or not exam_section_id:
             return []
         
         try:
-            from app.models.exam import ExamQuestion
-            questions = db.query(ExamQuestion).filter(
+            rows = db.query(ExamQuestion.question_text).filter(
                 ExamQuestion.exam_section_id == exam_section_id,
                 ExamQuestion.is_active == True
-            ).limit(50).all()  # Daha fazla soru al - 50'ye çıkar
-            
-            # Sadece soru başlangıçları değil, anahtar kelimeler de topla
-            existing_data = []
-            for q in questions:
-                if q.question_text:
-                    # İlk 50 karakter
-                    existing_data.append(q.question_text[:50])
-                    
-                    # Önemli anahtar kelimeleri çıkar
-                    words = q.question_text.lower().split()
-                    key_words = [w for w in words if len(w) > 4 and w not in ['sorusu', 'aşağıda', 'hangisi', 'şekil', 'grafik']]
-                    existing_data.extend(key_words[:3])  # İlk 3 anahtar kelimeyi ekle
-                    
-            print(f"📊 Çeşitlilik kontrolü: {len(questions)} mevcut soru, {len(existing_data)} karşılaştırma verisi")
-            return existing_data
+            ).order_by(ExamQuestion.id.desc()).limit(limit).all()
+            return [text[:50] for (text,) in rows if text]
         except Exception as e:
             print(f"⚠️ Mevcut sorular alınamadı: {e}")
             return []
@@ -750,43 +673,12 @@ class ExamAgent(BaseAgent):
     def get_topic_distribution(self, exam_type: str, section_name: str, total_count: int) -> Dict:
         """Belirtilen bölüm için konu dağılımını al ve toplamı tam olarak total_count yap.
 
-        Yöntem:
-        - Oranları hesapla (float).
-        - Aşağı doğru taban (floor) ile ilk atama yap.
-        - Kalan (remainder) kadar en büyük küsuratlılara +1 dağıt (largest remainder).
+        Dağılım önbellekteki snapshot'tan okunur; ölçekleme (largest remainder)
+        ``SectionDistribution.allocate`` içindedir.
         """
-        distribution_data = self.get_subject_question_distribution_data()
-        if exam_type in distribution_data and section_name in distribution_data[exam_type]:
-            distribution = distribution_data[exam_type][section_name]
-
-            original_total = max(1, int(distribution.get("total_questions", total_count)))
-            ratio = float(total_count) / float(original_total)
-
-            # İlk geçiş: taban atama ve küsuratları tut
-            tmp = []
-            floor_sum = 0
-            for topic_name, topic_info in distribution["topics"].items():
-                raw = (topic_info["question_count"] * ratio)
-                base = int(raw)  # floor
-                frac = raw - base
-                # En az 0 olsun; +1 dağıtımı sonra yapacağız
-                tmp.append((topic_name, base, frac, topic_info["subtopics"]))
-                floor_sum += base
-
-            # Kalanı hesapla
-            remainder = total_count - floor_sum
-            # En büyük küsuratlıları seç
-            tmp.sort(key=lambda x: x[2], reverse=True)
-
-            adjusted_topics = {}
-            for idx, (topic_name, base, _frac, subtopics) in enumerate(tmp):
-                add = 1 if idx < remainder else 0
-                adjusted_topics[topic_name] = {
-                    "question_count": base + add,
-                    "subtopics": subtopics
-                }
-
-            return {"topics": adjusted_topics, "total_questions": total_count}
+        distribution = exam_config.snapshot().distribution(exam_type, section_name)
+        if distribution is not None:
+            return distribution.allocate(total_count)
 
         # Varsayılan dağılım (tek grup)
         return {
@@ -817,12 +709,12 @@ class ExamAgent(BaseAgent):
             
             prompt_parts.append("")
         
-        # AI prompt talimatlarını JSON'dan al
-        ai_prompts = self.get_ai_prompts_data()
-        if exam_type in ai_prompts and section_name in ai_prompts[exam_type]:
+        # AI prompt talimatlarını konfigürasyondan al
+        instructions = exam_config.snapshot().prompt(exam_type, section_name)
+        if instructions:
             prompt_parts.extend([
                 "🔍 ÖZEL TALİMATLAR:",
-                f"• {ai_prompts[exam_type][section_name]}",
+                f"• {instructions}",
                 ""
             ])
         
@@ -862,6 +754,35 @@ class ExamAgent(BaseAgent):
                 print(f"♻️  Kullanıcının mevcut sınavı bulundu: {existing_user_exam.name} (ID: {existing_user_exam.id})")
                 return existing_user_exam
         
+        # Soru havuzu açıksa soruları stoktan çek; öğrenci AI üretimini beklemez
+        if question_pool_service.enabled:
+            pooled_questions = question_pool_service.draw_questions(
+                db, exam_data.exam_section_id, question_count, user_id=user_id
+            )
+            if pooled_questions is not None:
+                if force_new:
+                    exam_name = f"{exam_type.name} {exam_section.name} Denemesi - {datetime.now().strftime('%H:%M:%S')}"
+                else:
+                    exam_name = f"{exam_type.name} {exam_section.name} Denemesi"
+                practice_exam = PracticeExam(
+                    name=exam_name,
+                    exam_type_id=exam_section.exam_type_id,
+                    exam_section_id=exam_data.exam_section_id,
+                    user_id=user_id,
+                    total_questions=len(pooled_questions),
+                    duration_minutes=exam_type.duration_minutes or 60,
+                    status="not_started",
+                    start_time=datetime.utcnow()
+                )
+                db.add(practice_exam)
+                db.flush()
+                self._link_exam_questions(db, practice_exam.id, pooled_questions)
+                db.commit()
+                db.refresh(practice_exam)
+                print(f"📦 Havuzdan {len(pooled_questions)} soru çekildi - exam ID: {practice_exam.id}")
+                return practice_exam
+            print("⚠️  Soru havuzu yetersiz, senkron AI üretimine düşülüyor")
+        
         # Force_new mantığını değiştir: Her zaman yeni AI soruları üret
         available_count = db.query(ExamQuestion).filter(
             ExamQuestion.exam_section_id == exam_data.exam_section_id,
@@ -894,18 +815,7 @@ class ExamAgent(BaseAgent):
             print(f"🎯 Force_new: YENİ exam oluşturuldu - ID: {practice_exam.id}, İsim: {unique_name}")
             
             # ✨ YENİ: Bu exam için kullanılacak soruların ID'lerini kaydet
-            # PracticeQuestionResult tablosunu kullanarak exam-soru ilişkisini kuralım
-            for question in questions:
-                # Her soru için boş bir result kaydı oluştur (henüz cevap verilmemiş)
-                question_result = PracticeQuestionResult(
-                    practice_exam_id=practice_exam.id,
-                    question_id=question.id,
-                    user_answer=None,  # Henüz cevaplanmamış
-                    is_correct=None,   # Henüz değerlendirilmemiş
-                    time_spent_seconds=0
-                )
-                db.add(question_result)
-            
+            self._link_exam_questions(db, practice_exam.id, questions)
             db.commit()
             print(f"🔗 Force_new: {len(questions)} soru exam ile ilişkilendirildi")
             return practice_exam
@@ -950,22 +860,23 @@ class ExamAgent(BaseAgent):
         
         return practice_exam
 
+    def _link_exam_questions(self, db: Session, practice_exam_id: int, questions: List[ExamQuestion]) -> None:
+        """Exam-soru ilişkisini boş PracticeQuestionResult kayıtlarıyla kur (henüz cevaplanmamış)"""
+        for question in questions:
+            db.add(PracticeQuestionResult(
+                practice_exam_id=practice_exam_id,
+                question_id=question.id,
+                user_answer=None,  # Henüz cevaplanmamış
+                is_correct=None,   # Henüz değerlendirilmemiş
+                time_spent_seconds=0
+            ))
+
     def get_fixed_question_count(self, exam_type_name: str, section_name: str, db: Session = None) -> int:
         """Exam türü ve bölüme göre sabit soru sayısını döndür - Veritabanından"""
         if db is None:
-            # Fallback: JSON'dan al
-            question_counts = self.get_exam_question_counts()
-            if exam_type_name in question_counts:
-                section_counts = question_counts[exam_type_name]
-                # Tam eşleşme ara
-                if section_name in section_counts:
-                    return section_counts[section_name]
-                
-                # Kısmi eşleşme ara
-                for key, count in section_counts.items():
-                    if section_name.lower() in key.lower() or key.lower() in section_name.lower():
-                        return count
-            return 20  # Varsayılan soru sayısı
+            # Fallback: JSON konfigürasyonundan al (tam, yoksa kısmi eşleşme)
+            count = exam_config.snapshot().question_count(exam_type_name, section_name)
+            return count if count is not None else DEFAULT_QUESTION_COUNT
         
         # Veritabanından al
         try:
@@ -1042,84 +953,73 @@ class ExamAgent(BaseAgent):
                 ExamType.id == exam_section.exam_type_id
             ).first()
         
-        # Soruları al - 🔥 Force_new için exam-specific sorular önce
-        exam_question_results = db.query(PracticeQuestionResult).filter(
-            PracticeQuestionResult.practice_exam_id == exam_id
-        ).all()
+        # Exam'e bağlı soru kayıtları (havuz/force_new placeholder'ları) - tek sorgu
+        linked_results = {
+            question_id: result_id
+            for result_id, question_id in db.query(
+                PracticeQuestionResult.id, PracticeQuestionResult.question_id
+            ).filter(PracticeQuestionResult.practice_exam_id == exam_id).all()
+        }
         
-        if exam_question_results:
-            # Exam ile ilişkilendirilmiş özel soruları kullan (force_new mantığı)
-            question_ids = [qr.question_id for qr in exam_question_results]
-            questions = db.query(ExamQuestion).filter(
-                ExamQuestion.id.in_(question_ids),
+        question_query = db.query(ExamQuestion)
+        if linked_results:
+            questions = question_query.filter(
+                ExamQuestion.id.in_(list(linked_results)),
                 ExamQuestion.is_active == True
             ).order_by(ExamQuestion.id.asc()).all()
-            print(f"🎯 Submit: Exam {exam_id} ile ilişkilendirilmiş {len(questions)} özel soru kullanıldı")
         else:
             # Fallback: exam_section_id'den sorular al (eski mantık)
-            questions = db.query(ExamQuestion).filter(
+            questions = question_query.filter(
                 ExamQuestion.exam_section_id == practice_exam.exam_section_id,
                 ExamQuestion.is_active == True
             ).limit(practice_exam.total_questions).all()
-            print(f"🔄 Submit: Exam {exam_id} için fallback - genel havuzdan {len(questions)} soru kullanıldı")
         
-        # Cevapları değerlendir ve sonuçları kaydet
+        # Cevap anahtarıyla karşılaştır - boş cevaplar None olarak normalize edilir
+        normalized_answers = {
+            str(question_id): str(answer).strip().upper()
+            for question_id, answer in answers.items()
+            if answer is not None and str(answer).strip() != ""
+        }
+        
         total_questions = len(questions)
         correct_count = 0
         answered_count = 0
-        wrong_topics = []
+        result_updates = []
+        result_inserts = []
         
         for question in questions:
-            # user_answer yoksa boş kabul edilir
-            user_answer = answers.get(str(question.id))
-            print(f"   Question {question.id}: correct={question.correct_answer}, user={user_answer}")
+            user_answer = normalized_answers.get(str(question.id))
+            is_correct = user_answer is not None and user_answer == str(question.correct_answer).strip().upper()
             
-            if user_answer is not None and str(user_answer).strip() != "":
+            if user_answer is not None:
                 answered_count += 1
-                is_correct = (str(user_answer).strip().upper() == str(question.correct_answer).strip().upper())
-                print(f"      -> Answered: {user_answer}, Correct: {is_correct}")
-            else:
-                is_correct = False  # boş soruların is_correct False tutulur
-                print(f"      -> Empty answer")
-
             if is_correct:
                 correct_count += 1
+            
+            row = {
+                "question_id": question.id,
+                "user_answer": user_answer,
+                "is_correct": is_correct,
+                "time_spent_seconds": 0  # Şimdilik 0, gelecekte timer eklenebilir
+            }
+            if question.id in linked_results:
+                result_updates.append({"id": linked_results[question.id], **row})
             else:
-                # Yanlış cevap veya boş cevap için topic bilgisini topla
-                if question.topic_id:
-                    try:
-                        topic = db.query(CourseTopic).filter(CourseTopic.id == question.topic_id).first()
-                        if topic:
-                            wrong_topics.append(topic.name)
-                            print(f"      -> Wrong topic added: {topic.name}")
-                    except Exception as e:
-                        print(f"      -> Topic query error: {e}")
-                        
-            # Her soru için sonuç kaydet
-            question_result = PracticeQuestionResult(
-                practice_exam_id=exam_id,
-                question_id=question.id,
-                user_answer=(str(user_answer).strip().upper() if user_answer is not None and str(user_answer).strip() != "" else None),
-                is_correct=is_correct,
-                time_spent_seconds=0  # Şimdilik 0, gelecekte timer eklenebilir
-            )
-            db.add(question_result)
+                result_inserts.append({"practice_exam_id": exam_id, **row})
+        
+        # Sonuçları toplu yaz: placeholder'ları güncelle, eksikleri ekle
+        if result_updates:
+            db.bulk_update_mappings(PracticeQuestionResult, result_updates)
+        if result_inserts:
+            db.bulk_insert_mappings(PracticeQuestionResult, result_inserts)
         
         empty_count = max(0, total_questions - answered_count)
         wrong_count = max(0, answered_count - correct_count)
         
-        print(f"🔍 Final Results:")
-        print(f"   - Total Questions: {total_questions}")
-        print(f"   - Answered: {answered_count}")
-        print(f"   - Correct: {correct_count}")
-        print(f"   - Wrong: {wrong_count}")
-        print(f"   - Empty: {empty_count}")
-        print(f"   - Questions examined: {[q.id for q in questions]}")
-        print(f"   - Answers keys: {list(answers.keys())}")
+        print(f"🔍 Submit sonuç: exam={exam_id} toplam={total_questions} doğru={correct_count} yanlış={wrong_count} boş={empty_count}")
         
         # Practice exam'ı güncelle
         score_percentage = (correct_count / total_questions) * 100 if total_questions > 0 else 0
-        print(f"   - Score: {score_percentage}%")
         practice_exam.correct_answers = correct_count
         practice_exam.wrong_answers = wrong_count
         practice_exam.empty_answers = empty_count
@@ -1129,50 +1029,8 @@ class ExamAgent(BaseAgent):
         
         db.commit()
         
-        # 🧠 Memory'e sınav sonucunu kaydet
-        try:
-            asyncio.create_task(self._store_exam_memory(
-                user_id=str(user_id),
-                exam_data={
-                    "exam_id": exam_id,
-                    "exam_type": exam_type.name if exam_type else "Bilinmiyor",
-                    "exam_section": exam_section.name if exam_section else "Bilinmiyor",
-                    "score": score_percentage,
-                    "correct_answers": correct_count,
-                    "total_questions": total_questions,
-                    "wrong_topics": list(set(wrong_topics)),
-                    "accuracy": score_percentage,
-                    "timestamp": practice_exam.end_time.isoformat() if practice_exam.end_time else datetime.utcnow().isoformat()
-                }
-            ))
-        except Exception as e:
-            print(f"⚠️ Memory kaydı sırasında hata: {e}")
-            # Memory hatası sınav sonucunu etkilemesin
-        
-        # 🔍 Analiz agentını çağır - yanlış cevaplar için topic analizi
-        try:
-            analysis_result = asyncio.create_task(self._trigger_analysis_agent(
-                user_id=user_id,
-                exam_data={
-                    "exam_id": exam_id,
-                    "exam_type": exam_type.name if exam_type else "Bilinmiyor",
-                    "exam_section": exam_section.name if exam_section else "Bilinmiyor",
-                    "score": score_percentage,
-                    "correct_answers": correct_count,
-                    "total_questions": total_questions,
-                    "wrong_answers": wrong_count,
-                    "empty_answers": empty_count,
-                    "wrong_topics": list(set(wrong_topics)),
-                    "detailed_answers": self._collect_detailed_answers(questions, answers),
-                    "questions_with_topics": self._get_questions_with_topics(db, questions)
-                },
-                subject=exam_section.name if exam_section else "Genel",
-                topic=exam_type.name if exam_type else "Deneme Sınavı"
-            ))
-            print(f"✅ Analiz agenti tetiklendi")
-        except Exception as e:
-            print(f"⚠️ Analiz agenti tetikleme hatası: {e}")
-            # Analiz hatası sınav sonucunu etkilemesin
+        # Memory kaydı ve AI analizi sınav başına bir kez job_queue üzerinden çalışır
+        # (bkz. exam_analysis_service.enqueue_exam_analysis)
  
         # Sonuç döndür
         return {
@@ -1256,51 +1114,34 @@ class ExamAgent(BaseAgent):
         exam_type = db.query(ExamType).filter(ExamType.id == exam_section.exam_type_id).first()
         question_count = self.get_fixed_question_count(exam_type.name, exam_section.name, db)
         
-        # Soruları getir
-        if force_new:
-            # Force_new ise o exam ile ilişkilendirilmiş soruları kullan
-            exam_question_results = db.query(PracticeQuestionResult).filter(
-                PracticeQuestionResult.practice_exam_id == practice_exam.id
-            ).all()
-            
-            if exam_question_results:
-                # Exam ile ilişkilendirilmiş soruları al
-                question_ids = [qr.question_id for qr in exam_question_results]
-                questions = db.query(ExamQuestion).filter(
-                    ExamQuestion.id.in_(question_ids),
-                    ExamQuestion.is_active == True
-                ).all()
-                print(f"🎯 Force_new: Exam ile ilişkilendirilmiş {len(questions)} soru kullanılıyor")
-            else:
-                # Fallback: En son üretilen AI sorularını kullan
-                from sqlalchemy import text
-                questions = db.query(ExamQuestion).filter(
-                    ExamQuestion.exam_section_id == exam_data.exam_section_id,  
-                    ExamQuestion.is_active == True,
-                    ExamQuestion.created_by == "AI_EXAM_AGENT"
-                ).order_by(ExamQuestion.id.desc()).limit(question_count).all()
-                print(f"🚀 Force_new: Fallback - En son üretilen {len(questions)} AI sorusu kullanılıyor")
-        elif not use_existing:
-            # Yeni oluşturulan exam için rastgele sorular getir
-            from sqlalchemy import text
-            questions = db.query(ExamQuestion).filter(
-                ExamQuestion.exam_section_id == exam_data.exam_section_id,  
-                ExamQuestion.is_active == True
-            ).order_by(text("RANDOM()")).limit(question_count).all()
-        else:
-            # Mevcut examlardan geliyorsa, rastgele sorular al (status bağımsız, soru havuzundan)
-            from sqlalchemy import text
-            questions = db.query(ExamQuestion).filter(
-                ExamQuestion.exam_section_id == exam_data.exam_section_id,
-                ExamQuestion.is_active == True
-            ).order_by(text("RANDOM()")).limit(question_count).all()
+        # Soruları getir - havuzdan çekilen ya da force_new ile üretilen sorular exam'e bağlıdır
+        exam_question_results = db.query(PracticeQuestionResult).filter(
+            PracticeQuestionResult.practice_exam_id == practice_exam.id
+        ).all()
         
-        # Eğer yeterli soru yoksa, tümünü al
-        if len(questions) < question_count:
+        if exam_question_results:
+            question_ids = [qr.question_id for qr in exam_question_results]
             questions = db.query(ExamQuestion).filter(
-                ExamQuestion.exam_section_id == exam_data.exam_section_id,
+                ExamQuestion.id.in_(question_ids),
                 ExamQuestion.is_active == True
-            ).limit(question_count).all()
+            ).order_by(ExamQuestion.id.asc()).all()
+            print(f"🎯 Exam ile ilişkilendirilmiş {len(questions)} soru kullanılıyor")
+        elif force_new:
+            # Fallback: En son üretilen AI sorularını kullan
+            questions = db.query(ExamQuestion).filter(
+                ExamQuestion.exam_section_id == exam_data.exam_section_id,  
+                ExamQuestion.is_active == True,
+                ExamQuestion.created_by == "AI_EXAM_AGENT"
+            ).order_by(ExamQuestion.id.desc()).limit(question_count).all()
+            print(f"🚀 Force_new: Fallback - En son üretilen {len(questions)} AI sorusu kullanılıyor")
+        else:
+            # Havuzdan katmanlı rastgele seçim; seçilen sorular exam'e bağlanır ki
+            # submit ve sonuç ekranları aynı soruları görsün
+            questions = question_sampler.sample(
+                db, exam_data.exam_section_id, question_count, stratify=True
+            )
+            if questions:
+                self._link_exam_questions(db, practice_exam.id, questions)
         
         question_data = []
         for i, q in enumerate(questions):
@@ -1949,51 +1790,6 @@ class ExamAgent(BaseAgent):
         
         return result
 
-    async def _store_exam_memory(self, user_id: str, exam_data: Dict[str, Any]) -> None:
-        """
-        Sınav sonucunu kullanıcı memory'sine kaydet
-        """
-        try:
-            # Sınav session verilerini hazırla
-            session_data = {
-                "subject": exam_data.get("exam_type", "Genel"),
-                "topic": exam_data.get("exam_section", "Deneme Sınavı"), 
-                "education_level": "lise",  # Default olarak lise
-                "total_questions": exam_data.get("total_questions", 0),
-                "correct_answers": exam_data.get("correct_answers", 0),
-                "accuracy": exam_data.get("accuracy", 0),
-                "wrong_answers": exam_data.get("wrong_topics", []),
-                "difficult_topics": exam_data.get("wrong_topics", []),
-                "timestamp": exam_data.get("timestamp"),
-                "session_type": "exam_completion",
-                "exam_id": exam_data.get("exam_id")
-            }
-            
-            # Memory service'e kaydet
-            await memory_service.store_learning_session(user_id, session_data)
-            
-            # Eğer performans düşükse zayıflık analizi de kaydet
-            if exam_data.get("accuracy", 0) < 60:
-                analysis_data = {
-                    "subject": exam_data.get("exam_type", "Genel"),
-                    "topic": exam_data.get("exam_section", "Deneme Sınavı"),
-                    "weakness_level": max(1, 10 - int(exam_data.get("accuracy", 0) / 10)),
-                    "weak_topics": exam_data.get("wrong_topics", []),
-                    "strong_topics": [],  # Güçlü konular analizi gelecekte eklenebilir
-                    "recommendations": [
-                        f"{topic} konusunu tekrar çalış" for topic in exam_data.get("wrong_topics", [])
-                    ],
-                    "detailed_analysis": f"Deneme sınavında %{exam_data.get('accuracy', 0):.1f} başarı elde edildi. Geliştirilmesi gereken alanlar var.",
-                    "timestamp": exam_data.get("timestamp")
-                }
-                await memory_service.store_weakness_analysis(user_id, analysis_data)
-            
-            print(f"✅ Sınav sonucu memory'e kaydedildi - User: {user_id}, Score: {exam_data.get('accuracy', 0)}%")
-            
-        except Exception as e:
-            print(f"❌ Memory kaydetme hatası: {e}")
-            # Memory hatası ana işlemi etkilemesin
-
     def generate_exam_structure(self, db: Session, education_level: str) -> Dict[str, Any]:
         """Eğitim seviyesine göre sınav yapısını oluştur"""
         
@@ -2227,81 +2023,3 @@ class ExamAgent(BaseAgent):
         except Exception as e:
             print(f"⚠️ Topic ID bulunamadı: {topic_name} - {e}")
             return None
-    
-    async def _trigger_analysis_agent(self, user_id: int, exam_data: Dict, subject: str, topic: str) -> Dict:
-        """Analiz agentını tetikle"""
-        try:
-            from app.agents.analysis_agent import AnalysisAgent
-            
-            analysis_agent = AnalysisAgent()
-            
-            input_data = {
-                "user_id": str(user_id),
-                "subject": subject,
-                "topic": topic,
-                "education_level": "lise",  # Varsayılan
-                "performance_data": {
-                    "totalQuestions": exam_data.get("total_questions", 0),
-                    "correctAnswers": exam_data.get("correct_answers", 0),
-                    "wrongAnswers": exam_data.get("wrong_answers", 0),
-                    "emptyAnswers": exam_data.get("empty_answers", 0),
-                    "accuracy": exam_data.get("score", 0),
-                    "wrongTopics": exam_data.get("wrong_topics", []),
-                    "detailedAnswers": exam_data.get("detailed_answers", ""),
-                    "questionsWithTopics": exam_data.get("questions_with_topics", [])
-                }
-            }
-            
-            result = await analysis_agent.process(input_data)
-            print(f"🎯 Analiz agenti sonucu: {result.get('status', 'unknown')}")
-            return result
-            
-        except Exception as e:
-            print(f"⚠️ Analiz agenti çağırma hatası: {e}")
-            return {"status": "error", "error": str(e)}
-    
-    def _collect_detailed_answers(self, questions: List, answers: Dict) -> str:
-        """Detaylı cevap analizi için metin oluştur"""
-        try:
-            details = []
-            for question in questions:
-                user_answer = answers.get(str(question.id))
-                is_correct = (
-                    user_answer is not None and 
-                    str(user_answer).strip().upper() == str(question.correct_answer).strip().upper()
-                ) if user_answer else False
-                
-                status = "Doğru" if is_correct else ("Yanlış" if user_answer else "Boş")
-                
-                details.append(
-                    f"Soru {question.id}: {status} "
-                    f"(Kullanıcı: {user_answer or 'Boş'}, Doğru: {question.correct_answer})"
-                )
-            
-            return "\n".join(details)
-        except Exception as e:
-            return f"Detaylı cevap analizi hatası: {e}"
-    
-    def _get_questions_with_topics(self, db: Session, questions: List) -> List[Dict]:
-        """Soruları topic bilgileriyle birlikte döndür"""
-        try:
-            result = []
-            for question in questions:
-                topic_name = "Bilinmiyor"
-                if question.topic_id:
-                    topic = db.query(CourseTopic).filter(CourseTopic.id == question.topic_id).first()
-                    if topic:
-                        topic_name = topic.name
-                
-                result.append({
-                    "question_id": question.id,
-                    "topic_name": topic_name,
-                    "topic_id": question.topic_id,
-                    "difficulty": question.difficulty_level,
-                    "question_text": question.question_text[:100] + "..." if len(question.question_text) > 100 else question.question_text
-                })
-            
-            return result
-        except Exception as e:
-            print(f"⚠️ Topic bilgisi toplama hatası: {e}")
-            return []
@@ -1,9 +1,14 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 from app.agents.base_agent import BaseAgent
 from app.agents.question_agent import QuestionAgent
 from app.agents.analysis_agent import AnalysisAgent
 from app.agents.youtube_agent import YouTubeAgent
 from app.agents.book_agent import BookAgent
+from app.agents.pipeline import AgentPipeline
+from app.core.config import settings
+from app.services.intent_router import intent_router
+from app.services.llm_cache import bypass_llm_cache
+from app.services.llm_stream import stream_agent_events, single_result
 from langchain.prompts import ChatPromptTemplate
 from enum import Enum
 
@@ -17,17 +22,23 @@ class AgentAction(Enum):
 class MasterAgent(BaseAgent):
     """Master orchestrator agent that coordinates all other agents"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        question_agent: Optional[QuestionAgent] = None,
+        analysis_agent: Optional[AnalysisAgent] = None,
+        youtube_agent: Optional[YouTubeAgent] = None,
+        book_agent: Optional[BookAgent] = None
+    ):
         super().__init__(
             name="Master Agent",
             description="Orchestrates all learning assistant agents and manages the learning workflow"
         )
         
-        # Initialize sub-agents with underscore prefix
-        self._question_agent = QuestionAgent()
-        self._analysis_agent = AnalysisAgent()
-        self._youtube_agent = YouTubeAgent()
-        self._book_agent = BookAgent()
+        # Initialize sub-agents with underscore prefix (shared instances come from the agent registry)
+        self._question_agent = question_agent or QuestionAgent()
+        self._analysis_agent = analysis_agent or AnalysisAgent()
+        self._youtube_agent = youtube_agent or YouTubeAgent()
+        self._book_agent = book_agent or BookAgent()
         
         self._agents = {
             "question": self._question_agent,
@@ -38,6 +49,29 @@ class MasterAgent(BaseAgent):
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process user request and orchestrate appropriate agents"""
+        # no_cache=True bu istek için LLM yanıt cache'ini atlar
+        with bypass_llm_cache(bool(input_data.get("no_cache"))):
+            return await self._dispatch(input_data)
+    
+    async def stream(self, input_data: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """SSE için artımlı olaylar: LLM token'ları, adım sonuçları ve son ``result``"""
+        action = input_data.get("action", AgentAction.GENERATE_QUESTIONS.value)
+        with bypass_llm_cache(bool(input_data.get("no_cache"))):
+            if action == AgentAction.GENERATE_QUESTIONS.value:
+                # Question agent token'ları ve soruları kendisi akıtır
+                source = self._question_agent.stream_questions(input_data)
+                async for event in source:
+                    yield event
+                return
+            if action == AgentAction.COMPLETE_LEARNING_CYCLE.value:
+                source = self._stream_learning_cycle(input_data)
+            else:
+                source = single_result(self._dispatch(input_data))
+            async for event in stream_agent_events(source):
+                yield event
+    
+    async def _dispatch(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Route the request to the handler for its action"""
         action = input_data.get("action", AgentAction.GENERATE_QUESTIONS.value)
         
         if action == AgentAction.GENERATE_QUESTIONS.value:
@@ -65,28 +99,78 @@ class MasterAgent(BaseAgent):
     
     async def _handle_youtube_recommendations(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Handle YouTube recommendation request"""
-        # First analyze if we don't have weak topics
-        if "weak_topics" not in input_data and "performance_data" in input_data:
-            analysis_result = await self._analysis_agent.process(input_data)
-            if analysis_result["status"] == "success":
-                input_data["weak_topics"] = analysis_result["data"]["weak_topics"]
-        
         # Pass user_id to YouTube agent for memory integration
-        return await self._youtube_agent.process(input_data)
+        return await self._run_recommendation(self._youtube_agent, input_data)
     
     async def _handle_book_recommendations(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Handle book recommendation request"""
-        # First analyze if we don't have weak topics
-        if "weak_topics" not in input_data and "performance_data" in input_data:
-            analysis_result = await self._analysis_agent.process(input_data)
-            if analysis_result["status"] == "success":
-                input_data["weak_topics"] = analysis_result["data"]["weak_topics"]
-        
         # Pass user_id to book agent for memory integration
-        return await self._book_agent.process(input_data)
+        return await self._run_recommendation(self._book_agent, input_data)
+    
+    async def _run_recommendation(self, agent: BaseAgent, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Öneri agent'ını çalıştır; weak_topics yoksa önce (tek seferlik) analiz yapılır"""
+        pipeline = AgentPipeline("recommendation")
+        pipeline.add(
+            "analysis",
+            lambda results: self._analysis_agent.process(input_data),
+            when=lambda results: "weak_topics" not in input_data and "performance_data" in input_data
+        )
+        pipeline.add(
+            "recommendations",
+            lambda results: agent.process(self._recommendation_input(input_data, results.get("analysis"))),
+            deps=("analysis",)
+        )
+        run = await pipeline.run()
+        return run.results["recommendations"]
+    
+    @staticmethod
+    def _recommendation_input(input_data: Dict[str, Any], analysis_result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Başarılı analiz varsa weak_topics'i ekleyerek öneri girdisini hazırla"""
+        if analysis_result and analysis_result.get("status") == "success":
+            return {
+                **input_data,
+                "weak_topics": analysis_result["data"]["weak_topics"]
+            }
+        return input_data
+    
+    def _learning_cycle_pipeline(self, input_data: Dict[str, Any]) -> AgentPipeline:
+        """questions ve analysis paralel; YouTube ve kitap önerileri yalnızca analize bağlı"""
+        analysis_succeeded = lambda results: results.get("analysis", {}).get("status") == "success"
+        return (
+            AgentPipeline("complete_learning_cycle")
+            # Step 1: Generate questions
+            .add("questions", lambda results: self._question_agent.process(input_data))
+            # Step 2: If performance data is provided, analyze it
+            .add(
+                "analysis",
+                lambda results: self._analysis_agent.process(input_data),
+                when=lambda results: "performance_data" in input_data
+            )
+            # Step 3: Get recommendations based on analysis
+            .add(
+                "youtube_recommendations",
+                lambda results: self._youtube_agent.process(self._recommendation_input(input_data, results["analysis"])),
+                deps=("analysis",),
+                when=analysis_succeeded
+            )
+            .add(
+                "book_recommendations",
+                lambda results: self._book_agent.process(self._recommendation_input(input_data, results["analysis"])),
+                deps=("analysis",),
+                when=analysis_succeeded
+            )
+        )
     
     async def _handle_complete_learning_cycle(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Handle complete learning cycle: questions -> analysis -> recommendations"""
+        result: Dict[str, Any] = {}
+        async for event, data in self._stream_learning_cycle(input_data):
+            if event == "result":
+                result = data
+        return result
+    
+    async def _stream_learning_cycle(self, input_data: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """Learning cycle adımlarını tamamlandıkça ``step`` olayı olarak üret"""
         results = {
             "status": "success",
             "agent": str(self.name),
@@ -95,35 +179,20 @@ class MasterAgent(BaseAgent):
         }
         
         try:
-            # Step 1: Generate questions
-            question_result = await self._question_agent.process(input_data)
-            results["steps"]["questions"] = question_result
+            pipeline = self._learning_cycle_pipeline(input_data)
+            run = pipeline.start()
+            async for step, step_result in run.as_completed():
+                yield "step", {"step": step, "result": step_result}
             
-            # Step 2: If performance data is provided, analyze it
-            if "performance_data" in input_data:
-                analysis_result = await self._analysis_agent.process(input_data)
-                results["steps"]["analysis"] = analysis_result
-                
-                # Step 3: Get recommendations based on analysis
-                if analysis_result["status"] == "success":
-                    weak_topics = analysis_result["data"]["weak_topics"]
-                    recommendation_input = {
-                        **input_data,
-                        "weak_topics": weak_topics
-                    }
-                    
-                    # Get YouTube recommendations
-                    youtube_result = await self._youtube_agent.process(recommendation_input)
-                    results["steps"]["youtube_recommendations"] = youtube_result
-                    
-                    # Get book recommendations
-                    book_result = await self._book_agent.process(recommendation_input)
-                    results["steps"]["book_recommendations"] = book_result
-            
-            return results
+            # Adımlar tamamlanma sırasından bağımsız olarak tanım sırasıyla döner
+            results["steps"] = {
+                step: run.results[step] for step in pipeline.node_names if step in run.results
+            }
+            results["timings"] = run.summary()
+            yield "result", results
             
         except Exception as e:
-            return {
+            yield "result", {
                 "status": "error",
                 "agent": str(self.name),
                 "error": str(e)
@@ -133,6 +202,12 @@ class MasterAgent(BaseAgent):
         """Handle general queries by determining the best agent to use"""
         query = input_data.get("query", "")
         
+        # Önce yerel yönlendirici; güveni düşükse LLM'e sorulur
+        if settings.INTENT_ROUTER_ENABLED:
+            agent_name = intent_router.route(query)
+            if agent_name:
+                return await self._agents[agent_name].process(input_data)
+        
         # Create a prompt to determine which agent to use
         prompt_template = ChatPromptTemplate.from_messages([
             ("system", "Sen bir eğitim asistanı yöneticisisin. Kullanıcının isteğine göre hangi ajanın kullanılacağını belirle."),
@@ -156,6 +231,9 @@ Hangi ajan kullanılmalı? Sadece ajan adını döndür (question, analysis, you
             agent_name = result.content.strip().lower()
             
             if agent_name in self._agents:
+                # LLM kararı yönlendirici için etiketli örnek olur
+                if settings.INTENT_ROUTER_ENABLED:
+                    intent_router.learn(query, agent_name)
                 return await self._agents[agent_name].process(input_data)
             else:
                 return {
@@ -0,0 +1,150 @@
+"""
+Agent pipeline'ları için küçük bağımlılık grafiği (DAG) yürütücüsü.
+
+Düğümler bağımlılıklarıyla birlikte tanımlanır; bağımsız düğümler aynı anda
+çalışır, her düğüm bir çalıştırma (istek) içinde yalnızca bir kez çalışır ve
+sonucu tüm bağımlılara paylaştırılır. Her düğümün başlangıç/süre bilgisi
+tutulur; toplam süre kritik yol ile sınırlıdır.
+"""
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+# Düğüm fonksiyonu o ana kadarki sonuçları alır (bağımlılıklar tamamlanmış olur)
+NodeFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+NodeCondition = Callable[[Dict[str, Any]], bool]
+
+_SKIPPED = object()
+
+
+@dataclass(frozen=True)
+class PipelineNode:
+    name: str
+    func: NodeFunc
+    deps: Tuple[str, ...] = ()
+    when: Optional[NodeCondition] = None
+
+
+class AgentPipeline:
+    """Düğüm tanımları; ``start()`` her istek için yeni bir çalıştırma döndürür"""
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self._nodes: Dict[str, PipelineNode] = {}
+
+    def add(
+        self,
+        name: str,
+        func: NodeFunc,
+        deps: Tuple[str, ...] = (),
+        when: Optional[NodeCondition] = None
+    ) -> "AgentPipeline":
+        """Düğüm ekle. Bağımlılıklar önceden eklenmiş olmalı (böylece döngü oluşamaz).
+
+        ``when`` bağımlılıklar bittikten sonra değerlendirilir; False ise düğüm
+        atlanır ve sonuçlarda yer almaz. Atlanan bağımlılık, bağımlı düğümü
+        kendiliğinden atlatmaz - gerekiyorsa ``when`` ile kontrol edilir.
+        """
+        if name in self._nodes:
+            raise ValueError(f"Pipeline node already defined: {name}")
+        unknown = [dep for dep in deps if dep not in self._nodes]
+        if unknown:
+            raise ValueError(f"Unknown dependencies for {name}: {unknown}")
+        self._nodes[name] = PipelineNode(name=name, func=func, deps=tuple(deps), when=when)
+        return self
+
+    @property
+    def node_names(self) -> List[str]:
+        return list(self._nodes)
+
+    def start(self) -> "PipelineRun":
+        return PipelineRun(self)
+
+    async def run(self) -> "PipelineRun":
+        """Tüm düğümleri çalıştır ve tamamlanmış çalıştırmayı döndür"""
+        run = self.start()
+        await run.wait()
+        return run
+
+
+class PipelineRun:
+    """Tek bir çalıştırma: düğüm başına memoize edilmiş task, sonuçlar ve süreler"""
+
+    def __init__(self, pipeline: AgentPipeline):
+        self.pipeline = pipeline
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.skipped: List[str] = []
+        self._tasks: Dict[str, asyncio.Future] = {}
+        self._started = time.perf_counter()
+
+    def get(self, name: str) -> asyncio.Future:
+        """Düğümün task'ı; ilk çağrıda başlatılır, sonrakiler aynı task'ı paylaşır"""
+        if name not in self._tasks:
+            self._tasks[name] = asyncio.ensure_future(self._execute(self.pipeline._nodes[name]))
+        return self._tasks[name]
+
+    async def _execute(self, node: PipelineNode) -> Any:
+        if node.deps:
+            await asyncio.gather(*(self.get(dep) for dep in node.deps))
+        if node.when is not None and not node.when(self.results):
+            self.skipped.append(node.name)
+            return _SKIPPED
+
+        started = time.perf_counter()
+        try:
+            result = await node.func(self.results)
+        finally:
+            self.timings[node.name] = {
+                "start": round(started - self._started, 3),
+                "duration": round(time.perf_counter() - started, 3),
+            }
+        self.results[node.name] = result
+        return result
+
+    async def as_completed(self) -> AsyncIterator[Tuple[str, Any]]:
+        """Tüm düğümleri başlat; her biri tamamlandıkça ``(name, result)`` üret"""
+        order = {name: index for index, name in enumerate(self.pipeline._nodes)}
+        tasks = {self.get(name): name for name in order}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: order[tasks[t]]):
+                    result = task.result()
+                    if result is not _SKIPPED:
+                        yield tasks[task], result
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def wait(self) -> Dict[str, Any]:
+        async for _ in self.as_completed():
+            pass
+        return self.results
+
+    def critical_path(self) -> List[str]:
+        """En geç biten düğümden geriye, en geç biten bağımlılığı izleyen yol"""
+        def end(name: str) -> float:
+            timing = self.timings[name]
+            return timing["start"] + timing["duration"]
+
+        if not self.timings:
+            return []
+        path = [max(self.timings, key=end)]
+        while True:
+            deps = [dep for dep in self.pipeline._nodes[path[-1]].deps if dep in self.timings]
+            if not deps:
+                break
+            path.append(max(deps, key=end))
+        return list(reversed(path))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total": round(time.perf_counter() - self._started, 3),
+            "nodes": self.timings,
+            "skipped": self.skipped,
+            "critical_path": self.critical_path(),
+        }
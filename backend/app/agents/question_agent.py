@@ -4,9 +4,11 @@ from __future__ import annotations
 import asyncio
 import math
 
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
 from app.agents.base_agent import BaseAgent
+from app.services.question_dedup_index import NearDuplicateFilter, question_dedup_index
+from app.utils.json_stream import StreamingArrayParser
 
 # LangChain / Pydantic utilities
 from langchain.prompts import ChatPromptTemplate
@@ -198,14 +200,13 @@ class QuestionAgent(BaseAgent):
 
             batch_results: List[QuestionGenerationResponse] = await asyncio.gather(*tasks, return_exceptions=False)
 
-            # Flatten and deduplicate questions
-            seen: set[str] = set(_exclude or [])
+            # Flatten and drop near-duplicates (across batches and against *_exclude*)
+            dedup = question_dedup_index.batch().seed(_exclude or [])
             merged_questions: List[GeneratedQuestion] = []
             for batch in batch_results:
                 for q in batch.questions:
-                    if q.question not in seen:
+                    if dedup.accept(q.question):
                         merged_questions.append(q)
-                        seen.add(q.question)
                     if len(merged_questions) == count:
                         break
                 if len(merged_questions) == count:
@@ -220,12 +221,11 @@ class QuestionAgent(BaseAgent):
                     difficulty=difficulty,
                     count=shortage,
                     education_level=education_level,
-                    _exclude=list(seen),
+                    _exclude=list(dedup.texts),
                 )
                 for q in refill_resp.questions:
-                    if q.question not in seen:
+                    if dedup.accept(q.question):
                         merged_questions.append(q)
-                        seen.add(q.question)
                         shortage -= 1
                         if shortage == 0:
                             break
@@ -247,7 +247,7 @@ class QuestionAgent(BaseAgent):
             _exclude=_exclude or [],
         )
 
-    async def _generate_questions_single(
+    def _build_question_prompt(
         self,
         subject: str,
         topic: str,
@@ -255,8 +255,8 @@ class QuestionAgent(BaseAgent):
         count: int,
         education_level: str,
         _exclude: List[str],
-    ) -> 'QuestionGenerationResponse':
-        """Generate up to batch_size questions in a single LLM call."""
+    ) -> Tuple[ChatPromptTemplate, PydanticOutputParser]:
+        """Build the generation prompt and its output parser."""
 
         parser = PydanticOutputParser(pydantic_object=QuestionGenerationResponse)
         format_instructions = parser.get_format_instructions().replace("{", "{{").replace("}", "}}")
@@ -298,21 +298,123 @@ class QuestionAgent(BaseAgent):
             ("system", system_msg),
             ("human", human_msg),
         ])
+        return prompt, parser
 
-        # Temporarily raise temperature to diversify batches
-        original_temp = self.temperature
-        self.temperature = 0.3
+    async def _generate_questions_single(
+        self,
+        subject: str,
+        topic: str,
+        difficulty: str,
+        count: int,
+        education_level: str,
+        _exclude: List[str],
+    ) -> 'QuestionGenerationResponse':
+        """Generate up to batch_size questions in a single LLM call."""
 
-        chain = prompt | self.llm | parser
+        prompt, parser = self._build_question_prompt(
+            subject, topic, difficulty, count, education_level, _exclude
+        )
+
+        # Higher temperature diversifies batches (copy - the agent itself is shared)
+        chain = prompt | self.with_temperature(0.3) | parser
 
         try:
-            result = await chain.ainvoke({})
-            self.temperature = original_temp
-            return result
+            return await chain.ainvoke({})
         except Exception:
-            self.temperature = original_temp
             return self._fallback_questions(subject, topic, difficulty, count)
 
+    # ----------------------------- STREAMING ---------------------------- #
+
+    async def stream_questions(self, input_data: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """Streaming counterpart of :meth:`process`.
+
+        Yields ``("token", {"delta": ...})`` for every LLM chunk, ``("question", ...)``
+        as soon as each question object is complete in the streamed JSON, and a
+        final ``("result", ...)`` with the same payload :meth:`process` returns.
+        Batches of 10 are generated sequentially so the token stream stays coherent.
+        """
+
+        try:
+            params = self._validate_request(input_data)
+        except Exception as exc:  # noqa: BLE001
+            yield "result", self._error_response(str(exc))
+            return
+
+        count = params["count"]
+        batch_size = 10
+        questions: List[GeneratedQuestion] = []
+        dedup = question_dedup_index.batch()
+        # Tekrarlar yüzünden sonsuz döngüye girmemek için deneme sınırı
+        attempts_left = math.ceil(count / batch_size) + 2
+
+        while len(questions) < count and attempts_left > 0:
+            attempts_left -= 1
+            batch_count = min(count - len(questions), batch_size)
+            prompt, parser = self._build_question_prompt(
+                params["subject"], params["topic"], params["difficulty"],
+                batch_count, params["education_level"], list(dedup.texts)
+            )
+            extractor = StreamingArrayParser("questions")
+            added = 0
+            try:
+                async for chunk in (prompt | self.llm).astream({}):
+                    delta = chunk.content if isinstance(chunk.content, str) else ""
+                    if not delta:
+                        continue
+                    yield "token", {"delta": delta}
+                    for item in extractor.feed(delta):
+                        question = self._accept_streamed_question(item, dedup)
+                        if question is None or len(questions) >= count:
+                            continue
+                        questions.append(question)
+                        added += 1
+                        yield "question", {"index": len(questions) - 1, "question": question.model_dump()}
+            except Exception as exc:  # noqa: BLE001
+                yield "warning", {"message": f"Question stream interrupted: {exc}"}
+
+            # Artımlı ayrıştırma hiçbir şey bulamadıysa tam metni normal parser ile dene
+            if added == 0 and extractor.text:
+                try:
+                    parsed = parser.parse(extractor.text)
+                except Exception:  # noqa: BLE001
+                    parsed = None
+                for question in (parsed.questions if parsed else []):
+                    if len(questions) >= count or not dedup.accept(question.question):
+                        continue
+                    questions.append(question)
+                    added += 1
+                    yield "question", {"index": len(questions) - 1, "question": question.model_dump()}
+            if added == 0:
+                break
+
+        if not questions:
+            fallback = self._fallback_questions(
+                params["subject"], params["topic"], params["difficulty"], count
+            )
+            questions = list(fallback.questions)
+            for index, question in enumerate(questions):
+                yield "question", {"index": index, "question": question.model_dump()}
+
+        response = QuestionGenerationResponse(
+            subject=params["subject"],
+            topic=params["topic"],
+            difficulty=params["difficulty"],
+            questions=questions,
+        )
+        yield "result", self._success_response(response.model_dump())
+
+    @staticmethod
+    def _accept_streamed_question(item: Any, dedup: NearDuplicateFilter) -> 'GeneratedQuestion | None':
+        """Validate a streamed question object and skip near-duplicates."""
+
+        try:
+            question = GeneratedQuestion.model_validate(item)
+        except Exception:  # noqa: BLE001
+            return None
+        if not dedup.accept(question.question):
+            return None
+        return question
+
     # ------------------------ RESPONSE HELPERS ------------------------- #
 
     def _success_response(self, payload: Any) -> Dict[str, Any]:
@@ -0,0 +1,122 @@
+"""
+Süreç genelinde paylaşılan agent kaydı.
+
+Her agent (ve içindeki Gemini istemcisi) süreç başına bir kez, ilk istendiğinde
+ya da lifespan başlangıcındaki ``warmup`` ile oluşturulur. Route'lar agent'ları
+``Depends(get_exam_agent)`` gibi dependency'lerle alır; MasterAgent ve
+ParallelAgentService alt agent'ları kendileri kurmak yerine buradan paylaşır.
+Agent'lar istekler arasında paylaşıldığından istek bazlı durumu (ör. temperature)
+kendi üzerlerinde değiştirmemelidir; bkz. ``BaseAgent.with_temperature``.
+"""
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import logging
+import threading
+import time
+
+from app.agents.analysis_agent import AnalysisAgent
+from app.agents.book_agent import BookAgent
+from app.agents.exam_agent import ExamAgent
+from app.agents.master_agent import MasterAgent
+from app.agents.question_agent import QuestionAgent
+from app.agents.youtube_agent import YouTubeAgent
+
+logger = logging.getLogger(__name__)
+
+AgentFactory = Callable[["AgentRegistry"], Any]
+
+
+class AgentRegistry:
+    """İsimle kayıtlı fabrikalardan tembel (lazy) ve tekil agent örnekleri"""
+
+    def __init__(self):
+        self._factories: Dict[str, AgentFactory] = {}
+        self._instances: Dict[str, Any] = {}
+        self._build_times: Dict[str, float] = {}
+        # Master fabrikası alt agent'ları aynı kilit altında ister
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: AgentFactory) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                if name not in self._factories:
+                    raise KeyError(f"Agent not registered: {name}")
+                started = time.perf_counter()
+                instance = self._factories[name](self)
+                self._build_times[name] = round(time.perf_counter() - started, 3)
+                self._instances[name] = instance
+            return instance
+
+    def override(self, name: str, instance: Any) -> None:
+        """Hazır bir örneği kullan (testler / özel yapılandırma)"""
+        with self._lock:
+            self._instances[name] = instance
+
+    def dependency(self, name: str) -> Callable[[], Any]:
+        """FastAPI ``Depends`` ile kullanılacak sağlayıcı"""
+        def provider() -> Any:
+            return self.get(name)
+        provider.__name__ = f"get_{name}_agent"
+        return provider
+
+    def build_all(self, names: Optional[List[str]] = None) -> Dict[str, float]:
+        for name in names or list(self._factories):
+            self.get(name)
+        return dict(self._build_times)
+
+    async def warmup(self, names: Optional[List[str]] = None) -> None:
+        """Agent'ları (ve istemcilerini) event loop'u bloklamadan önceden oluştur"""
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self.build_all, names)
+        except Exception as e:
+            # Eksik API anahtarı vb. - agent'lar ilk istekte tekrar denenir
+            logger.warning(f"Agent warmup failed: {e}")
+            return
+        logger.info(f"Agents warmed up in {time.perf_counter() - started:.2f}s: {sorted(self._instances)}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._instances.clear()
+            self._build_times.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "registered": sorted(self._factories),
+            "built": sorted(self._instances),
+            "build_seconds": dict(self._build_times),
+        }
+
+
+def _build_master(registry: AgentRegistry) -> MasterAgent:
+    return MasterAgent(
+        question_agent=registry.get("question"),
+        analysis_agent=registry.get("analysis"),
+        youtube_agent=registry.get("youtube"),
+        book_agent=registry.get("book"),
+    )
+
+
+# Global instance
+agent_registry = AgentRegistry()
+agent_registry.register("question", lambda registry: QuestionAgent())
+agent_registry.register("analysis", lambda registry: AnalysisAgent())
+agent_registry.register("youtube", lambda registry: YouTubeAgent())
+agent_registry.register("book", lambda registry: BookAgent())
+agent_registry.register("exam", lambda registry: ExamAgent())
+agent_registry.register("master", _build_master)
+
+# Route dependency'leri
+get_question_agent = agent_registry.dependency("question")
+get_analysis_agent = agent_registry.dependency("analysis")
+get_exam_agent = agent_registry.dependency("exam")
+get_master_agent = agent_registry.dependency("master")
@@ -1,18 +1,83 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set
 from app.agents.base_agent import BaseAgent
 from langchain.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from langchain.output_parsers import PydanticOutputParser
 import re
-import aiohttp
+import json
 import asyncio
 from urllib.parse import quote
 from app.core.config import settings
 from app.services.memory_service import memory_service
+from app.services.http_client import http_client
+from app.services.recommendation_history_service import recommendation_history_service, canonical_id
+from app.database import AsyncSessionLocal
+from app.utils.cache import TTLCache, MISSING
+from app.utils.sqlite_kv import SQLiteKVStore
 import logging
 
 logger = logging.getLogger(__name__)
 
+YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+YOUTUBE_VIDEOS_BATCH_SIZE = 50  # videos.list tek istekte en fazla 50 ID kabul eder
+
+# Konu araması sonuçları: bellek içi LRU+TTL, opsiyonel SQLite kalıcı katman
+_search_cache = TTLCache(
+    maxsize=settings.YOUTUBE_CACHE_SIZE,
+    ttl=settings.YOUTUBE_CACHE_TTL_SECONDS,
+    name="youtube_search",
+)
+_search_store: Optional[SQLiteKVStore] = None
+_search_store_failed = False
+
+
+def _search_cache_key(query: str, max_results: int) -> str:
+    return f"{max_results}:{' '.join(query.casefold().split())}"
+
+
+def _get_search_store() -> Optional[SQLiteKVStore]:
+    global _search_store, _search_store_failed
+    if _search_store is None and settings.YOUTUBE_CACHE_PATH and not _search_store_failed:
+        try:
+            _search_store = SQLiteKVStore(settings.YOUTUBE_CACHE_PATH, table="youtube_search")
+        except Exception as e:
+            _search_store_failed = True
+            logger.warning(f"YouTube search cache persistence disabled: {e}")
+    return _search_store
+
+
+def _get_cached_search(query: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+    key = _search_cache_key(query, max_results)
+    videos = _search_cache.get(key)
+    if videos is not MISSING:
+        return videos
+    store = _get_search_store()
+    if store is None:
+        return None
+    try:
+        raw = store.get(key)
+        if raw is None:
+            return None
+        videos = json.loads(raw)
+    except Exception as e:
+        logger.warning(f"YouTube search cache read failed: {e}")
+        return None
+    _search_cache.set(key, videos)
+    return videos
+
+
+def _cache_search(query: str, max_results: int, videos: List[Dict[str, Any]]) -> None:
+    key = _search_cache_key(query, max_results)
+    _search_cache.set(key, videos)
+    store = _get_search_store()
+    if store is None:
+        return
+    try:
+        store.set(key, json.dumps(videos).encode("utf-8"), ttl=settings.YOUTUBE_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"YouTube search cache write failed: {e}")
+
 class YouTubeVideo(BaseModel):
     """YouTube video recommendation"""
     title: str = Field(..., description="Video title")
@@ -49,33 +114,34 @@ class YouTubeAgent(BaseAgent):
         user_id = str(input_data.get("user_id", ""))  # memory entegrasyonu için
         
         try:
-            # Kullanıcının geçmiş video geçmişini alarak tekrar önerileri önle
-            history_urls: List[str] = []
-            if user_id and memory_service.memory:
-                history_urls = await self._get_user_video_history(user_id, subject)
+            # Kullanıcıya daha önce önerilmiş videoların ID kümesi (tekrar önerileri önle)
+            seen_video_ids: Set[str] = set()
+            if user_id:
+                seen_video_ids = await self._get_recommended_video_ids(user_id)
 
-            # Gerçek videolar aramak için search queries oluştur
-            all_videos = []
-            
-            for topic in weak_topics:
-                # Her zayıf konu için arama sorgusu oluştur
-                search_query = f"{subject} {topic} {education_level} türkçe"
-                
-                # Gerçek videolar ara
-                videos = await self.search_real_videos(search_query, max_results=2)
-                all_videos.extend(videos)
-            
+            # Gerçek videolar aramak için search queries oluştur (her zayıf konu için)
+            topic_queries = {
+                f"{subject} {topic} {education_level} türkçe": 2
+                for topic in weak_topics
+            }
             # Eğer hiç zayıf konu yoksa genel arama yap
-            if not weak_topics:
-                search_query = f"{subject} {education_level} türkçe"
-                videos = await self.search_real_videos(search_query, max_results=5)
-                all_videos.extend(videos)
+            if not topic_queries:
+                topic_queries[f"{subject} {education_level} türkçe"] = 5
+
+            # Konu aramaları paralel; detaylar tek videos.list çağrısında toplanır
+            videos_by_query = await self.search_topics(topic_queries)
+            all_videos = []
+            for search_query in topic_queries:
+                all_videos.extend(
+                    {**video, "search_query": search_query}
+                    for video in videos_by_query.get(search_query, [])
+                )
             
             # Videoları formatlı yapıya dönüştür & geçmiş videoları çıkar
             formatted_videos: List[Dict[str, Any]] = []
             for video in all_videos:
                 # Daha önce önerilmiş videoları atla
-                if history_urls and video.get("video_url") in history_urls:
+                if seen_video_ids and canonical_id("youtube", video.get("video_url")) in seen_video_ids:
                     continue
                 if len(formatted_videos) >= 5:
                     break
@@ -85,7 +151,7 @@ class YouTubeAgent(BaseAgent):
                     "duration": video.get("duration", "Bilinmiyor"),
                     "level": education_level,
                     "video_url": video.get("video_url", ""),
-                    "search_query": search_query,
+                    "search_query": video.get("search_query", ""),
                     "topics_covered": weak_topics or [subject],
                     "why_recommended": f"Bu video {subject} dersindeki zayıf konularınız için önerildi.",
                     "thumbnail_url": video.get("thumbnail_url", ""),
@@ -116,84 +182,143 @@ class YouTubeAgent(BaseAgent):
     
     async def search_real_videos(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """Search for real YouTube videos using YouTube Data API or web scraping"""
-        try:
-            # YouTube Data API kullanımı (API key varsa)
-            if hasattr(settings, 'YOUTUBE_API_KEY') and settings.YOUTUBE_API_KEY:
-                return await self._search_with_api(query, max_results)
+        results = await self.search_topics({query: max_results})
+        return results.get(query, [])
+
+    async def search_topics(self, queries: Dict[str, int]) -> Dict[str, List[Dict[str, Any]]]:
+        """Birden çok sorguyu (sorgu -> max_results) paralel ara.
+
+        API sonuçları konu cache'inden karşılanır; eksik sorguların video ID'leri
+        birleştirilip 50'lik tek ``videos.list`` çağrılarıyla detaylandırılır.
+        """
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        use_api = bool(getattr(settings, 'YOUTUBE_API_KEY', None))
+        pending: Dict[str, int] = {}
+        for query, max_results in queries.items():
+            cached = _get_cached_search(query, max_results) if use_api else None
+            if cached is not None:
+                results[query] = cached
             else:
-                # API yoksa web scraping ile arama
-                return await self._search_with_scraping(query, max_results)
-        except Exception as e:
-            # Fallback: Intelligent search query generation
-            return await self._generate_intelligent_suggestions(query, max_results)
-    
-    async def _search_with_api(self, query: str, max_results: int) -> List[Dict[str, Any]]:
-        """Search using YouTube Data API"""
-        api_key = settings.YOUTUBE_API_KEY
-        search_url = "https://www.googleapis.com/youtube/v3/search"
-        
+                pending[query] = max_results
+        if not pending:
+            return results
+
+        semaphore = asyncio.Semaphore(settings.YOUTUBE_SEARCH_CONCURRENCY)
+
+        async def _fallback(query: str, max_results: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self._search_with_scraping(query, max_results)
+                except Exception as e:
+                    logger.warning(f"YouTube suggestion fallback failed for '{query}': {e}")
+                    return []
+
+        if not use_api:
+            # API yoksa web scraping ile arama
+            outcomes = await asyncio.gather(*(_fallback(q, n) for q, n in pending.items()))
+            results.update(zip(pending.keys(), outcomes))
+            return results
+
+        async def _ids(query: str, max_results: int) -> List[str]:
+            async with semaphore:
+                return await self._search_video_ids(query, max_results)
+
+        id_outcomes = await asyncio.gather(
+            *(_ids(q, n) for q, n in pending.items()), return_exceptions=True
+        )
+        ids_by_query: Dict[str, List[str]] = {}
+        failed: Dict[str, int] = {}
+        for (query, max_results), outcome in zip(pending.items(), id_outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning(f"YouTube search failed for '{query}': {outcome}")
+                failed[query] = max_results
+            else:
+                ids_by_query[query] = outcome
+
+        details: Dict[str, Dict[str, Any]] = {}
+        unique_ids = list(dict.fromkeys(vid for ids in ids_by_query.values() for vid in ids))
+        if unique_ids:
+            try:
+                details = await self._fetch_video_details(unique_ids)
+            except Exception as e:
+                logger.warning(f"YouTube videos.list failed: {e}")
+                failed.update({q: pending[q] for q in ids_by_query})
+                ids_by_query = {}
+
+        for query, ids in ids_by_query.items():
+            videos = [details[vid] for vid in ids if vid in details]
+            results[query] = videos
+            _cache_search(query, pending[query], videos)
+
+        # Fallback: Intelligent search query generation
+        if failed:
+            outcomes = await asyncio.gather(
+                *(self._generate_intelligent_suggestions(q, n) for q, n in failed.items()),
+                return_exceptions=True
+            )
+            for query, outcome in zip(failed.keys(), outcomes):
+                results[query] = [] if isinstance(outcome, BaseException) else outcome
+        return results
+
+    async def _search_video_ids(self, query: str, max_results: int) -> List[str]:
+        """search.list ile sorgu için video ID'leri (sıralı)"""
         search_params = {
             'part': 'snippet',
             'q': query,
             'type': 'video',
             'maxResults': max_results,
-            'key': api_key,
+            'key': settings.YOUTUBE_API_KEY,
             'regionCode': 'TR',
             'relevanceLanguage': 'tr'
         }
-        
-        async with aiohttp.ClientSession() as session:
-            # İlk önce video arama yap
-            async with session.get(search_url, params=search_params) as response:
-                if response.status != 200:
-                    raise Exception(f"Search API request failed with status {response.status}")
-                
-                search_data = await response.json()
-                videos = []
-                
-                # Video ID'lerini topla
-                video_ids = []
-                for item in search_data.get('items', []):
-                    video_id = item.get('id', {}).get('videoId')
-                    if video_id:
-                        video_ids.append(video_id)
-                
-                if not video_ids:
-                    return videos
-                
-                # Video detaylarını al (süre bilgisi için)
-                videos_url = "https://www.googleapis.com/youtube/v3/videos"
-                videos_params = {
-                    'part': 'contentDetails,snippet,statistics',
-                    'id': ','.join(video_ids),
-                    'key': api_key
+        session = http_client.session()
+        async with session.get(YOUTUBE_SEARCH_URL, params=search_params) as response:
+            if response.status != 200:
+                raise Exception(f"Search API request failed with status {response.status}")
+            search_data = await response.json()
+
+        video_ids = []
+        for item in search_data.get('items', []):
+            video_id = item.get('id', {}).get('videoId')
+            if video_id:
+                video_ids.append(video_id)
+        return video_ids
+
+    async def _fetch_video_details(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """videos.list ile detaylar; ID'ler 50'lik gruplar halinde tek istekte sorgulanır"""
+        session = http_client.session()
+        videos: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(video_ids), YOUTUBE_VIDEOS_BATCH_SIZE):
+            videos_params = {
+                'part': 'contentDetails,snippet',
+                'id': ','.join(video_ids[start:start + YOUTUBE_VIDEOS_BATCH_SIZE]),
+                'key': settings.YOUTUBE_API_KEY
+            }
+            async with session.get(YOUTUBE_VIDEOS_URL, params=videos_params) as videos_response:
+                if videos_response.status != 200:
+                    raise Exception(f"Videos API request failed with status {videos_response.status}")
+                videos_data = await videos_response.json()
+
+            for item in videos_data.get('items', []):
+                video_id = item.get('id')
+                snippet = item.get('snippet', {})
+                content_details = item.get('contentDetails', {})
+
+                # ISO 8601 duration'ı dakika:saniye formatına çevir
+                duration_iso = content_details.get('duration', 'PT0M0S')
+                duration_readable = self._parse_duration(duration_iso)
+
+                videos[video_id] = {
+                    'title': snippet.get('title', ''),
+                    'channel': snippet.get('channelTitle', ''),
+                    'duration': duration_readable,
+                    'video_url': f'https://www.youtube.com/watch?v={video_id}',
+                    'thumbnail_url': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
+                    'channel_url': f'https://www.youtube.com/@{snippet.get("channelTitle", "").replace(" ", "")}',
+                    'description': snippet.get('description', '')[:200],
+                    'published_at': snippet.get('publishedAt', '')
                 }
-                
-                async with session.get(videos_url, params=videos_params) as videos_response:
-                    if videos_response.status == 200:
-                        videos_data = await videos_response.json()
-                        
-                        for item in videos_data.get('items', []):
-                            video_id = item.get('id')
-                            snippet = item.get('snippet', {})
-                            content_details = item.get('contentDetails', {})
-                            
-                            # ISO 8601 duration'ı dakika:saniye formatına çevir
-                            duration_iso = content_details.get('duration', 'PT0M0S')
-                            duration_readable = self._parse_duration(duration_iso)
-                            
-                            videos.append({
-                                'title': snippet.get('title', ''),
-                                'channel': snippet.get('channelTitle', ''),
-                                'duration': duration_readable,
-                                'video_url': f'https://www.youtube.com/watch?v={video_id}',
-                                'thumbnail_url': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
-                                'channel_url': f'https://www.youtube.com/@{snippet.get("channelTitle", "").replace(" ", "")}',
-                                'description': snippet.get('description', '')[:200],
-                                'published_at': snippet.get('publishedAt', '')
-                            })
-                
-                return videos
+        return videos
     
     async def _search_with_scraping(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Search using web scraping (YouTube search results)"""
@@ -320,22 +445,16 @@ Her video için:
     # Memory integration helpers
     # ------------------------------------------------------------------
 
-    async def _get_user_video_history(self, user_id: str, subject: str) -> List[str]:
-        """Retrieve previously recommended YouTube video URLs for the user to avoid repetition"""
+    async def _get_recommended_video_ids(self, user_id: str) -> Set[str]:
+        """Kullanıcıya daha önce önerilmiş YouTube video ID'leri (tek indeksli sorgu)"""
         try:
-            memories = await memory_service.get_personalized_context(
-                user_id=user_id,
-                query=f"YouTube {subject} video",
-                limit=20
-            )
-            urls: List[str] = []
-            for mem in memories:
-                text = mem.get("memory", "")
-                urls.extend(re.findall(r'https?://www\.youtube\.com/watch\?v=[\w-]+', text))
-            return urls
+            async with AsyncSessionLocal() as db:
+                return await recommendation_history_service.get_recommended_ids_async(
+                    db, int(user_id), "youtube"
+                )
         except Exception as e:
-            logger.error(f"Error fetching video history from memory: {e}")
-            return []
+            logger.error(f"Error fetching video recommendation history: {e}")
+            return set()
 
     async def _store_recommendations_to_memory(
         self,
@@ -357,21 +476,15 @@ Her video için:
                 f"Önerilen YouTube Videoları ({subject} - {education_level}):\n" + "\n".join(lines)
             )
 
-            metadata = {
-                "session_type": "video_recommendation",
-                "subject": subject,
-                "education_level": education_level,
-                "video_count": len(recommendations)
-            }
-
-            # Sanitize metadata using helper if available
-            if hasattr(memory_service, "_sanitize_metadata"):
-                metadata = memory_service._sanitize_metadata(metadata)  # type: ignore
-
-            memory_service.memory.add(
-                messages=[{"role": "assistant", "content": content}],
+            await memory_service.add_memory(
                 user_id=user_id,
-                metadata=metadata
+                content=content,
+                metadata={
+                    "session_type": "video_recommendation",
+                    "subject": subject,
+                    "education_level": education_level,
+                    "video_count": len(recommendations)
+                }
             )
         except Exception as e:
             logger.error(f"Error storing recommendations to memory: {e}")
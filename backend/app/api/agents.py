@@ -4,9 +4,11 @@ from typing import Dict, Any, Optional
 from pydantic import BaseModel
 import asyncio
 from app.agents.master_agent import MasterAgent, AgentAction
+from app.agents.registry import get_master_agent
 from app.services.memory_service import memory_service
 from app.core.auth_deps import get_current_user, get_current_user_optional, security as bearer_scheme
 from app.models import User
+from app.utils.sse import sse_response
 
 
 class AgentRequest(BaseModel):
@@ -19,12 +21,14 @@ class AgentRequest(BaseModel):
     performance_data: Optional[Dict[str, Any]] = None
     weak_topics: Optional[list] = None
     query: Optional[str] = None
+    no_cache: Optional[bool] = False
 
 class AnalysisRequest(BaseModel):
     subject: str
     topic: str
     education_level: str = "lise"
     performance_data: Dict[str, Any]
+    no_cache: Optional[bool] = False
 
 class RecommendationRequest(BaseModel):
     subject: str
@@ -36,11 +40,9 @@ router = APIRouter(
     tags=["agents"]
 )
 
-# Initialize master agent
-master_agent = MasterAgent()
 
 @router.get("/info")
-async def get_agents_info():
+async def get_agents_info(master_agent: MasterAgent = Depends(get_master_agent)):
     """Get information about all available agents"""
     try:
         # Manually construct the response to avoid property serialization issues
@@ -70,7 +72,8 @@ async def get_agents_info():
 @router.post("/process")
 async def process_request(
     request: AgentRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    master_agent: MasterAgent = Depends(get_master_agent)
 ):
     """Process a request through the master agent"""
     try:
@@ -90,6 +93,19 @@ async def process_request(
             detail=f"Error processing request: {str(e)}"
         )
 
+@router.post("/process/stream")
+async def process_request_stream(
+    request: AgentRequest,
+    current_user: User = Depends(get_current_user),
+    master_agent: MasterAgent = Depends(get_master_agent)
+):
+    """``/process`` SSE modu: LLM token'ları ve ara sonuçlar üretildikçe gönderilir"""
+    input_data = {
+        "user_id": str(current_user.id),
+        **request.dict()
+    }
+    return sse_response(master_agent.stream(input_data))
+
 @router.post("/analyze", 
     dependencies=[Depends(get_current_user)],
     responses={
@@ -100,7 +116,8 @@ async def process_request(
 async def analyze_performance(
     request: AnalysisRequest, 
     current_user: User = Depends(get_current_user),
-    token: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+    token: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    master_agent: MasterAgent = Depends(get_master_agent)
 ):
     """Analyze student performance - Requires JWT authentication"""
     try:
@@ -122,6 +139,20 @@ async def analyze_performance(
             detail=f"Error analyzing performance: {str(e)}"
         )
 
+@router.post("/analyze/stream", dependencies=[Depends(get_current_user)])
+async def analyze_performance_stream(
+    request: AnalysisRequest,
+    current_user: User = Depends(get_current_user),
+    master_agent: MasterAgent = Depends(get_master_agent)
+):
+    """``/analyze`` SSE modu - Requires JWT authentication"""
+    input_data = {
+        "action": AgentAction.ANALYZE_PERFORMANCE.value,
+        "user_id": str(current_user.id),
+        **request.dict()
+    }
+    return sse_response(master_agent.stream(input_data))
+
 @router.post("/recommend/youtube", 
     dependencies=[Depends(get_current_user)],
     responses={403: {"description": "Not authenticated"}}
@@ -129,7 +160,8 @@ async def analyze_performance(
 async def recommend_youtube_videos(
     request: RecommendationRequest,
     current_user: User = Depends(get_current_user),
-    token: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+    token: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    master_agent: MasterAgent = Depends(get_master_agent)
 ):
     """Get YouTube video recommendations - Requires JWT authentication"""
     try:
@@ -153,7 +185,8 @@ async def recommend_youtube_videos(
 @router.post("/recommend/books", dependencies=[Depends(get_current_user)])
 async def recommend_books(
     request: RecommendationRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    master_agent: MasterAgent = Depends(get_master_agent)
 ):
     """Get book recommendations - Requires JWT authentication"""
     try:
@@ -207,7 +240,8 @@ async def get_memory_records(
 @router.post("/learning-cycle")
 async def complete_learning_cycle(
     request: AgentRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    master_agent: MasterAgent = Depends(get_master_agent)
 ):
     """Execute complete learning cycle"""
     try:
@@ -228,6 +262,20 @@ async def complete_learning_cycle(
             detail=f"Error executing learning cycle: {str(e)}"
         )
 
+@router.post("/learning-cycle/stream")
+async def complete_learning_cycle_stream(
+    request: AgentRequest,
+    current_user: User = Depends(get_current_user),
+    master_agent: MasterAgent = Depends(get_master_agent)
+):
+    """``/learning-cycle`` SSE modu: her adımın sonucu tamamlandığında ``step`` olayı gönderilir"""
+    input_data = {
+        "action": AgentAction.COMPLETE_LEARNING_CYCLE.value,
+        "user_id": str(current_user.id),
+        **request.dict()
+    }
+    return sse_response(master_agent.stream(input_data))
+
 # ===== MEM0 MEMORY ENDPOINTS =====
 
 @router.get("/memory/history")
@@ -10,6 +10,7 @@ from app.schemas.education_level import (
     EducationSystemOverview, CourseListResponse, TopicListResponse
 )
 from app.agents.question_agent import QuestionAgent
+from app.agents.registry import get_question_agent
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -203,7 +204,8 @@ class PerformanceStats(BaseModel):
 @router.post("/generate-quiz")
 async def generate_quiz(
     request: QuizGenerationRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    question_agent: QuestionAgent = Depends(get_question_agent)
 ):
     """Quiz sorularını oluştur"""
     try:
@@ -230,9 +232,6 @@ async def generate_quiz(
         }
         difficulty_en = difficulty_map.get(request.difficulty, 'medium')
         
-        # Question agent ile sorular oluştur
-        question_agent = QuestionAgent()
-        
         # Her konu için soru sayısını dağıt
         questions_per_topic = request.question_count // len(topics)
         remaining_questions = request.question_count % len(topics)
@@ -1,25 +1,51 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database import get_db, get_async_db
 from app.agents.exam_agent import ExamAgent
+from app.agents.registry import get_exam_agent
 from app.schemas.exam import (
     ExamType, ExamSection, ExamQuestion,
     PracticeExamCreate, PracticeExamResult
 )
 from app.models import exam as exam_models
 from app.models.performance import PerformanceAnalysis, ResourceRecommendation
+from app.services.exam_service import (
+    AsyncExamTypeService, AsyncExamSectionService,
+    AsyncExamQuestionService, AsyncPracticeExamService
+)
+from app.services.recommendation_history_service import recommendation_history_service
+from app.services.performance_rollup_service import performance_rollup_service
+from app.services.exam_analysis_service import enqueue_exam_analysis, get_exam_analysis_status
 from app.core.auth_deps import get_current_user
 from app.models.user import User
 
 router = APIRouter()
 
-async def save_recommendations_to_db(db: Session, user_id: int, parallel_results: dict, exam_result: dict):
-    """Sınav sonrası önerileri database'e kaydet"""
+async def save_recommendations_to_db(
+    db: Session,
+    user_id: int,
+    parallel_results: dict,
+    exam_result: dict,
+    practice_exam_id: Optional[int] = None
+) -> Optional[PerformanceAnalysis]:
+    """Sınav sonrası önerileri database'e kaydet.
+
+    ``practice_exam_id`` verilirse sınav başına tek analiz kaydı tutulur; kayıt zaten
+    varsa (iş yeniden denendi, fallback analiz) hiçbir şey yazılmaz ve None döner.
+    """
+    if practice_exam_id is not None and db.query(PerformanceAnalysis.id).filter(
+        PerformanceAnalysis.practice_exam_id == practice_exam_id
+    ).first():
+        print(f"ℹ️ Performance analysis for exam {practice_exam_id} already saved, skipping")
+        return None
     try:
         # Performance analysis oluştur
         performance_analysis = PerformanceAnalysis(
             user_id=user_id,
+            practice_exam_id=practice_exam_id,
             total_questions=exam_result.get("total_questions", 0),
             correct_answers=exam_result.get("correct_answers", 0),
             accuracy=exam_result.get("percentage", 0.0),
@@ -36,6 +62,7 @@ async def save_recommendations_to_db(db: Session, user_id: int, parallel_results
                 performance_analysis.weakness_level = agent_data.get("weakness_level", 5)
         
         db.add(performance_analysis)
+        performance_rollup_service.apply(db, performance_analysis)
         db.commit()
         db.refresh(performance_analysis)
         
@@ -47,6 +74,10 @@ async def save_recommendations_to_db(db: Session, user_id: int, parallel_results
                 if "data" in data_content:
                     data_content = data_content["data"]
                 youtube_recs = data_content.get("recommendations", [])
+                recommendation_history_service.record(
+                    db, user_id, "youtube",
+                    [video.get("video_url", video.get("url", "")) for video in youtube_recs]
+                )
                 for video in youtube_recs:
                     rec = ResourceRecommendation(
                         user_id=user_id,
@@ -68,6 +99,9 @@ async def save_recommendations_to_db(db: Session, user_id: int, parallel_results
                 if "data" in data_content:
                     data_content = data_content["data"]
                 book_recs = data_content.get("recommendations", [])
+                recommendation_history_service.record(
+                    db, user_id, "book", [str(book.get("url", "")) for book in book_recs]
+                )
                 for book in book_recs:
                     book_url = book.get("url", "")
                     if hasattr(book_url, '__str__'):
@@ -108,29 +142,66 @@ async def save_recommendations_to_db(db: Session, user_id: int, parallel_results
         
         db.commit()
         print(f"✅ Recommendations saved for performance analysis {performance_analysis.id}")
+        return performance_analysis
         
+    except IntegrityError:
+        # Aynı sınav için eşzamanlı başka bir analiz kaydı önce commit etti
+        db.rollback()
+        return None
     except Exception as e:
         print(f"❌ Error saving recommendations to DB: {e}")
         db.rollback()
+        raise
 
 # ========== EXAM SYSTEM ==========
 @router.get("/exam-types", response_model=List[dict])
-async def get_exam_types(db: Session = Depends(get_db)):
+async def get_exam_types(db: AsyncSession = Depends(get_async_db)):
     """Mevcut sınav türlerini listele"""
-    exam_agent = ExamAgent()
-    return exam_agent.get_exam_types(db)
+    exam_types = await AsyncExamTypeService.get_all(db, limit=None)
+    return [
+        {
+            "id": et.id,
+            "name": et.name,
+            "description": et.description,
+            "duration_minutes": et.duration_minutes
+        }
+        for et in exam_types
+    ]
 
 @router.get("/exam-types/{exam_type_id}/sections", response_model=List[dict])  
-async def get_exam_sections(exam_type_id: int, db: Session = Depends(get_db)):
+async def get_exam_sections(exam_type_id: int, db: AsyncSession = Depends(get_async_db)):
     """Sınav türüne ait bölümleri getir"""
-    exam_agent = ExamAgent()
-    return exam_agent.get_exam_sections(db, exam_type_id)
+    sections = await AsyncExamSectionService.get_by_exam_type(db, exam_type_id)
+    return [
+        {
+            "id": s.id,
+            "name": s.name,
+            "question_count": s.question_count,
+            "sort_order": s.sort_order,
+            "color": s.color,
+            "icon": s.icon,
+            "is_active": s.is_active
+        }
+        for s in sections
+    ]
 
 @router.get("/sections/{section_id}/questions", response_model=List[dict])
-async def get_section_questions(section_id: int, db: Session = Depends(get_db)):
+async def get_section_questions(section_id: int, db: AsyncSession = Depends(get_async_db)):
     """Bölüme ait soruları getir"""
-    exam_agent = ExamAgent()
-    return exam_agent.get_section_questions(db, section_id)
+    questions = await AsyncExamQuestionService.get_by_section(db, section_id)
+    return [
+        {
+            "id": q.id,
+            "question_text": q.question_text,
+            "option_a": q.option_a,
+            "option_b": q.option_b,
+            "option_c": q.option_c,
+            "option_d": q.option_d,
+            "option_e": q.option_e,
+            "difficulty_level": q.difficulty_level
+        }
+        for q in questions
+    ]
 
 # ========== PRACTICE EXAM ==========
 @router.post("/practice-exam/start", response_model=dict, status_code=201)
@@ -139,10 +210,10 @@ async def start_practice_exam(
     use_existing: bool = True,  # Varsayılan: mevcut examlardan seç
     force_new: bool = False,    # Zorla yeni exam üret
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Deneme sınavı başlat - Mevcut examlardan rastgele seç veya yeni üret"""
-    exam_agent = ExamAgent()
     return exam_agent.start_practice_exam(db, current_user.id, exam_data, use_existing, force_new)
 
 @router.post("/practice-exam/{exam_id}/submit")
@@ -150,126 +221,66 @@ async def submit_practice_exam(
     exam_id: int,
     answers: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
-    """Deneme sınavını tamamla ve sonuçları al"""
-    exam_agent = ExamAgent()
+    """Deneme sınavını tamamla ve sonuçları al - AI analizi arka planda kuyruğa alınır"""
     result = exam_agent.submit_practice_exam(db, exam_id, current_user.id, answers)
     
-    # Paralel analiz ve öneri sistemi
+    # Paralel analiz ve öneri sistemi: sınav başına tek iş, durum /analysis endpoint'inden izlenir
     try:
-        from app.services.parallel_agent_service import parallel_agent_service
-        
-        # Paralel agent servisi ile analiz ve önerileri çalıştır
-        parallel_result = await parallel_agent_service.process_exam_results_parallel(
-            db=db,
-            exam_id=exam_id,
-            user_id=current_user.id,
-            exam_result=result
-        )
-        
-        # Sonuçları birleştir
-        if parallel_result.get("status") == "success":
-            parallel_results = parallel_result.get("results", {})
-            
-            # Analiz sonucunu ekle
-            if "analysis_agent" in parallel_results:
-                analysis_data = parallel_results["analysis_agent"]
-                if analysis_data.get("status") == "success":
-                    # Nested data structure'ı düzelt
-                    analysis_raw = analysis_data.get("data", {})
-                    if "data" in analysis_raw:
-                        analysis_result = analysis_raw["data"]  # Inner data'yı al
-                    else:
-                        analysis_result = analysis_raw
-                    
-                    # Debug log
-                    print(f"🔍 Analysis result being sent to frontend: {analysis_result}")
-                else:
-                    analysis_result = {}
-                
-                # YouTube önerilerini analiz verisine ekle
-                if "youtube_agent" in parallel_results:
-                    youtube_data = parallel_results["youtube_agent"]
-                    if youtube_data.get("status") == "success":
-                        youtube_raw = youtube_data.get("data", {})
-                        if "data" in youtube_raw:
-                            analysis_result["youtube_recommendations"] = youtube_raw["data"]
-                        else:
-                            analysis_result["youtube_recommendations"] = youtube_raw
-                
-                # Kitap önerilerini analiz verisine ekle
-                if "book_agent" in parallel_results:
-                    book_data = parallel_results["book_agent"]
-                    if book_data.get("status") == "success":
-                        book_raw = book_data.get("data", {})
-                        if "data" in book_raw:
-                            analysis_result["book_recommendations"] = book_raw["data"]
-                        else:
-                            analysis_result["book_recommendations"] = book_raw
-                
-                result["analysis"] = analysis_result
-                result["analysis_status"] = analysis_data.get("status", "error")
-                if analysis_data.get("status") == "error":
-                    result["analysis_error"] = analysis_data.get("error", "Bilinmeyen hata")
-            
-            # NOT: Backward compatibility alanları kaldırıldı - sadece analysis içinde tutuluyor
-            
-            # Önerileri database'e kaydet
-            await save_recommendations_to_db(db, current_user.id, parallel_results, result)
-            
-            # Paralel işlem bilgilerini ekle
-            result["parallel_processing"] = {
-                "enabled": True,
-                "execution_summary": parallel_result.get("execution_summary", {}),
-                "processing_time": "paralel"
-            }
-        else:
-            # Paralel sistem başarısız olursa fallback olarak eski sistemi kullan
-            from app.api.performance import analyze_exam_performance
-            analysis_result = await analyze_exam_performance(exam_id, current_user.id, db)
-            result["analysis"] = analysis_result.get("data", {}) if analysis_result.get("status") == "success" else None
-            result["analysis_status"] = analysis_result.get("status", "error")
-            result["parallel_processing"] = {
-                "enabled": False,
-                "error": parallel_result.get("error", "Paralel sistem kullanılamadı"),
-                "fallback": True
-            }
-        
+        job = enqueue_exam_analysis(current_user.id, exam_id)
+        result["analysis"] = None
+        result["analysis_status"] = job["status"]
+        result["analysis_job_id"] = job["id"]
     except Exception as e:
-        print(f"⚠️ Paralel agent sistemi hatası: {e}")
-        # Fallback: Eski sistem
-        try:
-            from app.api.performance import analyze_exam_performance
-            analysis_result = await analyze_exam_performance(exam_id, current_user.id, db)
-            result["analysis"] = analysis_result.get("data", {}) if analysis_result.get("status") == "success" else None
-            result["analysis_status"] = analysis_result.get("status", "error")
-        except Exception as fallback_error:
-            result["analysis"] = None
-            result["analysis_status"] = "error"
-            result["analysis_error"] = str(fallback_error)
-        
-        result["parallel_processing"] = {
-            "enabled": False,
-            "error": str(e),
-            "fallback": True
-        }
+        print(f"⚠️ Analiz işi kuyruğa alınamadı: {e}")
+        result["analysis"] = None
+        result["analysis_status"] = "error"
+        result["analysis_error"] = str(e)
     
     return result
 
+@router.get("/practice-exam/{exam_id}/analysis")
+async def get_exam_analysis_job(
+    exam_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    """Sınav analiz işinin durumu: pending / processing / done / failed (done ise analiz verisiyle)"""
+    analysis = get_exam_analysis_status(current_user.id, exam_id)
+    if analysis is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Bu sınav için analiz işi bulunamadı"
+        )
+    return analysis
+
 @router.get("/practice-exam/{exam_id}/results")
 async def get_exam_results(
     exam_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Sınav sonuçlarını getir - analiz verileriyle birlikte"""
     try:
-        exam_agent = ExamAgent()
         result = exam_agent.get_exam_results(db, exam_id, current_user.id)
         
-        # Eğer mevcut analiz yoksa, parallel agent service'ten kontrol et
-        if not result.get("analysis") or not result.get("analysis_status"):
+        # Sınav analiz işi varsa sonuç doğrudan iş kaydından okunur
+        analysis_job = get_exam_analysis_status(current_user.id, exam_id)
+        if analysis_job is not None:
+            if analysis_job["status"] == "done":
+                result["analysis"] = analysis_job["data"]
+                result["analysis_status"] = "success"
+            elif analysis_job["status"] == "failed":
+                result["analysis_status"] = "error"
+                result["analysis_error"] = analysis_job["error"]
+            else:
+                result["analysis_status"] = analysis_job["status"]
+            result["analysis_job_id"] = analysis_job["job_id"]
+        
+        # İş kaydı yoksa (eski sınavlar) kaydedilmiş önerilerden kontrol et
+        elif not result.get("analysis") or not result.get("analysis_status"):
             try:
                 from app.services.parallel_agent_service import parallel_agent_service
                 
@@ -319,20 +330,19 @@ async def get_exam_results(
 @router.get("/user/practice-exams", response_model=List[dict])
 async def get_user_exams(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Kullanıcının sınavlarını listele"""
-    exam_agent = ExamAgent()
-    return exam_agent.get_user_exams(db, current_user.id)
+    return await AsyncPracticeExamService.get_user_exams(db, current_user.id, limit=None)
 
 @router.get("/practice-exam/{exam_id}/details", response_model=dict)
 async def get_practice_exam_details(
     exam_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Detaylı sınav bilgisi al"""
-    exam_agent = ExamAgent()
     return exam_agent.get_practice_exam_details(db, exam_id, current_user.id)
 
 @router.get("/practice-exam/{exam_id}/questions", response_model=List[dict])
@@ -340,19 +350,19 @@ async def get_practice_exam_questions(
     exam_id: int,
     include_answers: bool = False,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Sınavdaki soruları getir (cevaplar dahil edilebilir)"""
-    exam_agent = ExamAgent()
     return exam_agent.get_practice_exam_questions(db, exam_id, current_user.id, include_answers)
 
 @router.get("/statistics", response_model=dict)
 async def get_exam_statistics(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Kullanıcının sınav istatistiklerini al"""
-    exam_agent = ExamAgent()
     return exam_agent.get_exam_statistics(db, current_user.id)
 
 @router.get("/questions/search", response_model=List[dict])
@@ -362,10 +372,10 @@ async def search_questions(
     difficulty_level: int = None,
     created_by: str = None,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Kriterlere göre soruları ara"""
-    exam_agent = ExamAgent()
     return exam_agent.get_questions_by_criteria(
         db, exam_type_id, section_id, difficulty_level, created_by, limit
     )
@@ -374,11 +384,10 @@ async def search_questions(
 async def review_practice_exam(
     exam_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    exam_agent: ExamAgent = Depends(get_exam_agent)
 ):
     """Tamamlanmış sınavı incele (soru-cevap detayları ile)"""
-    exam_agent = ExamAgent()
-    
     # Sınav detaylarını al
     exam_details = exam_agent.get_practice_exam_details(db, exam_id, current_user.id)
     
@@ -1,27 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app import schemas, models
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.core.auth_deps import get_current_user
 from app.models.user import User
 from app.models.performance import PerformanceAnalysis, ResourceRecommendation, RecommendationStatus
 from app.agents.master_agent import MasterAgent, AgentAction
-from app.services.ai_guidance_service import ai_guidance_service
+from app.agents.registry import get_master_agent
+from app.services.exam_analysis_service import load_exam_context, build_exam_analysis, get_exam_analysis_status
+from app.services.performance_rollup_service import performance_rollup_service
+from app.utils.sse import sse_response
 
 router = APIRouter(
     prefix="/performance",
     tags=["performance"]
 )
 
-# Initialize master agent for performance analysis
-master_agent = MasterAgent()
-
 @router.post("/analyze", response_model=dict)
 async def analyze_performance(
     subject: str,
     topic: str,
     education_level: str = "lise",
-    performance_data: dict = None
+    performance_data: dict = None,
+    master_agent: MasterAgent = Depends(get_master_agent)
 ):
     """Analyze performance using the agent system"""
     try:
@@ -50,292 +51,31 @@ async def analyze_exam_performance(
     """Sınav sonucu için paralel analiz ve öneri sistemi"""
     try:
         from app.services.parallel_agent_service import parallel_agent_service
-        from app.models.exam import PracticeExam, PracticeQuestionResult, ExamQuestion, ExamSection, ExamType
-        
-        # Sınav bilgilerini al
-        practice_exam = db.query(PracticeExam).filter(
-            PracticeExam.id == exam_id,
-            PracticeExam.user_id == user_id
-        ).first()
         
-        if not practice_exam:
+        context = load_exam_context(db, exam_id, user_id)
+        if context is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Sınav bulunamadı"
             )
         
-        # Sınav section ve type bilgilerini al
-        exam_section = db.query(ExamSection).filter(
-            ExamSection.id == practice_exam.exam_section_id
-        ).first()
-        
-        exam_type = None
-        if exam_section:
-            exam_type = db.query(ExamType).filter(
-                ExamType.id == exam_section.exam_type_id
-            ).first()
-        
-        # Soru sonuçlarını al
-        question_results = db.query(PracticeQuestionResult).filter(
-            PracticeQuestionResult.practice_exam_id == exam_id
-        ).all()
-        
-        # Yanlış cevaplanan soruların topic'lerini topla
-        wrong_topics = []
-        questions_with_topics = []
-        
-        for result in question_results:
-            if not result.is_correct:
-                question = db.query(ExamQuestion).filter(
-                    ExamQuestion.id == result.question_id
-                ).first()
-                
-                if question and question.topic_id:
-                    from app.models.education_level import CourseTopic
-                    topic = db.query(CourseTopic).filter(
-                        CourseTopic.id == question.topic_id
-                    ).first()
-                    
-                    if topic:
-                        wrong_topics.append(topic.name)
-                        questions_with_topics.append({
-                            "question_id": question.id,
-                            "topic_name": topic.name,
-                            "user_answer": result.user_answer,
-                            "correct_answer": question.correct_answer,
-                            "is_correct": result.is_correct
-                        })
-        
-        # Exam result verisi hazırla
-        exam_result = {
-            "totalQuestions": practice_exam.total_questions,
-            "correctAnswers": practice_exam.correct_answers,
-            "wrongAnswers": practice_exam.wrong_answers,
-            "emptyAnswers": practice_exam.empty_answers,
-            "accuracy": practice_exam.score,
-            "score": practice_exam.score,
-            "weak_topics": list(set(wrong_topics)),
-            "exam_section": exam_section.name if exam_section else "Genel",
-            "exam_type": exam_type.name if exam_type else "Deneme Sınavı",
-            "detailedAnswers": f"Toplam: {practice_exam.total_questions}, Doğru: {practice_exam.correct_answers}, Yanlış: {practice_exam.wrong_answers}, Boş: {practice_exam.empty_answers}",
-            "questionsWithTopics": questions_with_topics
-        }
+        # Arka plan işi analizi zaten tamamladıysa agent'ları tekrar çalıştırma
+        job = get_exam_analysis_status(user_id, exam_id)
+        if job and job["status"] == "done" and job["data"]:
+            return {"status": "success", "data": job["data"]}
         
         # Paralel agent servisi ile analiz ve önerileri al
         parallel_result = await parallel_agent_service.process_exam_results_parallel(
             db=db,
             user_id=user_id,
             exam_id=exam_id,
-            exam_result=exam_result
+            exam_result=context["exam_result"]
         )
         
-        if parallel_result.get("status") == "success":
-            results = parallel_result.get("results", {})
-            
-            # Base analysis data structure oluştur
-            analysis_data = {
-                "weakness_level": 5,  # Default value
-                "weak_topics": list(set(wrong_topics)),
-                "strong_topics": [],
-                "recommendations": [],
-                "detailed_analysis": "Analiz tamamlanıyor...",
-                "personalized_insights": [],
-                "improvement_trend": "Veri analiz ediliyor..."
-            }
-            
-            # Analiz sonucunu al ve merge et
-            if "analysis_agent" in results:
-                analysis_result = results["analysis_agent"]
-                if analysis_result.get("status") == "success":
-                    agent_data = analysis_result.get("data", {})
-                    # Nested data varsa içini al
-                    if "data" in agent_data:
-                        agent_data = agent_data["data"]
-                    
-                    # Merge analysis data
-                    analysis_data.update({
-                        "weakness_level": agent_data.get("weakness_level", 5),
-                        "weak_topics": agent_data.get("weak_topics", list(set(wrong_topics))),
-                        "strong_topics": agent_data.get("strong_topics", []),
-                        "recommendations": agent_data.get("recommendations", []),
-                        "detailed_analysis": agent_data.get("detailed_analysis", "Analiz tamamlandı."),
-                        "personalized_insights": agent_data.get("personalized_insights", []),
-                        "improvement_trend": agent_data.get("improvement_trend", "Veri yetersiz.")
-                    })
-            
-            # YouTube önerilerini ekle ve JSON-safe formata çevir
-            if "youtube_agent" in results:
-                youtube_result = results["youtube_agent"]
-                print(f"🔍 YouTube result: {youtube_result}")
-                if youtube_result.get("status") == "success":
-                    youtube_agent_data = youtube_result.get("data", {})
-                    # Nested data varsa içini al
-                    if "data" in youtube_agent_data:
-                        youtube_data = youtube_agent_data["data"]
-                    else:
-                        youtube_data = youtube_agent_data
-                    
-                    # JSON-safe formata çevir
-                    if "recommendations" in youtube_data:
-                        safe_videos = []
-                        for video in youtube_data["recommendations"]:
-                            safe_video = {
-                                "title": str(video.get("title", "")),
-                                "channel": str(video.get("channel", "")),
-                                "duration": str(video.get("duration", "")),
-                                "level": str(video.get("level", "lise")),
-                                "video_url": str(video.get("video_url", "")),
-                                "topics_covered": video.get("topics_covered", []),
-                                "why_recommended": str(video.get("why_recommended", "Bu video zayıf konularınız için önerilmiştir.")),
-                                "thumbnail_url": str(video.get("thumbnail_url", "")) if video.get("thumbnail_url") else None,
-                                "channel_url": str(video.get("channel_url", "")) if video.get("channel_url") else None
-                            }
-                            safe_videos.append(safe_video)
-                        
-                        analysis_data["youtube_recommendations"] = {
-                            "recommendations": safe_videos,
-                            "search_strategy": youtube_data.get("search_strategy", "YouTube videolar bulundu.")
-                        }
-            
-                        # Kitap önerilerini ekle ve JSON-safe formata çevir
-            if "book_agent" in results:
-                book_result = results["book_agent"]
-                print(f"🔍 Book result: {book_result}")
-                if book_result.get("status") == "success":
-                    book_agent_data = book_result.get("data", {})
-                    # Nested data varsa içini al
-                    if "data" in book_agent_data:
-                        book_data = book_agent_data["data"]
-                    else:
-                        book_data = book_agent_data
-                    
-                    # JSON-safe formata çevir
-                    if "recommendations" in book_data:
-                        safe_books = []
-                        for book in book_data["recommendations"]:
-                            safe_book = {
-                                "title": str(book.get("title", "")),
-                                "author": str(book.get("author", "")),
-                                "publisher": str(book.get("publisher", "")),
-                                "year": 2024,  # Default year
-                                "price": str(book.get("price", "")) if book.get("price") else None,
-                                "stock_status": str(book.get("stock_status", "")).replace("<StockStatus.", "").replace(">", "").split(":")[0] if book.get("stock_status") else "available",
-                                "purchase_links": [str(book.get("url", ""))] if book.get("url") else [],
-                                "topics_covered": book.get("key_topics", []),
-                                "difficulty_level": book.get("target_audience", "Lise"),
-                                "why_recommended": book.get("description", "Bu kitap zayıf konularınız için önerilmiştir."),
-                                "cover_image": None
-                            }
-                            safe_books.append(safe_book)
-                        
-                        analysis_data["book_recommendations"] = {
-                            "recommendations": safe_books,
-                            "search_summary": book_data.get("search_summary", "Kitap önerileri bulundu.")
-                        }
-            
-            # Exam bilgilerini ekle
-            analysis_data["exam_info"] = {
-                "exam_id": exam_id,
-                "exam_type": exam_type.name if exam_type else "Bilinmiyor",
-                "exam_section": exam_section.name if exam_section else "Bilinmiyor", 
-                "score": practice_exam.score,
-                "completion_date": practice_exam.end_time.isoformat() if practice_exam.end_time else None
-            }
-            
-            # İşlem bilgilerini ekle
-            analysis_data["parallel_processing"] = {
-                "enabled": True,
-                "execution_summary": parallel_result.get("execution_summary", {}),
-                "processing_time": "paralel"
-            }
-            
-            # Önerileri database'e kaydet
-            try:
-                from app.api.exam import save_recommendations_to_db
-                exam_result_data = {
-                    "total_questions": exam_result.get("total_questions", 0),
-                    "correct_answers": exam_result.get("correct_answers", 0),
-                    "percentage": exam_result.get("percentage", 0.0)
-                }
-                await save_recommendations_to_db(db, user_id, results, exam_result_data)
-                analysis_data["recommendations_saved"] = True
-            except Exception as e:
-                print(f"❌ Error saving recommendations: {e}")
-                analysis_data["recommendations_saved"] = False
-                analysis_data["save_error"] = str(e)
-            
-            # Sınav sonucunu memory'e kaydet
-            try:
-                # Zayıflık analizi için memory kaydı
-                await ai_guidance_service.memory_service.store_weakness_analysis(
-                    user_id=str(user_id),
-                    analysis_data={
-                        "subject": exam_section.name if exam_section else "Genel",
-                        "topic": exam_type.name if exam_type else "Deneme Sınavı",
-                        "weakness_level": analysis_data.get("weakness_level", 5),
-                        "weak_topics": analysis_data.get("weak_topics", []),
-                        "strong_topics": analysis_data.get("strong_topics", []),
-                        "recommendations": analysis_data.get("recommendations", []),
-                        "detailed_analysis": analysis_data.get("detailed_analysis", "")
-                    }
-                )
-                
-                # Öğrenme seansı için memory kaydı
-                session_data = {
-                    "subject": exam_section.name if exam_section else "Genel", 
-                    "topic": exam_type.name if exam_type else "Deneme Sınavı",
-                    "education_level": "lise",
-                    "accuracy": practice_exam.score,
-                    "total_questions": practice_exam.total_questions,
-                    "correct_answers": practice_exam.correct_answers,
-                    "wrong_answers": practice_exam.wrong_answers,
-                    "empty_answers": practice_exam.empty_answers,
-                    "timestamp": practice_exam.end_time.isoformat() if practice_exam.end_time else None
-                }
-                
-                await ai_guidance_service.memory_service.store_learning_session(
-                    user_id=str(user_id),
-                    session_data=session_data
-                )
-                
-                analysis_data["memory_stored"] = True
-                
-            except Exception as e:
-                print(f"❌ Error storing to memory: {e}")
-                analysis_data["memory_stored"] = False
-                analysis_data["memory_error"] = str(e)
-            
-            return {
-                "status": "success",
-                "data": analysis_data
-            }
-        else:
-            # Paralel işlem başarısız oldu, fallback olarak normal analiz yap
-            from app.agents.analysis_agent import AnalysisAgent
-            analysis_agent = AnalysisAgent()
-            
-            input_data = {
-                "user_id": str(user_id),
-                "subject": exam_section.name if exam_section else "Genel",
-                "topic": exam_type.name if exam_type else "Deneme Sınavı",
-                "education_level": "lise",
-                "performance_data": exam_result
-            }
-            
-            result = await analysis_agent.process(input_data)
-            
-            # Exam bilgilerini ekle
-            if result.get("status") == "success":
-                result["data"]["exam_info"] = {
-                    "exam_id": exam_id,
-                    "exam_type": exam_type.name if exam_type else "Bilinmiyor",
-                    "exam_section": exam_section.name if exam_section else "Bilinmiyor",
-                    "score": practice_exam.score,
-                    "completion_date": practice_exam.end_time.isoformat() if practice_exam.end_time else None
-                }
-            
-            return result
+        return await build_exam_analysis(db, exam_id, user_id, context, parallel_result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -344,6 +84,42 @@ async def analyze_exam_performance(
             detail=f"Sınav analizi hatası: {str(e)}"
         )
 
+@router.post("/analyze-exam/stream")
+async def analyze_exam_performance_stream(
+    exam_id: int,
+    user_id: int,
+    db: Session = Depends(get_db)
+):
+    """``/analyze-exam`` SSE modu: her agent sonucu tamamlandığında ``agent_result`` olayı gönderilir"""
+    from app.services.parallel_agent_service import parallel_agent_service
+    
+    # 404 gibi hatalar akış başlamadan normal HTTP yanıtı olarak dönsün
+    context = load_exam_context(db, exam_id, user_id)
+    if context is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sınav bulunamadı"
+        )
+    
+    async def events():
+        async for event, data in parallel_agent_service.iter_exam_results_parallel(
+            user_id=user_id,
+            exam_id=exam_id,
+            exam_result=context["exam_result"]
+        ):
+            if event != "result":
+                yield event, data
+                continue
+            # İstek session'ı yanıt akarken kapanmış olabilir; kayıtlar için ayrı session
+            stream_db = SessionLocal()
+            try:
+                yield "result", await build_exam_analysis(stream_db, exam_id, user_id, context, data)
+            finally:
+                stream_db.close()
+    
+    return sse_response(events())
+
+
 @router.post("/", response_model=schemas.PerformanceAnalysis)
 def create_performance_analysis(
     analysis: schemas.PerformanceAnalysisCreate,
@@ -381,6 +157,7 @@ def create_performance_analysis(
     # Create new performance analysis
     db_analysis = PerformanceAnalysis(**analysis.dict())
     db.add(db_analysis)
+    performance_rollup_service.apply(db, db_analysis)
     db.commit()
     db.refresh(db_analysis)
     
@@ -678,11 +455,6 @@ def get_resource_recommendations(
 # Dashboard endpoint
 # ---------------------------------------------------------------
 
-from sqlalchemy import func
-from datetime import datetime, timedelta, timezone
-from collections import defaultdict
-
-
 @router.get("/dashboard/{user_id}")
 def get_performance_dashboard(user_id: int, db: Session = Depends(get_db)):
     """Aggregated statistics for the React dashboard."""
@@ -692,17 +464,8 @@ def get_performance_dashboard(user_id: int, db: Session = Depends(get_db)):
     if not user_exists:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Overall stats
-    overall = db.query(
-        func.coalesce(func.sum(PerformanceAnalysis.total_questions), 0),
-        func.coalesce(func.sum(PerformanceAnalysis.correct_answers), 0),
-        func.count(PerformanceAnalysis.id),
-    ).filter(PerformanceAnalysis.user_id == user_id).one()
-
-    total_questions, total_correct, session_count = overall
-    overall_accuracy = (
-        (total_correct / total_questions) * 100 if total_questions > 0 else 0.0
-    )
+    # Toplamlar, ders kırılımı, zayıf konular ve ilerleme günlük özet tablosundan tek sorguyla
+    aggregates = performance_rollup_service.get_dashboard_aggregates(db, user_id)
 
     # Recent performance (last 10 analyses)
     recent = (
@@ -713,97 +476,10 @@ def get_performance_dashboard(user_id: int, db: Session = Depends(get_db)):
         .all()
     )
 
-    # Subject breakdown (include analyses without a subject_id by outer joining)
-    subject_stats = (
-        db.query(
-            models.Subject.name.label("subject_name"),
-            func.coalesce(func.sum(PerformanceAnalysis.correct_answers), 0).label("correct"),
-            func.coalesce(func.sum(PerformanceAnalysis.total_questions), 0).label("total"),
-        )
-        .outerjoin(models.Subject, models.Subject.id == PerformanceAnalysis.subject_id)
-        .filter(PerformanceAnalysis.user_id == user_id)
-        .group_by(models.Subject.name)
-        .all()
-    )
-
-    subject_breakdown = [
-        {
-            "subject_name": s.subject_name if s.subject_name else "Genel",
-            "accuracy": (s.correct / s.total) * 100 if s.total else 0.0,
-            "question_count": s.total,
-        }
-        for s in subject_stats
-    ]
-
-    # Weakness areas (top 5 highest weakness_level)
-    weak_areas = (
-        db.query(
-            models.Topic.name.label("topic_name"),
-            models.Subject.name.label("subject_name"),
-            PerformanceAnalysis.weakness_level,
-        )
-        .join(models.Topic, models.Topic.id == PerformanceAnalysis.topic_id)
-        .join(models.Subject, models.Subject.id == PerformanceAnalysis.subject_id)
-        .filter(PerformanceAnalysis.user_id == user_id)
-        .order_by(PerformanceAnalysis.weakness_level.desc())
-        .limit(5)
-        .all()
-    )
-
-    weakness_areas = [
-        {
-            "topic_name": w.topic_name,
-            "subject_name": w.subject_name,
-            "weakness_level": w.weakness_level,
-            "recommendation_count": 0,
-        }
-        for w in weak_areas
-    ]
-
-    # Progress chart – build a continuous daily series for the last 7 days (including today)
-    raw_progress = (
-        db.query(
-            PerformanceAnalysis.created_at.label("date"),
-            PerformanceAnalysis.accuracy.label("accuracy"),
-        )
-        .filter(PerformanceAnalysis.user_id == user_id)
-        .order_by(PerformanceAnalysis.created_at.asc())
-        .limit(200)
-        .all()
-    )
-
-    # Aggregate by date (average accuracy per day)
-    date_to_values: dict = defaultdict(list)
-    for p in raw_progress:
-        dt = p.date
-        try:
-            day = dt.date()
-        except Exception:
-            # Fallback if dt is str
-            day = datetime.fromisoformat(str(dt)).date()
-        if p.accuracy is not None:
-            date_to_values[day].append(float(p.accuracy))
-
-    date_to_avg = {d: (sum(vals) / len(vals)) for d, vals in date_to_values.items()}
-
-    # Generate last 7 days range inclusive of today
-    today = datetime.now(timezone.utc).date()
-    start_day = today - timedelta(days=6)
-    days = [start_day + timedelta(days=i) for i in range(7)]
-
-    progress_chart = [
-        {"date": d.isoformat(), "accuracy": float(date_to_avg.get(d, 0.0))} for d in days
-    ]
-
     return {
-        "overall_stats": {
-            "total_questions": total_questions,
-            "total_correct": total_correct,
-            "overall_accuracy": overall_accuracy,
-            "total_sessions": session_count,
-        },
+        "overall_stats": aggregates["overall_stats"],
         "recent_performance": recent,
-        "subject_breakdown": subject_breakdown,
-        "weakness_areas": weakness_areas,
-        "progress_chart": progress_chart,
+        "subject_breakdown": aggregates["subject_breakdown"],
+        "weakness_areas": aggregates["weakness_areas"],
+        "progress_chart": aggregates["progress_chart"],
     }
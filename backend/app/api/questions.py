@@ -4,9 +4,12 @@ from app import schemas, models
 from app.database import get_db
 # from app.core.langchain_integration import langchain_integration  # Removed
 from app.agents.question_agent import QuestionAgent
+from app.agents.registry import get_question_agent
 from app.core.auth_deps import get_current_user
 from app.models.user import User
 from app.services.ai_guidance_service import ai_guidance_service
+from app.services.llm_cache import bypass_llm_cache
+from app.utils.sse import sse_response
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -32,8 +35,6 @@ router = APIRouter(
     tags=["questions"]
 )
 
-question_agent = QuestionAgent()
-
 
 @router.post("/generate", response_model=schemas.QuestionGenerationResponse)
 async def generate_questions(
@@ -42,17 +43,20 @@ async def generate_questions(
     difficulty: str = Query(...),
     count: int = Query(5, ge=1, le=20, description="Number of questions to generate"),
     education_level: str = Query("lise", description="Education level: ilkokul, ortaokul, or lise"),
-    db: Session = Depends(get_db)
+    no_cache: bool = Query(False, description="Skip the LLM response cache for this request"),
+    db: Session = Depends(get_db),
+    question_agent: QuestionAgent = Depends(get_question_agent)
 ):
     try:
         # Delegate to QuestionAgent
-        agent_response = await question_agent.process({
-            "subject": subject,
-            "topic": topic,
-            "difficulty": difficulty,
-            "count": count,
-            "education_level": education_level,
-        })
+        with bypass_llm_cache(no_cache):
+            agent_response = await question_agent.process({
+                "subject": subject,
+                "topic": topic,
+                "difficulty": difficulty,
+                "count": count,
+                "education_level": education_level,
+            })
 
         if agent_response.get("status") != "success":
             raise ValueError(agent_response.get("error", "Unknown error"))
@@ -66,6 +70,30 @@ async def generate_questions(
             detail=f"Error generating questions: {str(e)}"
         )
 
+@router.post("/generate/stream")
+async def generate_questions_stream(
+    subject: str = Query(...),
+    topic: str = Query(...),
+    difficulty: str = Query(...),
+    count: int = Query(5, ge=1, le=20, description="Number of questions to generate"),
+    education_level: str = Query("lise", description="Education level: ilkokul, ortaokul, or lise"),
+    no_cache: bool = Query(False, description="Skip the LLM response cache for this request"),
+    question_agent: QuestionAgent = Depends(get_question_agent)
+):
+    """``/generate`` SSE modu: her soru parse edildiğinde ``question`` olayı, en sonda ``result`` gönderilir"""
+    async def events():
+        with bypass_llm_cache(no_cache):
+            async for event in question_agent.stream_questions({
+                "subject": subject,
+                "topic": topic,
+                "difficulty": difficulty,
+                "count": count,
+                "education_level": education_level,
+            }):
+                yield event
+
+    return sse_response(events())
+
 @router.post("/", response_model=schemas.Question)
 def create_question(question: schemas.QuestionCreate, db: Session = Depends(get_db)):
     # Check if topic exists
@@ -100,6 +128,7 @@ def get_question(question_id: int, db: Session = Depends(get_db)):
 @router.post("/evaluate", response_model=dict)
 async def evaluate_answer(
     request: EvaluateRequest,
+    question_agent: QuestionAgent = Depends(get_question_agent)
 ):
     try:
         evaluation_response = await question_agent.evaluate_answer(
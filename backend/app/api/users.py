@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from app import schemas, models
 from app.schemas.user import PasswordChange
 from app.database import get_db
-from app.core.auth_deps import get_current_user
+from app.core.auth_deps import get_current_user, invalidate_user_principal
 from app.models.user import User
 from typing import List
 
@@ -40,6 +40,7 @@ def update_current_user_profile(
     
     db.commit()
     db.refresh(current_user)
+    invalidate_user_principal(current_user.id)
     
     return current_user
 
@@ -60,6 +61,7 @@ def delete_current_user_account(
     # Hesabı pasif yap (hard delete yerine soft delete)
     current_user.is_active = False
     db.commit()
+    invalidate_user_principal(current_user.id)
     
     return {"message": "Hesabınız başarıyla devre dışı bırakıldı"}
 
@@ -80,5 +82,6 @@ def change_password(
     # Yeni şifreyi set et
     current_user.set_password(password_data.new_password)
     db.commit()
+    invalidate_user_principal(current_user.id)
     
     return {"message": "Şifre başarıyla değiştirildi"}
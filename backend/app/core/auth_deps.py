@@ -1,12 +1,17 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Dict, Optional
+import hashlib
+import time
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from app.database import get_db
 from app.models import User
 from app.core.config import settings
+from app.utils.cache import MISSING, TTLCache
 
 # JWT configuration
 SECRET_KEY = settings.JWT_SECRET_KEY
@@ -24,6 +29,14 @@ security_optional = HTTPBearer(
     auto_error=False,
 )
 
+# Doğrulanmış token -> kullanıcı anlık görüntüsü; her istekte User sorgusunu atlar.
+# Anahtar (user_id, jti) - jti'siz eski token'lar için token hash'i kullanılır.
+_principal_cache = TTLCache(
+    maxsize=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+    name="auth_principals",
+)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -33,6 +46,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -50,6 +64,44 @@ def verify_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
+def _principal_key(token: str, payload: Dict[str, Any]) -> tuple:
+    token_id = payload.get("jti") or hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return payload.get("user_id"), token_id
+
+def _snapshot(user: User) -> User:
+    """Oturumdan bağımsız, yalnızca kolon değerlerini taşıyan kopya"""
+    snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def _load_principal(db: Session, token: str, payload: Dict[str, Any]) -> Optional[User]:
+    """Token sahibini önce cache'den, yoksa veritabanından getir.
+
+    Cache'deki kopya ``merge(load=False)`` ile isteğin oturumuna SQL çalıştırmadan
+    bağlanır; route'lar kullanıcıyı her zamanki gibi değiştirip commit edebilir.
+    """
+    key = _principal_key(token, payload)
+    cached = _principal_cache.get(key)
+    if cached is not MISSING:
+        return db.merge(cached, load=False)
+
+    user = db.query(User).filter(User.id == key[0]).first()
+    if user is None:
+        return None
+
+    ttl = settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        # Token'ın süresinden uzun tutma
+        ttl = min(ttl, float(expires_at) - time.time())
+    if ttl > 0:
+        _principal_cache.set(key, _snapshot(user), ttl=ttl)
+    return user
+
+def invalidate_user_principal(user_id: int) -> int:
+    """Kullanıcının tüm token'larına ait cache kayıtlarını sil (yetki/durum değişince)"""
+    return _principal_cache.invalidate(lambda key: key[0] == user_id)
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -69,7 +121,7 @@ def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _load_principal(db, credentials.credentials, payload)
     if user is None:
         raise credentials_exception
     
@@ -89,8 +141,7 @@ def get_current_user_optional(
         user_id: Optional[int] = payload.get("user_id")
         if user_id is None:
             return None
-        user = db.query(User).filter(User.id == user_id).first()
-        return user
+        return _load_principal(db, credentials.credentials, payload)
     except Exception:
         return None
 
@@ -8,6 +8,12 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./eduai.db"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
     
     # API Keys
     GEMINI_API_KEY: Optional[str] = None
@@ -15,10 +21,98 @@ class Settings(BaseSettings):
     YOUTUBE_API_KEY: Optional[str] = None
     TAVILY_API_KEY: Optional[str] = None
     
+    # Tavily search - shared executor (bounded concurrency, token bucket, query cache)
+    TAVILY_MAX_CONCURRENCY: int = 4
+    TAVILY_RATE_PER_SECOND: float = 5.0
+    TAVILY_CACHE_TTL_SECONDS: float = 21600.0
+    TAVILY_CACHE_SIZE: int = 512
+    
+    # Outbound HTTP - shared aiohttp connection pool and book stock-status cache
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 10
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    BOOK_STOCK_CACHE_TTL_SECONDS: float = 1800.0
+    BOOK_STOCK_CACHE_SIZE: int = 2048
+    BOOK_STOCK_MAX_BYTES: int = 2_000_000
+    
+    # YouTube Data API - topic search cache (quota is the hard limit) and parallel searches
+    YOUTUBE_SEARCH_CONCURRENCY: int = 4
+    YOUTUBE_CACHE_TTL_SECONDS: float = 86400.0
+    YOUTUBE_CACHE_SIZE: int = 1024
+    YOUTUBE_CACHE_PATH: Optional[str] = "./youtube_cache.db"
+    
+    # Memory (Mem0) access
+    MEMORY_EXECUTOR_WORKERS: int = 4
+    MEMORY_CALL_TIMEOUT_SECONDS: float = 20.0
+    MEMORY_MAX_PENDING: int = 64
+    MEMORY_WRITE_BEHIND: bool = True
+    MEMORY_WRITE_QUEUE_PATH: str = "./memory_queue.db"
+    MEMORY_WRITE_BATCH_SIZE: int = 100
+    MEMORY_WRITE_MAX_ATTEMPTS: int = 5
+    MEMORY_CACHE_SIZE: int = 2048
+    MEMORY_CACHE_TTL_SECONDS: float = 300.0
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache.db"
+    
+    # LLM response cache (opt-in) - TTL seconds per agent name
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_PATH: Optional[str] = "./llm_cache.db"
+    LLM_CACHE_SIZE: int = 1024
+    LLM_CACHE_TTLS: dict = {
+        "Master Agent": 86400,
+        "Analysis Agent": 3600,
+        "Question Agent": 600,
+    }
+    
+    # Exam question pool - background filler keeps stock so exam start never waits on AI generation
+    QUESTION_POOL_ENABLED: bool = True
+    QUESTION_POOL_FILLER_ENABLED: bool = True
+    QUESTION_POOL_TARGET_EXAMS: int = 3
+    QUESTION_POOL_BATCH_SIZE: int = 10
+    QUESTION_POOL_REFILL_INTERVAL_SECONDS: float = 300.0
+    QUESTION_POOL_DIFFICULTY_MIX: dict = {"1": 0.3, "2": 0.5, "3": 0.2}
+    QUESTION_SAMPLER_REFRESH_SECONDS: float = 300.0
+    
+    # Local intent router in front of MasterAgent general-query LLM routing
+    INTENT_ROUTER_ENABLED: bool = True
+    INTENT_ROUTER_MIN_CONFIDENCE: float = 0.75
+    INTENT_ROUTER_MODEL_MIN_CONFIDENCE: float = 0.9
+    INTENT_ROUTER_PATH: Optional[str] = "./intent_router.db"
+    
+    # Exam config (app/data/*.json) - parsed once, file mtimes re-checked at most this often
+    EXAM_CONFIG_RELOAD_INTERVAL_SECONDS: float = 5.0
+    
+    # Async bridge - shared background event loop for sync code paths that call async agents
+    ASYNC_BRIDGE_TIMEOUT_SECONDS: Optional[float] = 300.0
+    
+    # Question dedup index - MinHash/LSH near-duplicate check per exam section
+    QUESTION_DEDUP_ENABLED: bool = True
+    QUESTION_DEDUP_INDEX_PATH: str = "./question_dedup.db"
+    QUESTION_DEDUP_NUM_PERM: int = 64
+    QUESTION_DEDUP_BANDS: int = 16
+    QUESTION_DEDUP_THRESHOLD: float = 0.8
+    
+    # Agent registry - build every agent (and its Gemini client) once at startup instead of on first request
+    AGENT_WARMUP_ON_STARTUP: bool = True
+    
+    # Index advisor - statements slower than the threshold are grouped and checked against existing indexes
+    INDEX_ADVISOR_ENABLED: bool = True
+    INDEX_ADVISOR_SLOW_QUERY_MS: float = 100.0
+    INDEX_ADVISOR_MAX_STATEMENTS: int = 200
+    
+    # Background jobs (post-exam analysis) - persistent SQLite queue with retries
+    JOB_QUEUE_PATH: str = "./job_queue.db"
+    JOB_QUEUE_WORKERS: int = 2
+    JOB_QUEUE_MAX_ATTEMPTS: int = 3
+    JOB_QUEUE_RETRY_BASE_DELAY_SECONDS: float = 10.0
+    
     # JWT Authentication
     JWT_SECRET_KEY: str = "your-secret-key-here"
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Principal cache - verified token -> user snapshot, skips the user query on every request
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 4096
     
     # Default Admin User
     DEFAULT_ADMIN_PASSWORD: str = "admin123"
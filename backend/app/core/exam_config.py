@@ -0,0 +1,243 @@
+"""
+Sınav konfigürasyonu (app/data/*.json) için önbellekli, sıcak yeniden yüklenen depo.
+
+Dosyalar bir kez okunup değişmez yapılara dönüştürülür: sınav türü + bölüm ->
+soru sayısı, konu dağılımı (konu adları, soru sayıları, alt konular) ve AI
+prompt talimatı. Okuyucular yalnızca hazır ``ExamConfigSnapshot`` nesnesini
+kullanır; dosya mtime'ları en fazla ``check_interval`` saniyede bir kontrol
+edilir ve değiştiyse yeni snapshot oluşturulup tek atamayla yerine konur.
+Bozuk bir dosya (ör. yarım yazılmış) yüklenemezse eski snapshot kullanılmaya
+devam eder.
+"""
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+QUESTION_COUNTS_FILE = "exam_question_counts.json"
+DISTRIBUTION_FILE = "subject_question_distribution.json"
+AI_PROMPTS_FILE = "ai_prompts.json"
+_FILES = (QUESTION_COUNTS_FILE, DISTRIBUTION_FILE, AI_PROMPTS_FILE)
+
+DEFAULT_QUESTION_COUNT = 20
+
+SectionKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class SectionDistribution:
+    """Bölümün konu dağılımı; ``counts`` konu sırasıyla hizalı ağırlık dizisidir"""
+    total_questions: int
+    topics: Tuple[str, ...]
+    counts: Tuple[int, ...]
+    subtopics: Tuple[Tuple[str, ...], ...]
+
+    def allocate(self, total_count: int) -> Dict[str, Any]:
+        """Dağılımı ``total_count`` soruya ölçekle (largest remainder).
+
+        - Oranları hesapla (float).
+        - Aşağı doğru taban (floor) ile ilk atama yap.
+        - Kalan (remainder) kadar en büyük küsuratlılara +1 dağıt.
+        """
+        ratio = float(total_count) / float(max(1, self.total_questions))
+        floors = []
+        for index, count in enumerate(self.counts):
+            raw = count * ratio
+            floors.append((index, int(raw), raw - int(raw)))
+        remainder = total_count - sum(base for _, base, _ in floors)
+        floors.sort(key=lambda item: item[2], reverse=True)
+
+        topics = {}
+        for rank, (index, base, _frac) in enumerate(floors):
+            topics[self.topics[index]] = {
+                "question_count": base + (1 if rank < remainder else 0),
+                "subtopics": list(self.subtopics[index]),
+            }
+        return {"topics": topics, "total_questions": total_count}
+
+
+@dataclass(frozen=True)
+class ExamConfigSnapshot:
+    """Tek bir yüklemenin değişmez görüntüsü"""
+    question_counts: Mapping[str, Mapping[str, int]]
+    distributions: Mapping[SectionKey, SectionDistribution]
+    prompts: Mapping[SectionKey, str]
+    mtimes: Tuple[float, ...] = ()
+    loaded_at: float = 0.0
+    # Kısmi eşleşme için küçük harfli bölüm adları: exam_type -> ((lower, count), ...)
+    _lowered_counts: Mapping[str, Tuple[Tuple[str, int], ...]] = field(default_factory=dict, repr=False)
+
+    def question_count(self, exam_type: str, section_name: str) -> Optional[int]:
+        """Tam eşleşme, yoksa isim içerme (kısmi) eşleşmesiyle soru sayısı"""
+        section_counts = self.question_counts.get(exam_type)
+        if section_counts is None:
+            return None
+        if section_name in section_counts:
+            return section_counts[section_name]
+        lowered = section_name.lower()
+        for key, count in self._lowered_counts.get(exam_type, ()):
+            if lowered in key or key in lowered:
+                return count
+        return None
+
+    def distribution(self, exam_type: str, section_name: str) -> Optional[SectionDistribution]:
+        return self.distributions.get((exam_type, section_name))
+
+    def prompt(self, exam_type: str, section_name: str) -> Optional[str]:
+        return self.prompts.get((exam_type, section_name))
+
+    def question_counts_dict(self) -> Dict[str, Dict[str, int]]:
+        """JSON yanıtları için düz dict kopyası"""
+        return {exam_type: dict(sections) for exam_type, sections in self.question_counts.items()}
+
+    def distributions_dict(self) -> Dict[str, Dict[str, Any]]:
+        result: Dict[str, Dict[str, Any]] = {}
+        for (exam_type, section_name), distribution in self.distributions.items():
+            result.setdefault(exam_type, {})[section_name] = {
+                "total_questions": distribution.total_questions,
+                "topics": {
+                    topic: {"question_count": count, "subtopics": list(subtopics)}
+                    for topic, count, subtopics in zip(distribution.topics, distribution.counts, distribution.subtopics)
+                },
+            }
+        return result
+
+    def prompts_dict(self) -> Dict[str, Dict[str, str]]:
+        result: Dict[str, Dict[str, str]] = {}
+        for (exam_type, section_name), prompt in self.prompts.items():
+            result.setdefault(exam_type, {})[section_name] = prompt
+        return result
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        logger.warning(f"Exam config file not found: {path}")
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{os.path.basename(path)} must contain a JSON object")
+    return data
+
+
+def build_snapshot(
+    question_counts: Dict[str, Any],
+    distributions: Dict[str, Any],
+    prompts: Dict[str, Any],
+    mtimes: Tuple[float, ...] = ()
+) -> ExamConfigSnapshot:
+    """Ham JSON içeriklerinden doğrulanmış, değişmez snapshot oluştur"""
+    counts = {
+        exam_type: MappingProxyType({section: int(count) for section, count in sections.items()})
+        for exam_type, sections in question_counts.items()
+    }
+    lowered = {
+        exam_type: tuple((section.lower(), count) for section, count in sections.items())
+        for exam_type, sections in counts.items()
+    }
+
+    section_distributions: Dict[SectionKey, SectionDistribution] = {}
+    for exam_type, sections in distributions.items():
+        for section_name, distribution in sections.items():
+            topics = distribution.get("topics", {})
+            section_distributions[(exam_type, section_name)] = SectionDistribution(
+                total_questions=int(distribution.get("total_questions") or sum(
+                    int(topic["question_count"]) for topic in topics.values()
+                )),
+                topics=tuple(topics),
+                counts=tuple(int(topic["question_count"]) for topic in topics.values()),
+                subtopics=tuple(tuple(topic.get("subtopics", ())) for topic in topics.values()),
+            )
+
+    section_prompts = {
+        (exam_type, section_name): str(prompt)
+        for exam_type, sections in prompts.items()
+        for section_name, prompt in sections.items()
+    }
+
+    return ExamConfigSnapshot(
+        question_counts=MappingProxyType(counts),
+        distributions=MappingProxyType(section_distributions),
+        prompts=MappingProxyType(section_prompts),
+        mtimes=mtimes,
+        loaded_at=time.time(),
+        _lowered_counts=MappingProxyType(lowered),
+    )
+
+
+class ExamConfigStore:
+    """mtime değiştiğinde atomik olarak yeniden yüklenen snapshot sahibi"""
+
+    def __init__(self, data_dir: str = DATA_DIR, check_interval: float = 5.0):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ExamConfigSnapshot] = None
+        self._next_check = 0.0
+        self._reloads = 0
+        self._reload_errors = 0
+
+    def _paths(self) -> Tuple[str, ...]:
+        return tuple(os.path.join(self.data_dir, filename) for filename in _FILES)
+
+    def _mtimes(self) -> Tuple[float, ...]:
+        return tuple(os.path.getmtime(path) if os.path.exists(path) else 0.0 for path in self._paths())
+
+    def snapshot(self) -> ExamConfigSnapshot:
+        """Güncel snapshot; kontrol aralığı dolduysa mtime'lara bakıp gerekirse yeniden yükle"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+        return self.reload(force=False)
+
+    def reload(self, force: bool = True) -> ExamConfigSnapshot:
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            mtimes = self._mtimes()
+            if self._snapshot is not None and not force and mtimes == self._snapshot.mtimes:
+                return self._snapshot
+            try:
+                counts_path, distribution_path, prompts_path = self._paths()
+                snapshot = build_snapshot(
+                    _read_json(counts_path),
+                    _read_json(distribution_path),
+                    _read_json(prompts_path),
+                    mtimes=mtimes,
+                )
+            except Exception as e:
+                self._reload_errors += 1
+                if self._snapshot is None:
+                    logger.error(f"Exam config could not be loaded: {e}")
+                    self._snapshot = build_snapshot({}, {}, {})
+                else:
+                    logger.warning(f"Exam config reload failed, keeping previous snapshot: {e}")
+                return self._snapshot
+            self._snapshot = snapshot
+            self._reloads += 1
+            logger.info(f"Exam config loaded from {self.data_dir} ({len(snapshot.distributions)} section distributions)")
+            return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "exam_types": sorted(snapshot.question_counts) if snapshot else [],
+            "reloads": self._reloads,
+            "reload_errors": self._reload_errors,
+            "check_interval": self.check_interval,
+        }
+
+
+# Global instance
+exam_config = ExamConfigStore(check_interval=settings.EXAM_CONFIG_RELOAD_INTERVAL_SECONDS)
@@ -1,15 +1,208 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
+from sqlalchemy.pool import QueuePool
+from typing import Any, Dict, Optional
+import threading
+import time
+
+from app.core.config import settings
+from app.utils.index_advisor import index_advisor
+
+# Database URL - .env / ortam değişkeninden (varsayılan: yerel SQLite)
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+
+
+class PoolMetrics:
+    """Connection pool checkout/bekleme metrikleri"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """Bağlantı almak için geçen bekleme süresini ölçen QueuePool"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Her yeni SQLite bağlantısı için WAL ve eşzamanlılık ayarları"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
+
+def _attach_pool_metrics(engine: Engine) -> None:
+    event.listen(engine, "connect", lambda *args: pool_metrics.increment("connects"))
+    event.listen(engine, "checkout", lambda *args: pool_metrics.increment("checkouts"))
+    event.listen(engine, "checkin", lambda *args: pool_metrics.increment("checkins"))
+
+
+def _normalize_database_url(database_url: str) -> str:
+    # Bazı platformlar eski "postgres://" şemasını verir
+    if database_url.startswith("postgres://"):
+        database_url = "postgresql://" + database_url[len("postgres://"):]
+    return database_url
+
+
+def create_db_engine(database_url: Optional[str] = None) -> Engine:
+    """DATABASE_URL'e göre yapılandırılmış engine oluştur.
+
+    - PostgreSQL: boyutlandırılmış QueuePool, pre-ping ve recycle
+    - SQLite (dosya): WAL, synchronous=NORMAL, mmap_size ve busy_timeout
+    """
+    database_url = _normalize_database_url(database_url or SQLALCHEMY_DATABASE_URL)
+    url = make_url(database_url)
+
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # Bellek içi veritabanı (testler) - pool/WAL ayarı anlamsız
+            return create_engine(database_url, connect_args={"check_same_thread": False})
+
+        engine = create_engine(
+            database_url,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    else:
+        engine = create_engine(
+            database_url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+
+    _attach_pool_metrics(engine)
+    index_advisor.attach(engine)
+    return engine
+
+
+# Senkron sürücü -> async sürücü eşlemesi
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_database_url(database_url: Optional[str] = None) -> str:
+    """DATABASE_URL'i async sürücülü karşılığına çevir (aiosqlite / asyncpg)"""
+    url = make_url(_normalize_database_url(database_url or SQLALCHEMY_DATABASE_URL))
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"Async driver not configured for backend: {url.get_backend_name()}")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """Senkron engine ile aynı pool/PRAGMA ayarlarıyla async engine oluştur"""
+    async_url = to_async_database_url(database_url)
+    url = make_url(async_url)
+
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            async_engine = create_async_engine(async_url)
+            index_advisor.attach(async_engine.sync_engine)
+            return async_engine
+        async_engine = create_async_engine(
+            async_url,
+            connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+        index_advisor.attach(async_engine.sync_engine)
+        return async_engine
+
+    async_engine = create_async_engine(
+        async_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    index_advisor.attach(async_engine.sync_engine)
+    return async_engine
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Pool durumu ve checkout/bekleme metrikleri"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+        })
+    status.update(pool_metrics.snapshot())
+    if _async_engine is not None:
+        async_pool = _async_engine.sync_engine.pool
+        status["async_pool"] = {"pool_class": type(async_pool).__name__, "status": async_pool.status()}
+    return status
 
-# SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./eduai.db"
 
 # Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_db_engine()
 
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -23,3 +216,40 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async engine ilk kullanımda oluşturulur; async sürücü yalnızca async route'lar için gerekir
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine()
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_factory()
+
+
+async def get_async_db():
+    """Event loop'u bloklamayan AsyncSession dependency'si"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
@@ -3,9 +3,19 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from app.api import users, subjects, performance, agents, auth, exam, education, questions, guidance
 from app.admin import routes as admin_routes
-from app.database import engine, Base
+from app.database import engine, Base, dispose_async_engine
 from app.core.config import settings
 from app.utils.startup import initialize_application
+from app.utils.migrations import run_migrations
+from app.services.memory_service import memory_service
+from app.services.question_pool_service import question_pool_service
+from app.services.http_client import http_client
+from app.services.job_queue import job_queue
+from app.agents.registry import agent_registry
+from app.utils.async_bridge import async_bridge
+from app.services import exam_analysis_service  # noqa: F401 - job handler kaydı
+from app.utils.sse import STREAM_PATH_SUFFIX
+from contextlib import asynccontextmanager
 import asyncio
 import logging
 
@@ -20,6 +30,12 @@ if settings.PROJECT_VERSION.endswith("-dev"):
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+# Apply schema migrations (indexes on existing tables)
+try:
+    run_migrations(engine)
+except Exception as e:
+    logger.error(f"Schema migrations failed: {str(e)}")
+
 # Initialize application with default data
 try:
     initialize_application()
@@ -27,10 +43,29 @@ except Exception as e:
     logger.error(f"Failed to initialize application: {str(e)}")
     # Continue anyway - the app can still work without sample data
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup - agent'ları ve LLM istemcilerini önceden kur, arka plan worker'larını başlat
+    if settings.AGENT_WARMUP_ON_STARTUP:
+        await agent_registry.warmup()
+    memory_service.start_background_tasks()
+    question_pool_service.start()
+    job_queue.start()
+    yield
+    # Shutdown - kuyrukları boşalt, kaynakları kapat
+    await job_queue.stop()
+    await question_pool_service.stop()
+    await memory_service.shutdown()
+    await http_client.close()
+    await dispose_async_engine()
+    await asyncio.to_thread(async_bridge.stop)
+    agent_registry.clear()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description=settings.PROJECT_DESCRIPTION,
     version=settings.PROJECT_VERSION,
+    lifespan=lifespan,
     # Swagger UI authentication yapılandırması
     openapi_tags=[
         {
@@ -87,8 +122,9 @@ app = FastAPI(
 # Request timeout middleware - sadece agent endpoint'leri için
 @app.middleware("http")
 async def timeout_middleware(request, call_next):
-    # Agent istekleri için timeout uygulama
-    if "/agents/" in str(request.url.path):
+    # Agent istekleri için timeout uygulama (SSE akışları kendi heartbeat'iyle açık kalır)
+    path = str(request.url.path)
+    if "/agents/" in path and not path.endswith(STREAM_PATH_SUFFIX):
         try:
             response = await asyncio.wait_for(call_next(request), timeout=60.0)
             return response
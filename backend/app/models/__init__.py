@@ -1,7 +1,7 @@
 from .user import User
 from .subject import Subject, Topic
 from .question import Question, UserAnswer, DifficultyLevel
-from .performance import PerformanceAnalysis, ResourceRecommendation
+from .performance import PerformanceAnalysis, ResourceRecommendation, RecommendationHistory, PerformanceDailyRollup
 from .book_recommendation import BookRecommendation, BookRecommendationList, StockStatus, BookType
 from .education_level import EducationLevel
 from .exam import ExamType, ExamSection, ExamQuestion, PracticeExam, PracticeQuestionResult
@@ -15,6 +15,8 @@ __all__ = [
     "DifficultyLevel",
     "PerformanceAnalysis",
     "ResourceRecommendation",
+    "RecommendationHistory",
+    "PerformanceDailyRollup",
     "EducationLevel",
     "ExamType",
     "ExamSection", 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -46,6 +46,11 @@ class ExamSection(Base):
 class ExamQuestion(Base):
     """Sınav soruları"""
     __tablename__ = "exam_questions"
+    __table_args__ = (
+        # Bölüm bazlı soru çekme (aktif, konu/zorluk dağılımı) ve konu bazlı sorgular
+        Index("ix_exam_questions_section_active_topic", "exam_section_id", "is_active", "topic_id", "difficulty_level"),
+        Index("ix_exam_questions_topic", "topic_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     question_text = Column(Text, nullable=False)
@@ -72,6 +77,11 @@ class ExamQuestion(Base):
 class PracticeExam(Base):
     """Deneme sınavları"""
     __tablename__ = "practice_exams"
+    __table_args__ = (
+        # Kullanıcının sınav geçmişi (created_at DESC) ve durum filtreli istatistikler
+        Index("ix_practice_exams_user_created", "user_id", "created_at"),
+        Index("ix_practice_exams_user_status_created", "user_id", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)  # "TYT Matematik Denemesi #1"
@@ -99,6 +109,12 @@ class PracticeExam(Base):
 class PracticeQuestionResult(Base):
     """Deneme sınavı soru sonuçları"""
     __tablename__ = "practice_question_results"
+    __table_args__ = (
+        # Sınav sonuçlarının okunması/silinmesi ve (sınav, soru) tekil sonuç araması
+        Index("ix_practice_question_results_exam_question", "practice_exam_id", "question_id"),
+        # Sorunun çözülme geçmişi (görülen sorular, soru istatistikleri)
+        Index("ix_practice_question_results_question", "question_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     practice_exam_id = Column(Integer, ForeignKey("practice_exams.id"), nullable=False)
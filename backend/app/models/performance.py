@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Float, Index, UniqueConstraint, Enum as SQLAlchemyEnum
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -10,11 +10,16 @@ class RecommendationStatus(enum.Enum):
 
 class PerformanceAnalysis(Base):
     __tablename__ = "performance_analyses"
+    __table_args__ = (
+        # Sınav analizi yeniden çalışırsa (iş tekrarı, fallback) ikinci kayıt oluşmasın
+        Index("ux_performance_analyses_practice_exam", "practice_exam_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
     subject_id = Column(Integer, ForeignKey("subjects.id"), index=True, nullable=True)
     topic_id = Column(Integer, ForeignKey("topics.id"), index=True, nullable=True)
+    practice_exam_id = Column(Integer, ForeignKey("practice_exams.id"), nullable=True)  # sınav analizi ise
     total_questions = Column(Integer, default=0)
     correct_answers = Column(Integer, default=0)
     accuracy = Column(Float, default=0.0)
@@ -37,3 +42,39 @@ class ResourceRecommendation(Base):
     category = Column(String, default="general")  # "video", "books", "ai_tips"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class RecommendationHistory(Base):
+    """Kullanıcıya daha önce önerilmiş kaynaklar (tekrar önermeyi önlemek için)"""
+    __tablename__ = "recommendation_history"
+    __table_args__ = (
+        UniqueConstraint("user_id", "resource_type", "canonical_id", name="uq_recommendation_history"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    resource_type = Column(String, nullable=False)  # "youtube", "book"
+    canonical_id = Column(String, nullable=False)  # YouTube video ID, Trendyol ürün ID veya normalize URL
+    url = Column(String)
+    times_recommended = Column(Integer, default=1)
+    first_recommended_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_recommended_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class PerformanceDailyRollup(Base):
+    """Dashboard için PerformanceAnalysis özetleri (kullanıcı/ders/konu/gün başına tek satır)"""
+    __tablename__ = "performance_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("user_id", "subject_id", "topic_id", "day", name="uq_performance_daily_rollup"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    subject_id = Column(Integer, nullable=False, default=0)  # 0: ders bilgisi yok
+    topic_id = Column(Integer, nullable=False, default=0)  # 0: konu bilgisi yok
+    day = Column(Date, nullable=False)
+    session_count = Column(Integer, nullable=False, default=0)
+    total_questions = Column(Integer, nullable=False, default=0)
+    correct_answers = Column(Integer, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0.0)
+    accuracy_count = Column(Integer, nullable=False, default=0)
+    max_weakness_level = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
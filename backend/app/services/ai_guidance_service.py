@@ -3,7 +3,7 @@ import logging
 import re
 from datetime import datetime
 from sqlalchemy.orm import Session
-from app.services.memory_service import PersonalizedMemoryService
+from app.services.memory_service import memory_service
 from app.models.user import User
 from app.models.education_level import Course, CourseTopic
 import json
@@ -16,7 +16,8 @@ class AIGuidanceService:
     """
     
     def __init__(self):
-        self.memory_service = PersonalizedMemoryService()
+        # Paylaşılan servis: tek Mem0 istemcisi ve tek context cache
+        self.memory_service = memory_service
     
     async def get_user_guidance(
         self, 
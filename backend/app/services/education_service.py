@@ -1,5 +1,6 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
 from typing import List, Optional
 from app.models.education_level import EducationLevel, Course, CourseTopic
 from app.schemas.education_level import (
@@ -261,3 +262,103 @@ class CourseTopicService:
         except Exception:
             db.rollback()
             return False
+
+
+# ========== ASYNC (AsyncSession) ==========
+
+class AsyncEducationLevelService:
+    """Eğitim seviyesi servisi (async)"""
+
+    @staticmethod
+    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[EducationLevel]:
+        """Tüm eğitim seviyelerini getir"""
+        result = await db.execute(
+            select(EducationLevel).order_by(EducationLevel.sort_order).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, level_id: int) -> Optional[EducationLevel]:
+        """ID'ye göre eğitim seviyesi getir"""
+        result = await db.execute(select(EducationLevel).where(EducationLevel.id == level_id))
+        return result.scalars().first()
+
+class AsyncCourseService:
+    """Ders servisi (async)"""
+
+    @staticmethod
+    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100, education_level_id: Optional[int] = None) -> List[Course]:
+        """Tüm dersleri getir"""
+        query = select(Course).where(Course.is_active == 1)
+        if education_level_id:
+            query = query.where(Course.education_level_id == education_level_id)
+        result = await db.execute(query.offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, course_id: int) -> Optional[Course]:
+        """ID'ye göre ders getir"""
+        result = await db.execute(select(Course).where(and_(Course.id == course_id, Course.is_active == 1)))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_by_education_level(db: AsyncSession, education_level_id: int) -> List[Course]:
+        """Eğitim seviyesine göre dersleri getir"""
+        result = await db.execute(
+            select(Course).where(and_(Course.education_level_id == education_level_id, Course.is_active == 1))
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def search_courses(db: AsyncSession, search_term: str, education_level_id: Optional[int] = None) -> List[Course]:
+        """Ders ara"""
+        query = select(Course).where(Course.is_active == 1)
+        if education_level_id:
+            query = query.where(Course.education_level_id == education_level_id)
+        query = query.where(
+            or_(
+                Course.name.ilike(f"%{search_term}%"),
+                Course.description.ilike(f"%{search_term}%"),
+                Course.code.ilike(f"%{search_term}%")
+            )
+        )
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
+class AsyncCourseTopicService:
+    """Ders konusu servisi (async)"""
+
+    @staticmethod
+    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100, course_id: Optional[int] = None) -> List[CourseTopic]:
+        """Tüm konuları getir"""
+        query = select(CourseTopic).where(CourseTopic.is_active == 1)
+        if course_id:
+            query = query.where(CourseTopic.course_id == course_id)
+        result = await db.execute(query.order_by(CourseTopic.sort_order).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, topic_id: int) -> Optional[CourseTopic]:
+        """ID'ye göre konu getir"""
+        result = await db.execute(
+            select(CourseTopic).where(and_(CourseTopic.id == topic_id, CourseTopic.is_active == 1))
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_by_course(db: AsyncSession, course_id: int) -> List[CourseTopic]:
+        """Derse göre konuları getir"""
+        result = await db.execute(
+            select(CourseTopic).where(
+                and_(CourseTopic.course_id == course_id, CourseTopic.is_active == 1)
+            ).order_by(CourseTopic.sort_order)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_by_ids(db: AsyncSession, topic_ids: List[int]) -> List[CourseTopic]:
+        """ID listesindeki konuları tek sorguda getir"""
+        if not topic_ids:
+            return []
+        result = await db.execute(select(CourseTopic).where(CourseTopic.id.in_(topic_ids)))
+        return list(result.scalars().all())
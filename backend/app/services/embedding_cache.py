@@ -0,0 +1,85 @@
+"""
+Mem0 embedder'ının önüne konan kalıcı embedding cache'i.
+
+Aynı metin (ör. "öğrenme performansı {subject}" gibi sabit sorgu şablonları)
+istekler ve yeniden başlatmalar arasında bir daha embed edilmez.
+"""
+from array import array
+from typing import Any, Dict, List, Optional
+import hashlib
+import logging
+
+from app.utils.cache import TTLCache, MISSING
+from app.utils.sqlite_kv import SQLiteKVStore
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """İçerik hash'i -> vektör; bellek içi LRU + SQLite kalıcı katman"""
+
+    def __init__(self, path: str = "./embedding_cache.db", hot_size: int = 4096):
+        self.store = SQLiteKVStore(path, table="embeddings")
+        self.hot = TTLCache(maxsize=hot_size, ttl=None, name="embeddings")
+        self.embed_calls = 0
+
+    @staticmethod
+    def make_key(model: str, text: str, memory_action: Optional[str] = None) -> str:
+        payload = f"{model}\x00{memory_action or ''}\x00{text}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        vector = self.hot.get(key)
+        if vector is not MISSING:
+            return vector
+        raw = self.store.get(key)
+        if raw is None:
+            return None
+        values = array("f")
+        values.frombytes(raw)
+        vector = values.tolist()
+        self.hot.set(key, vector)
+        return vector
+
+    def set(self, key: str, vector: List[float]) -> None:
+        self.hot.set(key, list(vector))
+        try:
+            self.store.set(key, array("f", vector).tobytes())
+        except Exception as e:
+            # Kalıcı katman yazılamazsa bellek içi cache yine çalışır
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.hot.stats(),
+            "persisted": self.store.count(),
+            "embed_calls": self.embed_calls,
+        }
+
+
+class CachedEmbedder:
+    """
+    Mem0 embedder'ı için proxy. ``embed`` çağrılarını cache'den karşılar, diğer
+    tüm öznitelikleri sarmalanan embedder'a iletir.
+    """
+
+    def __init__(self, embedder: Any, cache: EmbeddingCache, model: str):
+        self._embedder = embedder
+        self._cache = cache
+        self._model = model
+
+    def embed(self, text, memory_action=None):
+        if not isinstance(text, str):
+            return self._embedder.embed(text, memory_action)
+        key = self._cache.make_key(self._model, text, memory_action)
+        vector = self._cache.get(key)
+        if vector is not None:
+            return vector
+        vector = self._embedder.embed(text, memory_action)
+        self._cache.embed_calls += 1
+        if vector is not None:
+            self._cache.set(key, vector)
+        return vector
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._embedder, name)
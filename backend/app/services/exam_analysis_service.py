@@ -0,0 +1,386 @@
+"""
+Sınav sonrası AI analizi.
+
+``load_exam_context`` sınav verisini agent girdisine çevirir, ``build_exam_analysis``
+paralel agent sonuçlarını yanıt formatına getirip önerileri ve memory kayıtlarını
+saklar. Sınav gönderiminde analiz ``job_queue`` üzerinden sınav başına bir kez
+(``exam-analysis:{exam_id}`` anahtarıyla) arka planda çalışır; sonuç okumaları
+yalnızca iş kaydına bakar.
+"""
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.exam import PracticeExam, PracticeQuestionResult, ExamQuestion, ExamSection, ExamType
+from app.models.education_level import CourseTopic
+from app.services.ai_guidance_service import ai_guidance_service
+from app.services.job_queue import job_queue
+
+EXAM_ANALYSIS_JOB = "exam_analysis"
+
+
+def load_exam_context(db: Session, exam_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """Sınav, bölüm/tür bilgisi ve agent'lara verilecek exam_result verisini hazırla (sınav yoksa None)"""
+    # Sınav bilgilerini al
+    practice_exam = db.query(PracticeExam).filter(
+        PracticeExam.id == exam_id,
+        PracticeExam.user_id == user_id
+    ).first()
+
+    if not practice_exam:
+        return None
+
+    # Sınav section ve type bilgilerini al
+    exam_section = db.query(ExamSection).filter(
+        ExamSection.id == practice_exam.exam_section_id
+    ).first()
+
+    exam_type = None
+    if exam_section:
+        exam_type = db.query(ExamType).filter(
+            ExamType.id == exam_section.exam_type_id
+        ).first()
+
+    # Soru sonuçlarını al
+    question_results = db.query(PracticeQuestionResult).filter(
+        PracticeQuestionResult.practice_exam_id == exam_id
+    ).all()
+
+    # Yanlış cevaplanan soruların topic'lerini topla
+    wrong_topics = []
+    questions_with_topics = []
+
+    for result in question_results:
+        if not result.is_correct:
+            question = db.query(ExamQuestion).filter(
+                ExamQuestion.id == result.question_id
+            ).first()
+
+            if question and question.topic_id:
+                topic = db.query(CourseTopic).filter(
+                    CourseTopic.id == question.topic_id
+                ).first()
+
+                if topic:
+                    wrong_topics.append(topic.name)
+                    questions_with_topics.append({
+                        "question_id": question.id,
+                        "topic_name": topic.name,
+                        "user_answer": result.user_answer,
+                        "correct_answer": question.correct_answer,
+                        "is_correct": result.is_correct
+                    })
+
+    # Exam result verisi hazırla
+    exam_result = {
+        "totalQuestions": practice_exam.total_questions,
+        "correctAnswers": practice_exam.correct_answers,
+        "wrongAnswers": practice_exam.wrong_answers,
+        "emptyAnswers": practice_exam.empty_answers,
+        "accuracy": practice_exam.score,
+        "score": practice_exam.score,
+        "weak_topics": list(set(wrong_topics)),
+        "exam_section": exam_section.name if exam_section else "Genel",
+        "exam_type": exam_type.name if exam_type else "Deneme Sınavı",
+        "detailedAnswers": f"Toplam: {practice_exam.total_questions}, Doğru: {practice_exam.correct_answers}, Yanlış: {practice_exam.wrong_answers}, Boş: {practice_exam.empty_answers}",
+        "questionsWithTopics": questions_with_topics
+    }
+    
+    return {
+        "practice_exam": practice_exam,
+        "exam_section": exam_section,
+        "exam_type": exam_type,
+        "wrong_topics": wrong_topics,
+        "exam_result": exam_result
+    }
+
+async def build_exam_analysis(
+    db: Session,
+    exam_id: int,
+    user_id: int,
+    context: Dict[str, Any],
+    parallel_result: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Paralel agent sonuçlarını yanıt formatına çevir, önerileri ve memory kayıtlarını sakla"""
+    practice_exam = context["practice_exam"]
+    exam_section = context["exam_section"]
+    exam_type = context["exam_type"]
+    wrong_topics = context["wrong_topics"]
+    exam_result = context["exam_result"]
+    
+    if parallel_result.get("status") == "success":
+        results = parallel_result.get("results", {})
+
+        # Base analysis data structure oluştur
+        analysis_data = {
+            "weakness_level": 5,  # Default value
+            "weak_topics": list(set(wrong_topics)),
+            "strong_topics": [],
+            "recommendations": [],
+            "detailed_analysis": "Analiz tamamlanıyor...",
+            "personalized_insights": [],
+            "improvement_trend": "Veri analiz ediliyor..."
+        }
+
+        # Analiz sonucunu al ve merge et
+        if "analysis_agent" in results:
+            analysis_result = results["analysis_agent"]
+            if analysis_result.get("status") == "success":
+                agent_data = analysis_result.get("data", {})
+                # Nested data varsa içini al
+                if "data" in agent_data:
+                    agent_data = agent_data["data"]
+
+                # Merge analysis data
+                analysis_data.update({
+                    "weakness_level": agent_data.get("weakness_level", 5),
+                    "weak_topics": agent_data.get("weak_topics", list(set(wrong_topics))),
+                    "strong_topics": agent_data.get("strong_topics", []),
+                    "recommendations": agent_data.get("recommendations", []),
+                    "detailed_analysis": agent_data.get("detailed_analysis", "Analiz tamamlandı."),
+                    "personalized_insights": agent_data.get("personalized_insights", []),
+                    "improvement_trend": agent_data.get("improvement_trend", "Veri yetersiz.")
+                })
+
+        # YouTube önerilerini ekle ve JSON-safe formata çevir
+        if "youtube_agent" in results:
+            youtube_result = results["youtube_agent"]
+            print(f"🔍 YouTube result: {youtube_result}")
+            if youtube_result.get("status") == "success":
+                youtube_agent_data = youtube_result.get("data", {})
+                # Nested data varsa içini al
+                if "data" in youtube_agent_data:
+                    youtube_data = youtube_agent_data["data"]
+                else:
+                    youtube_data = youtube_agent_data
+
+                # JSON-safe formata çevir
+                if "recommendations" in youtube_data:
+                    safe_videos = []
+                    for video in youtube_data["recommendations"]:
+                        safe_video = {
+                            "title": str(video.get("title", "")),
+                            "channel": str(video.get("channel", "")),
+                            "duration": str(video.get("duration", "")),
+                            "level": str(video.get("level", "lise")),
+                            "video_url": str(video.get("video_url", "")),
+                            "topics_covered": video.get("topics_covered", []),
+                            "why_recommended": str(video.get("why_recommended", "Bu video zayıf konularınız için önerilmiştir.")),
+                            "thumbnail_url": str(video.get("thumbnail_url", "")) if video.get("thumbnail_url") else None,
+                            "channel_url": str(video.get("channel_url", "")) if video.get("channel_url") else None
+                        }
+                        safe_videos.append(safe_video)
+
+                    analysis_data["youtube_recommendations"] = {
+                        "recommendations": safe_videos,
+                        "search_strategy": youtube_data.get("search_strategy", "YouTube videolar bulundu.")
+                    }
+
+                    # Kitap önerilerini ekle ve JSON-safe formata çevir
+        if "book_agent" in results:
+            book_result = results["book_agent"]
+            print(f"🔍 Book result: {book_result}")
+            if book_result.get("status") == "success":
+                book_agent_data = book_result.get("data", {})
+                # Nested data varsa içini al
+                if "data" in book_agent_data:
+                    book_data = book_agent_data["data"]
+                else:
+                    book_data = book_agent_data
+
+                # JSON-safe formata çevir
+                if "recommendations" in book_data:
+                    safe_books = []
+                    for book in book_data["recommendations"]:
+                        safe_book = {
+                            "title": str(book.get("title", "")),
+                            "author": str(book.get("author", "")),
+                            "publisher": str(book.get("publisher", "")),
+                            "year": 2024,  # Default year
+                            "price": str(book.get("price", "")) if book.get("price") else None,
+                            "stock_status": str(book.get("stock_status", "")).replace("<StockStatus.", "").replace(">", "").split(":")[0] if book.get("stock_status") else "available",
+                            "purchase_links": [str(book.get("url", ""))] if book.get("url") else [],
+                            "topics_covered": book.get("key_topics", []),
+                            "difficulty_level": book.get("target_audience", "Lise"),
+                            "why_recommended": book.get("description", "Bu kitap zayıf konularınız için önerilmiştir."),
+                            "cover_image": None
+                        }
+                        safe_books.append(safe_book)
+
+                    analysis_data["book_recommendations"] = {
+                        "recommendations": safe_books,
+                        "search_summary": book_data.get("search_summary", "Kitap önerileri bulundu.")
+                    }
+
+        # Exam bilgilerini ekle
+        analysis_data["exam_info"] = {
+            "exam_id": exam_id,
+            "exam_type": exam_type.name if exam_type else "Bilinmiyor",
+            "exam_section": exam_section.name if exam_section else "Bilinmiyor", 
+            "score": practice_exam.score,
+            "completion_date": practice_exam.end_time.isoformat() if practice_exam.end_time else None
+        }
+
+        # İşlem bilgilerini ekle
+        analysis_data["parallel_processing"] = {
+            "enabled": True,
+            "execution_summary": parallel_result.get("execution_summary", {}),
+            "processing_time": "paralel"
+        }
+
+        # Önerileri database'e kaydet
+        try:
+            from app.api.exam import save_recommendations_to_db
+            exam_result_data = {
+                "total_questions": practice_exam.total_questions or 0,
+                "correct_answers": practice_exam.correct_answers or 0,
+                "percentage": practice_exam.score or 0.0
+            }
+            saved = await save_recommendations_to_db(
+                db, user_id, results, exam_result_data, practice_exam_id=exam_id
+            )
+            analysis_data["recommendations_saved"] = True
+            # Sınav daha önce kaydedildiyse (iş tekrarı / fallback) rollup ve memory tekrar yazılmaz
+            analysis_data["already_recorded"] = saved is None
+        except Exception as e:
+            print(f"❌ Error saving recommendations: {e}")
+            analysis_data["recommendations_saved"] = False
+            analysis_data["already_recorded"] = False
+            analysis_data["save_error"] = str(e)
+
+        # Sınav sonucunu memory'e kaydet (sınav ilk kez kaydedildiyse)
+        if analysis_data["already_recorded"]:
+            analysis_data["memory_stored"] = True
+        else:
+            try:
+                # Zayıflık analizi için memory kaydı
+                await ai_guidance_service.memory_service.store_weakness_analysis(
+                    user_id=str(user_id),
+                    analysis_data={
+                        "subject": exam_section.name if exam_section else "Genel",
+                        "topic": exam_type.name if exam_type else "Deneme Sınavı",
+                        "weakness_level": analysis_data.get("weakness_level", 5),
+                        "weak_topics": analysis_data.get("weak_topics", []),
+                        "strong_topics": analysis_data.get("strong_topics", []),
+                        "recommendations": analysis_data.get("recommendations", []),
+                        "detailed_analysis": analysis_data.get("detailed_analysis", "")
+                    }
+                )
+
+                # Öğrenme seansı için memory kaydı
+                session_data = {
+                    "subject": exam_section.name if exam_section else "Genel", 
+                    "topic": exam_type.name if exam_type else "Deneme Sınavı",
+                    "education_level": "lise",
+                    "accuracy": practice_exam.score,
+                    "total_questions": practice_exam.total_questions,
+                    "correct_answers": practice_exam.correct_answers,
+                    "wrong_answers": practice_exam.wrong_answers,
+                    "empty_answers": practice_exam.empty_answers,
+                    "timestamp": practice_exam.end_time.isoformat() if practice_exam.end_time else None
+                }
+
+                await ai_guidance_service.memory_service.store_learning_session(
+                    user_id=str(user_id),
+                    session_data=session_data
+                )
+
+                analysis_data["memory_stored"] = True
+
+            except Exception as e:
+                print(f"❌ Error storing to memory: {e}")
+                analysis_data["memory_stored"] = False
+                analysis_data["memory_error"] = str(e)
+
+        return {
+            "status": "success",
+            "data": analysis_data
+        }
+    else:
+        # Paralel işlem başarısız oldu, fallback olarak normal analiz yap
+        from app.agents.registry import agent_registry
+        analysis_agent = agent_registry.get("analysis")
+
+        input_data = {
+            "user_id": str(user_id),
+            "subject": exam_section.name if exam_section else "Genel",
+            "topic": exam_type.name if exam_type else "Deneme Sınavı",
+            "education_level": "lise",
+            "performance_data": exam_result
+        }
+
+        result = await analysis_agent.process(input_data)
+
+        # Exam bilgilerini ekle
+        if result.get("status") == "success":
+            result["data"]["exam_info"] = {
+                "exam_id": exam_id,
+                "exam_type": exam_type.name if exam_type else "Bilinmiyor",
+                "exam_section": exam_section.name if exam_section else "Bilinmiyor",
+                "score": practice_exam.score,
+                "completion_date": practice_exam.end_time.isoformat() if practice_exam.end_time else None
+            }
+
+        return result
+
+
+def exam_analysis_key(exam_id: int) -> str:
+    return f"exam-analysis:{exam_id}"
+
+
+def enqueue_exam_analysis(user_id: int, exam_id: int) -> Dict[str, Any]:
+    """Sınav analizini kuyruğa al; aynı sınav için mevcut işi döndürür"""
+    return job_queue.enqueue(
+        EXAM_ANALYSIS_JOB,
+        {"user_id": user_id, "exam_id": exam_id},
+        idempotency_key=exam_analysis_key(exam_id)
+    )
+
+
+async def run_exam_analysis_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler: paralel agent analizi + öneri/memory kaydı"""
+    from app.services.parallel_agent_service import parallel_agent_service
+    
+    user_id = payload["user_id"]
+    exam_id = payload["exam_id"]
+    db = SessionLocal()
+    try:
+        context = load_exam_context(db, exam_id, user_id)
+        if context is None:
+            raise ValueError("Deneme sınavı bulunamadı")
+        
+        parallel_result = await parallel_agent_service.process_exam_results_parallel(
+            db=db,
+            user_id=user_id,
+            exam_id=exam_id,
+            exam_result=context["exam_result"]
+        )
+        analysis = await build_exam_analysis(db, exam_id, user_id, context, parallel_result)
+    finally:
+        db.close()
+    
+    # Hata durumunu job_queue yeniden denesin
+    if analysis.get("status") != "success":
+        raise RuntimeError(analysis.get("error", "Sınav analizi başarısız"))
+    return analysis
+
+
+def get_exam_analysis_status(user_id: int, exam_id: int) -> Optional[Dict[str, Any]]:
+    """Sınavın analiz işinin durumu ve (tamamlandıysa) sonucu; iş yoksa None"""
+    job = job_queue.get_by_key(exam_analysis_key(exam_id))
+    if not job or job["payload"].get("user_id") != user_id:
+        return None
+    
+    result = job["result"] or {}
+    return {
+        "exam_id": exam_id,
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "data": result.get("data") if job["status"] == "done" else None,
+        "error": job["error"]
+    }
+
+
+job_queue.register(EXAM_ANALYSIS_JOB, run_exam_analysis_job)
@@ -1,11 +1,13 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-import random
 
 from app.models.exam import ExamType, ExamSection, ExamQuestion, PracticeExam, PracticeQuestionResult
 from app.models.education_level import EducationLevel, Course, CourseTopic
+from app.services.question_dedup_index import question_dedup_index
+from app.services.question_sampler import question_sampler
 from app.schemas.exam import (
     ExamTypeCreate, ExamTypeUpdate,
     ExamSectionCreate, ExamSectionUpdate,
@@ -136,19 +138,18 @@ class ExamQuestionService:
     
     @staticmethod
     def get_random_questions(db: Session, exam_section_id: int, count: int = 40, difficulty_level: Optional[int] = None) -> List[ExamQuestion]:
-        """Belirtilen bölümden rastgele sorular getir"""
-        query = db.query(ExamQuestion).filter(
-            and_(ExamQuestion.exam_section_id == exam_section_id, ExamQuestion.is_active == True)
+        """Belirtilen bölümden rastgele sorular getir.
+
+        Örnekleme bellekteki ID dizisi üzerinde yapılır; yalnızca seçilen sorular yüklenir.
+        Zorluk belirtilmezse konu x zorluk katmanlarına orantılı dağıtılır.
+        """
+        return question_sampler.sample(
+            db,
+            exam_section_id,
+            count,
+            difficulty_level=difficulty_level,
+            stratify=not difficulty_level
         )
-        
-        if difficulty_level:
-            query = query.filter(ExamQuestion.difficulty_level == difficulty_level)
-        
-        questions = query.all()
-        if len(questions) <= count:
-            return questions
-        
-        return random.sample(questions, count)
     
     @staticmethod
     def create(db: Session, question_data: ExamQuestionCreate) -> ExamQuestion:
@@ -156,6 +157,7 @@ class ExamQuestionService:
         db.add(db_question)
         db.commit()
         db.refresh(db_question)
+        question_dedup_index.add_questions([db_question])
         return db_question
     
     @staticmethod
@@ -170,6 +172,7 @@ class ExamQuestionService:
         db.commit()
         for question in db_questions:
             db.refresh(question)
+        question_dedup_index.add_questions(db_questions)
         
         return db_questions
     
@@ -185,6 +188,8 @@ class ExamQuestionService:
         
         db.commit()
         db.refresh(db_question)
+        if "question_text" in update_data:
+            question_dedup_index.add_questions([db_question])
         return db_question
     
     @staticmethod
@@ -195,6 +200,7 @@ class ExamQuestionService:
         
         db_question.is_active = False
         db.commit()
+        question_dedup_index.remove([question_id])
         return True
     
     @staticmethod
@@ -427,3 +433,178 @@ class PracticeExamService:
                 difficulty_stats[level]["percentage"] = 0
         
         return difficulty_stats
+
+
+# ========== ASYNC (AsyncSession) ==========
+# Async route'lar için sorgu metotları; event loop'u bloklamaz.
+# İlişkiler lazy-load edilmediği için gereken alanlar join ile tek sorguda alınır.
+
+class AsyncExamTypeService:
+    """Sınav türü servisi (async)"""
+
+    @staticmethod
+    async def get_all(db: AsyncSession, skip: int = 0, limit: Optional[int] = 100) -> List[ExamType]:
+        result = await db.execute(
+            select(ExamType).where(ExamType.is_active == True).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, exam_type_id: int) -> Optional[ExamType]:
+        result = await db.execute(
+            select(ExamType).where(and_(ExamType.id == exam_type_id, ExamType.is_active == True))
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_by_education_level(db: AsyncSession, education_level_id: int) -> List[ExamType]:
+        result = await db.execute(
+            select(ExamType).where(
+                and_(ExamType.education_level_id == education_level_id, ExamType.is_active == True)
+            )
+        )
+        return list(result.scalars().all())
+
+class AsyncExamSectionService:
+    """Sınav bölümü servisi (async)"""
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, section_id: int) -> Optional[ExamSection]:
+        result = await db.execute(
+            select(ExamSection).where(and_(ExamSection.id == section_id, ExamSection.is_active == True))
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_by_exam_type(db: AsyncSession, exam_type_id: int) -> List[ExamSection]:
+        result = await db.execute(
+            select(ExamSection).where(
+                and_(ExamSection.exam_type_id == exam_type_id, ExamSection.is_active == True)
+            ).order_by(ExamSection.sort_order)
+        )
+        return list(result.scalars().all())
+
+class AsyncExamQuestionService:
+    """Sınav sorusu servisi (async)"""
+
+    @staticmethod
+    async def get_all(db: AsyncSession, exam_section_id: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[ExamQuestion]:
+        query = select(ExamQuestion).where(ExamQuestion.is_active == True)
+        if exam_section_id:
+            query = query.where(ExamQuestion.exam_section_id == exam_section_id)
+        result = await db.execute(query.offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_by_section(db: AsyncSession, exam_section_id: int) -> List[ExamQuestion]:
+        result = await db.execute(
+            select(ExamQuestion).where(
+                and_(ExamQuestion.exam_section_id == exam_section_id, ExamQuestion.is_active == True)
+            )
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, question_id: int) -> Optional[ExamQuestion]:
+        result = await db.execute(
+            select(ExamQuestion).where(and_(ExamQuestion.id == question_id, ExamQuestion.is_active == True))
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_by_ids(db: AsyncSession, question_ids: List[int]) -> List[ExamQuestion]:
+        """ID listesindeki soruları (verilen sırayla) getir"""
+        if not question_ids:
+            return []
+        result = await db.execute(select(ExamQuestion).where(ExamQuestion.id.in_(question_ids)))
+        by_id = {q.id: q for q in result.scalars().all()}
+        return [by_id[qid] for qid in question_ids if qid in by_id]
+
+    @staticmethod
+    async def get_question_count_by_section(db: AsyncSession, exam_section_id: int) -> int:
+        """Bölümdeki aktif soru sayısını getir"""
+        result = await db.execute(
+            select(func.count(ExamQuestion.id)).where(
+                and_(ExamQuestion.exam_section_id == exam_section_id, ExamQuestion.is_active == True)
+            )
+        )
+        return result.scalar_one()
+
+class AsyncPracticeExamService:
+    """Deneme sınavı servisi (async)"""
+
+    @staticmethod
+    async def get_user_exams(db: AsyncSession, user_id: int, skip: int = 0, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Kullanıcının sınavları; tür ve bölüm adlarıyla birlikte tek sorguda"""
+        query = select(
+            PracticeExam, ExamType.name, ExamSection.name
+        ).outerjoin(
+            ExamType, ExamType.id == PracticeExam.exam_type_id
+        ).outerjoin(
+            ExamSection, ExamSection.id == PracticeExam.exam_section_id
+        ).where(
+            PracticeExam.user_id == user_id
+        ).order_by(PracticeExam.created_at.desc()).offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        result = await db.execute(query)
+
+        return [
+            {
+                "id": exam.id,
+                "name": exam.name,
+                "exam_type_id": exam.exam_type_id,
+                "exam_section_id": exam.exam_section_id,
+                "user_id": exam.user_id,
+                "status": exam.status,
+                "start_time": exam.start_time.isoformat() if exam.start_time else None,
+                "end_time": exam.end_time.isoformat() if exam.end_time else None,
+                "duration_minutes": exam.duration_minutes,
+                "total_questions": exam.total_questions,
+                "correct_answers": exam.correct_answers or 0,
+                "wrong_answers": exam.wrong_answers or 0,
+                "empty_answers": exam.empty_answers or 0,
+                "score": exam.score or 0,
+                "created_at": exam.created_at.isoformat(),
+                "exam_type_name": exam_type_name or "Bilinmeyen",
+                "exam_section_name": exam_section_name or "Bilinmeyen"
+            }
+            for exam, exam_type_name, exam_section_name in result.all()
+        ]
+
+    @staticmethod
+    async def get_by_id(db: AsyncSession, exam_id: int) -> Optional[PracticeExam]:
+        result = await db.execute(select(PracticeExam).where(PracticeExam.id == exam_id))
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_question_results(db: AsyncSession, exam_id: int) -> List[PracticeQuestionResult]:
+        result = await db.execute(
+            select(PracticeQuestionResult).where(PracticeQuestionResult.practice_exam_id == exam_id)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_user_statistics(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+        """Tamamlanmış sınavlar üzerinden toplu istatistik (tek aggregate sorgu)"""
+        result = await db.execute(
+            select(
+                func.count(PracticeExam.id),
+                func.avg(PracticeExam.score),
+                func.max(PracticeExam.score),
+                func.sum(PracticeExam.correct_answers),
+                func.sum(PracticeExam.wrong_answers),
+                func.sum(PracticeExam.empty_answers),
+            ).where(
+                and_(PracticeExam.user_id == user_id, PracticeExam.status == "completed")
+            )
+        )
+        count, avg_score, best_score, correct, wrong, empty = result.one()
+        return {
+            "completed_exams": count or 0,
+            "average_score": round(avg_score or 0, 2),
+            "best_score": best_score or 0,
+            "total_correct": correct or 0,
+            "total_wrong": wrong or 0,
+            "total_empty": empty or 0,
+        }
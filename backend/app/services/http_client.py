@@ -0,0 +1,90 @@
+"""
+Uygulama genelinde paylaşılan, connection-pool'lu aiohttp istemcisi.
+
+Her istek için yeni ``ClientSession`` açmak TCP/TLS el sıkışmasını tekrarlatır.
+Oturum event loop başına bir kez oluşturulur ve uygulama kapanırken lifespan
+içinden kapatılır.
+"""
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import weakref
+
+import aiohttp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+class SharedHTTPClient:
+    """Event loop başına tek ``aiohttp.ClientSession``"""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, timeout: float = 10.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+        self.sessions_created = 0
+
+    def session(self) -> aiohttp.ClientSession:
+        """Çalışan loop'a ait oturumu döndür (yoksa oluştur)"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=300,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=DEFAULT_HEADERS,
+            )
+            self._sessions[loop] = session
+            self.sessions_created += 1
+        return session
+
+    async def fetch_text(self, url: str, max_bytes: Optional[int] = None, **kwargs: Any) -> str:
+        """URL gövdesini metin olarak indir; ``max_bytes`` aşılınca indirmeyi kes"""
+        async with self.session().get(url, **kwargs) as resp:
+            resp.raise_for_status()
+            if max_bytes is None:
+                return await resp.text()
+            chunks = []
+            received = 0
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                chunks.append(chunk)
+                received += len(chunk)
+                if received >= max_bytes:
+                    break
+            return b"".join(chunks).decode(resp.get_encoding(), errors="replace")
+
+    async def close(self) -> None:
+        """Bu loop'a ait oturumu kapat; diğer loop'ların oturumlarını bırak"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        session = self._sessions.pop(loop, None) if loop is not None else None
+        if session is not None and not session.closed:
+            await session.close()
+        self._sessions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open_sessions": sum(1 for s in self._sessions.values() if not s.closed),
+            "sessions_created": self.sessions_created,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+        }
+
+
+# Global instance
+http_client = SharedHTTPClient(
+    limit=settings.HTTP_POOL_LIMIT,
+    limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+    timeout=settings.HTTP_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,258 @@
+"""
+MasterAgent genel sorguları için yerel niyet (intent) yönlendirici.
+
+Sorgu önce Türkçe/İngilizce anahtar kelime tablolarıyla, sonra karakter/kelime
+n-gram tabanlı bir Naive Bayes modeliyle sınıflandırılır. Güven eşiğin altında
+kalırsa ``None`` döner ve karar LLM'e bırakılır; LLM'in verdiği karar etiketli
+örnek olarak kaydedilip modele eklenir. Model sayımları toplamsal olduğundan
+her yeni örnek yeniden eğitim gerektirmeden anında kullanılır.
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import logging
+import math
+import re
+import threading
+
+from app.core.config import settings
+from app.utils.sqlite_kv import SQLiteKVStore
+
+logger = logging.getLogger(__name__)
+
+AGENTS = ("question", "analysis", "youtube", "book")
+
+# (desen, ağırlık) - çok kelimeli ifadeler tek kelimelerden daha belirleyici
+_RULES: Dict[str, List[Tuple[str, float]]] = {
+    "youtube": [
+        (r"\byoutube", 2.0), (r"\bvideo", 1.5), (r"\bizle", 1.5), (r"\bkanal", 1.0),
+        (r"\bders anlatım", 2.0), (r"\bkonu anlatım", 1.5), (r"\bwatch\b", 1.5),
+        (r"\bchannel", 1.0), (r"\btutorial", 1.5), (r"\blecture", 1.0),
+    ],
+    "book": [
+        (r"\bkitap", 2.0), (r"\bsoru bankas", 2.5), (r"\bkaynak öner", 1.5), (r"\byayın", 1.0),
+        (r"\bfasikül", 1.5), (r"\bbook", 2.0), (r"\btextbook", 2.0), (r"\bpublisher", 1.0),
+        (r"\breading\b", 1.0), (r"\bokuma", 1.0),
+    ],
+    "analysis": [
+        (r"\banaliz", 2.0), (r"\bperformans", 2.0), (r"\bzayıf", 1.5), (r"\beksik", 1.0),
+        (r"\bbaşarı", 1.0), (r"\bnetlerim", 1.5), (r"\bsonuçlarım", 1.5), (r"\bhangi konularda", 1.5),
+        (r"\bgeliş", 1.0), (r"\bistatistik", 1.0), (r"\bweak", 1.5), (r"\bperformance", 2.0),
+        (r"\banaly[sz]", 2.0), (r"\bprogress", 1.0), (r"\bstrength", 1.0),
+    ],
+    "question": [
+        (r"\bsoru", 1.5), (r"\btest\b", 1.0), (r"\bquiz", 1.5), (r"\bçöz", 1.0), (r"\bcevap", 1.0),
+        (r"\bdeneme sınav", 1.5), (r"\bsoru (üret|oluştur|hazırla|sor)", 2.5), (r"\bquestion", 1.5),
+        (r"\bpractice", 1.0), (r"\bexercise", 1.0), (r"\banswer", 1.0),
+    ],
+}
+_COMPILED_RULES = {
+    agent: [(re.compile(pattern), weight) for pattern, weight in rules]
+    for agent, rules in _RULES.items()
+}
+
+# Modelin ilk açılışta boş olmaması için başlangıç örnekleri
+_SEED_EXAMPLES: List[Tuple[str, str]] = [
+    ("bana matematikten 5 soru hazırla", "question"),
+    ("türev konusunda test çözmek istiyorum", "question"),
+    ("fizik için alıştırma sorusu ver", "question"),
+    ("give me practice questions on algebra", "question"),
+    ("quiz me on the french revolution", "question"),
+    ("zayıf olduğum konular neler", "analysis"),
+    ("son sınavdaki performansımı değerlendir", "analysis"),
+    ("hangi konularda eksiğim var", "analysis"),
+    ("analyze my exam results", "analysis"),
+    ("how am i doing in chemistry", "analysis"),
+    ("fonksiyonlar konusunu anlatan video öner", "youtube"),
+    ("youtube da izleyebileceğim ders var mı", "youtube"),
+    ("organik kimya konu anlatımı izlemek istiyorum", "youtube"),
+    ("recommend a video about photosynthesis", "youtube"),
+    ("which channel explains calculus well", "youtube"),
+    ("tyt için kaynak kitap önerir misin", "book"),
+    ("geometri soru bankası tavsiyesi", "book"),
+    ("hangi yayını almalıyım", "book"),
+    ("recommend a book for learning physics", "book"),
+    ("what textbook should i buy for biology", "book"),
+]
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_query(text: str) -> str:
+    """Türkçe büyük harfleri doğru küçült, boşlukları sadeleştir"""
+    text = str(text).replace("İ", "i").replace("I", "ı").lower()
+    return " ".join(text.split())
+
+
+def _features(text: str) -> Counter:
+    """Kelime unigram/bigram + kelime içi karakter 3-4 gram"""
+    words = _WORD.findall(text)
+    features: Counter = Counter(f"w:{word}" for word in words)
+    features.update(f"b:{a}_{b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"^{word}$"
+        for n in (3, 4):
+            features.update(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+    return features
+
+
+class NaiveBayesIntentModel:
+    """Artımlı güncellenen multinomial Naive Bayes (Laplace yumuşatmalı)"""
+
+    def __init__(
+        self,
+        labels: Tuple[str, ...] = AGENTS,
+        alpha: float = 0.5,
+        sharpness: float = 3.0,
+        min_known_features: int = 3
+    ):
+        self.labels = labels
+        self.alpha = alpha
+        self.sharpness = sharpness
+        self.min_known_features = min_known_features
+        self.doc_counts: Counter = Counter()
+        self.feature_counts: Dict[str, Counter] = {label: Counter() for label in labels}
+        self.feature_totals: Counter = Counter()
+        self.vocabulary: set = set()
+
+    @property
+    def examples(self) -> int:
+        return sum(self.doc_counts.values())
+
+    def learn(self, text: str, label: str) -> None:
+        features = _features(text)
+        self.doc_counts[label] += 1
+        self.feature_counts[label].update(features)
+        self.feature_totals[label] += sum(features.values())
+        self.vocabulary.update(features)
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """(etiket, posterior olasılığı); model boşsa ya da kanıt yetersizse (None, 0)"""
+        if not self.examples:
+            return None, 0.0
+        known = {feature: count for feature, count in _features(text).items() if feature in self.vocabulary}
+        # Normalize skor kanıt miktarından bağımsızdır; tek bir karakter n-gram'ı (ör. "selam" -> "am$")
+        # kesin karar üretmesin diye en az bir bilinen kelime ve birkaç eşleşen özellik şart
+        if len(known) < self.min_known_features or not any(feature[0] in "wb" for feature in known):
+            return None, 0.0
+        known_total = sum(known.values())
+        vocab_size = len(self.vocabulary) or 1
+        scores: Dict[str, float] = {}
+        for label in self.labels:
+            # Hiç örneği olmayan sınıf da yumuşatılmış önsel olasılıkla yarışır
+            prior = (self.doc_counts[label] + 1) / (self.examples + len(self.labels))
+            denominator = self.feature_totals[label] + self.alpha * vocab_size
+            counts = self.feature_counts[label]
+            likelihood = sum(
+                count * math.log((counts[feature] + self.alpha) / denominator)
+                for feature, count in known.items()
+            )
+            # Özellik sayısına göre normalize: uzun sorgularda NB'nin aşırı güvenini yumuşatır
+            scores[label] = math.log(prior) + self.sharpness * likelihood / known_total
+        best = max(scores, key=scores.get)
+        top = scores[best]
+        total = sum(math.exp(score - top) for score in scores.values())
+        return best, 1.0 / total
+
+
+class IntentRouter:
+    """Kural tablosu -> n-gram modeli -> (güven düşükse) LLM sırasıyla yönlendirme"""
+
+    def __init__(
+        self,
+        min_confidence: float = 0.75,
+        model_min_confidence: float = 0.9,
+        store_path: Optional[str] = None
+    ):
+        # Kural skorları daha güvenilir; modelin (az örnekle) kalibrasyonu zayıf olduğundan eşiği daha yüksek
+        self.min_confidence = min_confidence
+        self.model_min_confidence = model_min_confidence
+        self.model = NaiveBayesIntentModel()
+        self._lock = threading.Lock()
+        self._store: Optional[SQLiteKVStore] = None
+        self._stats = Counter()
+
+        for text, label in _SEED_EXAMPLES:
+            self.model.learn(normalize_query(text), label)
+        if store_path:
+            try:
+                self._store = SQLiteKVStore(store_path, table="intent_examples")
+                for query, label in self._store.items():
+                    label = label.decode("utf-8")
+                    if label in AGENTS:
+                        self.model.learn(query, label)
+            except Exception as e:
+                logger.warning(f"Intent router example store unavailable: {e}")
+                self._store = None
+
+    @staticmethod
+    def _rule_scores(text: str) -> Dict[str, float]:
+        return {
+            agent: sum(weight for pattern, weight in rules if pattern.search(text))
+            for agent, rules in _COMPILED_RULES.items()
+        }
+
+    def classify(self, query: str) -> Tuple[Optional[str], float, str]:
+        """(agent, güven, kaynak); kaynak 'rules', 'model' ya da 'none'"""
+        text = normalize_query(query)
+        if not text:
+            return None, 0.0, "none"
+
+        scores = self._rule_scores(text)
+        total = sum(scores.values())
+        if total:
+            agent = max(scores, key=scores.get)
+            confidence = scores[agent] / total
+            if confidence >= self.min_confidence:
+                return agent, confidence, "rules"
+
+        with self._lock:
+            agent, confidence = self.model.predict(text)
+        if agent and confidence >= self.model_min_confidence:
+            return agent, confidence, "model"
+        return None, confidence, "none"
+
+    def route(self, query: str) -> Optional[str]:
+        """Yerel kararı döndür; None ise çağıran LLM'e sormalı"""
+        agent, confidence, source = self.classify(query)
+        self._stats["total"] += 1
+        self._stats[f"{source}_hits" if agent else "llm_fallbacks"] += 1
+        return agent
+
+    def learn(self, query: str, agent: str) -> None:
+        """LLM'in verdiği kararı etiketli örnek olarak kaydet"""
+        if agent not in AGENTS:
+            return
+        text = normalize_query(query)
+        if not text:
+            return
+        with self._lock:
+            self.model.learn(text, agent)
+        self._stats["learned"] += 1
+        if self._store is not None:
+            try:
+                self._store.set(text, agent.encode("utf-8"))
+            except Exception as e:
+                logger.warning(f"Intent example could not be stored: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        total = self._stats["total"]
+        local = self._stats["rules_hits"] + self._stats["model_hits"]
+        return {
+            "total": total,
+            "rules_hits": self._stats["rules_hits"],
+            "model_hits": self._stats["model_hits"],
+            "llm_fallbacks": self._stats["llm_fallbacks"],
+            "hit_rate": round(local / total, 4) if total else 0.0,
+            "learned": self._stats["learned"],
+            "model_examples": self.model.examples,
+            "min_confidence": self.min_confidence,
+            "model_min_confidence": self.model_min_confidence,
+        }
+
+
+# Global instance
+intent_router = IntentRouter(
+    min_confidence=settings.INTENT_ROUTER_MIN_CONFIDENCE,
+    model_min_confidence=settings.INTENT_ROUTER_MODEL_MIN_CONFIDENCE,
+    store_path=settings.INTENT_ROUTER_PATH,
+)
@@ -0,0 +1,301 @@
+"""
+Kalıcı arka plan iş kuyruğu.
+
+İşler yerel bir SQLite dosyasında tutulur; her işin türü (``kind``) için kayıtlı
+bir async handler çalıştırılır. Aynı ``idempotency_key`` ile gelen ikinci
+istek yeni iş açmaz, mevcut işi döndürür. Başarısız işler backoff ile yeniden
+denenir; süreç yeniden başladığında yarım kalan işler tekrar kuyruğa alınır.
+Handler'ın döndürdüğü sonuç iş kaydında saklanır, durum endpoint'leri yalnızca
+bu kaydı okur.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# payload -> JSON'a çevrilebilir sonuç
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+_COLUMNS = (
+    "id, kind, idempotency_key, payload, status, attempts, "
+    "result, last_error, created_at, updated_at"
+)
+
+
+class JobQueue:
+    """SQLite destekli, idempotent ve yeniden deneme yapan iş kuyruğu"""
+
+    def __init__(
+        self,
+        path: str = "./job_queue.db",
+        workers: int = 2,
+        max_attempts: int = 3,
+        poll_interval: float = 2.0,
+        retry_base_delay: float = 10.0,
+    ):
+        self.path = path
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retry_base_delay = retry_base_delay
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                idempotency_key TEXT UNIQUE,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                result TEXT,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_jobs_status_next ON jobs (status, next_attempt_at)"
+        )
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._completed = 0
+        self._retried = 0
+        self._failed = 0
+
+        recovered = self._recover()
+        if recovered:
+            logger.info(f"Job queue: {recovered} interrupted jobs requeued")
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """``kind`` türündeki işleri çalıştıracak handler'ı kaydet"""
+        self._handlers[kind] = handler
+
+    # ------------------------------------------------------------------
+    # Producer tarafı
+    # ------------------------------------------------------------------
+    def enqueue(self, kind: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """İşi kuyruğa ekle; aynı anahtarla kayıtlı iş varsa onu döndür"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (kind, idempotency_key, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (kind, idempotency_key, json.dumps(payload, ensure_ascii=False, default=str), now, now),
+            )
+            created = cursor.rowcount == 1
+            if created:
+                row = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (cursor.lastrowid,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+        if created and self._wakeup is not None:
+            self._wakeup.set()
+        return self._to_dict(row)
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_by_key(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def retry(self, job_id: int) -> bool:
+        """Kalıcı olarak başarısız olmuş işi tekrar kuyruğa al"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, next_attempt_at = 0, updated_at = ? "
+                "WHERE id = ? AND status = 'failed'",
+                (time.time(), job_id),
+            )
+        if cursor.rowcount and self._wakeup is not None:
+            self._wakeup.set()
+        return cursor.rowcount == 1
+
+    # ------------------------------------------------------------------
+    # Worker yaşam döngüsü
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Worker havuzunu mevcut event loop'ta başlat"""
+        if any(not task.done() for task in self._tasks):
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"job-queue-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Job queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Worker'ları durdur; yarıda kalan işler bir sonraki açılışta tekrar denenir"""
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._recover()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job queue worker error: {e}")
+                processed = False
+
+            if processed:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_next(self) -> bool:
+        """Hazır olan bir işi çalıştır; iş yoksa False"""
+        job = self._claim()
+        if job is None:
+            return False
+
+        handler = self._handlers[job["kind"]]
+        try:
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            self._release(job["id"])
+            raise
+        except Exception as e:
+            self._mark_failed(job["id"], job["attempts"] + 1, str(e))
+            logger.warning(f"Job {job['id']} ({job['kind']}) failed on attempt {job['attempts'] + 1}: {e}")
+            return True
+        self._mark_done(job["id"], result)
+        self._completed += 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Kuyruk işlemleri
+    # ------------------------------------------------------------------
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        kinds = list(self._handlers)
+        if not kinds:
+            return None
+        placeholders = ", ".join("?" for _ in kinds)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs "
+                    f"WHERE status = 'pending' AND next_attempt_at <= ? AND kind IN ({placeholders}) "
+                    "ORDER BY id LIMIT 1",
+                    (time.time(), *kinds),
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'processing', updated_at = ? WHERE id = ?",
+                        (time.time(), row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._to_dict(row) if row else None
+
+    def _mark_done(self, job_id: int, result: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', attempts = attempts + 1, result = ?, last_error = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (json.dumps(result, ensure_ascii=False, default=str), time.time(), job_id),
+            )
+
+    def _mark_failed(self, job_id: int, attempts: int, error: str) -> None:
+        now = time.time()
+        status = "failed" if attempts >= self.max_attempts else "pending"
+        delay = self.retry_base_delay * (2 ** (attempts - 1))
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (status, attempts, now + delay, error[:500], now, job_id),
+            )
+        if status == "failed":
+            self._failed += 1
+        else:
+            self._retried += 1
+
+    def _release(self, job_id: int) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'pending' WHERE id = ?", (job_id,))
+
+    def _recover(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'pending' WHERE status = 'processing'"
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "idempotency_key": row[2],
+            "payload": json.loads(row[3]),
+            "status": row[4],
+            "attempts": row[5],
+            "result": json.loads(row[6]) if row[6] is not None else None,
+            "error": row[7],
+            "created_at": row[8],
+            "updated_at": row[9],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(
+                self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+            )
+        return {
+            "running_workers": sum(1 for task in self._tasks if not task.done()),
+            "handlers": sorted(self._handlers),
+            "pending": counts.get("pending", 0),
+            "processing": counts.get("processing", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "completed": self._completed,
+            "retried": self._retried,
+            "failed_permanently": self._failed,
+        }
+
+
+# Global instance
+job_queue = JobQueue(
+    path=settings.JOB_QUEUE_PATH,
+    workers=settings.JOB_QUEUE_WORKERS,
+    max_attempts=settings.JOB_QUEUE_MAX_ATTEMPTS,
+    retry_base_delay=settings.JOB_QUEUE_RETRY_BASE_DELAY_SECONDS,
+)
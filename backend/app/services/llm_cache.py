@@ -0,0 +1,131 @@
+"""
+Agent LLM çağrıları için opt-in yanıt cache'i.
+
+LangChain'in ``BaseCache`` arayüzünü uygular; ``BaseAgent`` bunu ``cache=``
+parametresi olarak verir. Anahtar model, prompt ve parametrelerden (LangChain'in
+``llm_string``'i) türetilir. Bellek içi LRU katmanının arkasında SQLite tabanlı
+kalıcı bir katman bulunur. TTL agent bazında ayarlanır ve tek bir istek için
+``bypass_llm_cache()`` ile cache atlanabilir.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional, Sequence
+import hashlib
+import json
+import logging
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+from app.core.config import settings
+from app.utils.cache import TTLCache, MISSING
+from app.utils.sqlite_kv import SQLiteKVStore
+
+logger = logging.getLogger(__name__)
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+_memory_tier: Optional[TTLCache] = None
+_persistent_tier: Optional[SQLiteKVStore] = None
+
+
+@contextmanager
+def bypass_llm_cache(enabled: bool = True):
+    """Bu blok içindeki LLM çağrıları cache'ten okumaz (sonuçlar yine de yazılır)"""
+    token = _bypass.set(bool(enabled))
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class AgentResponseCache(BaseCache):
+    """Tek bir agent'a ait namespace ve TTL ile çalışan iki katmanlı cache"""
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        memory_tier: TTLCache,
+        persistent_tier: Optional[SQLiteKVStore] = None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.memory_tier = memory_tier
+        self.persistent_tier = persistent_tier
+        self.bypassed = 0
+        self.persistent_hits = 0
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        payload = f"{self.namespace}\x00{llm_string}\x00{prompt}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        if _bypass.get():
+            self.bypassed += 1
+            return None
+        key = self._key(prompt, llm_string)
+        cached = self.memory_tier.get(key)
+        if cached is not MISSING:
+            return cached
+        if self.persistent_tier is None:
+            return None
+        try:
+            raw = self.persistent_tier.get(key)
+            if raw is None:
+                return None
+            generations = [loads(item) for item in json.loads(raw)]
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+        self.persistent_hits += 1
+        self.memory_tier.set(key, generations, ttl=self.ttl)
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._key(prompt, llm_string)
+        self.memory_tier.set(key, return_val, ttl=self.ttl)
+        if self.persistent_tier is None:
+            return
+        try:
+            payload = json.dumps([dumps(generation) for generation in return_val])
+            self.persistent_tier.set(key, payload.encode("utf-8"), ttl=self.ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        # Bellek katmanı ve yerel SQLite okuması hızlı; executor'a gerek yok
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        self.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.memory_tier.clear()
+
+
+def get_llm_cache(agent_name: str) -> Optional[AgentResponseCache]:
+    """Agent için cache döndür; kapalıysa ya da agent için TTL tanımlı değilse None"""
+    global _memory_tier, _persistent_tier
+
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    ttl = settings.LLM_CACHE_TTLS.get(agent_name)
+    if not ttl:
+        return None
+
+    if _memory_tier is None:
+        _memory_tier = TTLCache(maxsize=settings.LLM_CACHE_SIZE, ttl=None, name="llm_responses")
+    if _persistent_tier is None and settings.LLM_CACHE_PATH:
+        try:
+            _persistent_tier = SQLiteKVStore(settings.LLM_CACHE_PATH, table="llm_responses")
+        except Exception as e:
+            logger.warning(f"LLM cache persistent tier disabled: {e}")
+
+    return AgentResponseCache(
+        namespace=agent_name,
+        ttl=float(ttl),
+        memory_tier=_memory_tier,
+        persistent_tier=_persistent_tier,
+    )
@@ -0,0 +1,85 @@
+"""
+Agent çalışırken üretilen LLM çıktısını SSE akışına taşıma.
+
+``stream_agent_events`` kaynağı ayrı bir task'ta çalıştırır ve o task içindeki
+tüm LangChain çağrılarına (contextvar + configure hook ile) bir callback
+handler ekler. Model token akıtıyorsa her token, akıtmıyorsa her LLM çağrısının
+tamamı ``token`` olayı olarak iletilir; agent kodunda değişiklik gerekmez.
+"""
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Optional, Set, Tuple
+from uuid import UUID
+import asyncio
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+Event = Tuple[str, Any]
+
+_token_sink: ContextVar[Optional["TokenStreamHandler"]] = ContextVar("llm_token_sink", default=None)
+register_configure_hook(_token_sink, inheritable=True)
+
+_END = object()
+
+
+class TokenStreamHandler(AsyncCallbackHandler):
+    """LLM token'larını ve çağrı sonuçlarını bir asyncio kuyruğuna yazar"""
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+        self._streamed: Set[UUID] = set()
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        if token:
+            self._streamed.add(run_id)
+            await self.queue.put(("token", {"delta": token}))
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id in self._streamed:
+            self._streamed.discard(run_id)
+            return
+        # Akıtılmayan çağrı: tamamlanan metni tek parça olarak gönder
+        try:
+            text = response.generations[0][0].text
+        except (IndexError, AttributeError):
+            return
+        if text:
+            await self.queue.put(("token", {"delta": text, "complete": True}))
+
+
+async def single_result(awaitable: Awaitable[Any]) -> AsyncIterator[Event]:
+    """Tek sonuç döndüren agent çağrısını olay akışına çevir"""
+    yield "result", await awaitable
+
+
+async def stream_agent_events(source: AsyncIterator[Event]) -> AsyncIterator[Event]:
+    """``source`` olaylarını, çalışırken üretilen LLM token olaylarıyla birlikte akıt"""
+    queue: asyncio.Queue = asyncio.Queue()
+    handler = TokenStreamHandler(queue)
+
+    async def _pump() -> None:
+        try:
+            async for event in source:
+                await queue.put(event)
+        finally:
+            await queue.put(_END)
+
+    # Task oluşturulurken context kopyalanır; handler yalnızca bu task'ın çağrılarını görür
+    context_token = _token_sink.set(handler)
+    try:
+        task = asyncio.create_task(_pump())
+    finally:
+        _token_sink.reset(context_token)
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            yield item
+        # Kaynakta oluşan hatayı çağırana ilet
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,163 @@
+"""
+Mem0 için non-blocking erişim katmanı.
+
+Mem0'ın ``add/search/get_all`` çağrıları senkron çalışır ve içlerinde embedding
+ve LLM round-trip'leri barındırır. Bu modül bu çağrıları sınırlı bir thread
+havuzunda çalıştırarak event loop'un bloklanmasını engeller.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackendOverloaded(RuntimeError):
+    """Bekleyen çağrı sayısı sınırı aşıldığında fırlatılır"""
+
+
+class AsyncMemoryBackend:
+    """
+    Senkron Mem0 ``Memory`` nesnesini async API ile sarar.
+
+    - Çağrılar ``max_workers`` ile sınırlı bir executor üzerinde çalışır
+    - Her çağrının bir timeout'u vardır
+    - ``max_pending`` aşılırsa yeni çağrılar beklemek yerine reddedilir (backpressure)
+    - İptal edilen/timeout olan çağrılar kuyrukta bekliyorsa executor'dan da düşürülür
+    """
+
+    def __init__(
+        self,
+        memory: Any,
+        max_workers: int = 4,
+        call_timeout: float = 20.0,
+        max_pending: int = 64,
+    ):
+        self.memory = memory
+        self.max_workers = max_workers
+        self.call_timeout = call_timeout
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mem0"
+        )
+        # Sayaçlar farklı thread'lerden güncellendiği için asyncio değil threading lock
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._in_flight = 0
+        self._counters: Dict[str, int] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+            "rejected": 0,
+        }
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._total_queue_wait = 0.0
+
+    async def add(self, timeout: Optional[float] = None, **kwargs) -> Any:
+        return await self._run("add", self.memory.add, timeout=timeout, **kwargs)
+
+    async def search(self, timeout: Optional[float] = None, **kwargs) -> Any:
+        return await self._run("search", self.memory.search, timeout=timeout, **kwargs)
+
+    async def get_all(self, timeout: Optional[float] = None, **kwargs) -> Any:
+        return await self._run("get_all", self.memory.get_all, timeout=timeout, **kwargs)
+
+    async def _run(
+        self,
+        op: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters["rejected"] += 1
+                raise MemoryBackendOverloaded(
+                    f"Memory backend overloaded ({self._pending} pending), {op} rejected"
+                )
+            self._pending += 1
+            self._counters["submitted"] += 1
+
+        submitted_at = time.monotonic()
+        call = functools.partial(self._execute, fn, submitted_at, *args, **kwargs)
+        try:
+            cfuture = self._executor.submit(call)
+        except RuntimeError:
+            # Executor kapatılmışsa (shutdown sonrası)
+            with self._lock:
+                self._pending -= 1
+            raise
+        cfuture.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(cfuture),
+                timeout=timeout if timeout is not None else self.call_timeout,
+            )
+        except asyncio.TimeoutError:
+            # Henüz başlamadıysa kuyruktan düşür; çalışıyorsa thread'i bitirmesine izin ver
+            cfuture.cancel()
+            with self._lock:
+                self._counters["timeouts"] += 1
+            logger.warning(f"Mem0 {op} call timed out")
+            raise
+        except asyncio.CancelledError:
+            cfuture.cancel()
+            with self._lock:
+                self._counters["cancelled"] += 1
+            raise
+
+    def _execute(self, fn: Callable[..., Any], submitted_at: float, *args: Any, **kwargs: Any) -> Any:
+        started_at = time.monotonic()
+        with self._lock:
+            self._in_flight += 1
+            self._total_queue_wait += started_at - submitted_at
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._counters["failed"] += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started_at
+            with self._lock:
+                self._in_flight -= 1
+                self._total_latency += elapsed
+                self._max_latency = max(self._max_latency, elapsed)
+        with self._lock:
+            self._counters["completed"] += 1
+        return result
+
+    def _release(self, _future) -> None:
+        # Çağrı bitti ya da kuyruktayken iptal edildi; slot'u serbest bırak
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Backpressure ve gecikme metrikleri"""
+        with self._lock:
+            finished = self._counters["completed"] + self._counters["failed"]
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "call_timeout": self.call_timeout,
+                "pending": self._pending,
+                "in_flight": self._in_flight,
+                "queued": max(self._pending - self._in_flight, 0),
+                **self._counters,
+                "avg_latency_ms": round(self._total_latency / finished * 1000, 1) if finished else 0.0,
+                "max_latency_ms": round(self._max_latency * 1000, 1),
+                "avg_queue_wait_ms": round(self._total_queue_wait / finished * 1000, 1) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Kuyruktaki çağrıları iptal et ve executor'ı kapat"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -21,12 +21,28 @@ except ImportError:
         GEMINI_API_KEY = "test-key"
     settings = Settings()
 
+from app.services.memory_backend import AsyncMemoryBackend
+from app.services.memory_write_queue import MemoryWriteQueue
+from app.services.embedding_cache import EmbeddingCache, CachedEmbedder
+from app.utils.cache import TTLCache, MISSING
+
 class PersonalizedMemoryService:
     """
     Mem0 kullanarak kişiselleştirilmiş öğrenme belleği yönetimi
     """
     
     def __init__(self):
+        self.backend: Optional[AsyncMemoryBackend] = None
+        self.write_queue: Optional[MemoryWriteQueue] = None
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        # generate_ai_response için süreç başına tek LLM istemcisi
+        self._response_llm = None
+        # Kullanıcı + sorgu bazlı arama sonuçları; yazmalarda kullanıcı bazında temizlenir
+        self.context_cache = TTLCache(
+            maxsize=getattr(settings, "MEMORY_CACHE_SIZE", 2048),
+            ttl=getattr(settings, "MEMORY_CACHE_TTL_SECONDS", 300),
+            name="memory_context",
+        )
         if not MEM0_AVAILABLE:
             logger.warning("Mem0 not available, using fallback mode")
             self.memory = None
@@ -87,6 +103,39 @@ class PersonalizedMemoryService:
             logger.error(f"Failed to initialize Mem0 Memory: {e}")
             logger.warning("Memory features will be disabled")
             self.memory = None
+
+        if self.memory and getattr(settings, "EMBEDDING_CACHE_ENABLED", False):
+            # Aynı metinler (sabit sorgu şablonları dahil) tekrar embed edilmesin
+            try:
+                self.embedding_cache = EmbeddingCache(path=settings.EMBEDDING_CACHE_PATH)
+                self.memory.embedding_model = CachedEmbedder(
+                    self.memory.embedding_model,
+                    self.embedding_cache,
+                    model=self.config["embedder"]["config"]["model"],
+                )
+            except Exception as e:
+                logger.error(f"Failed to enable embedding cache: {e}")
+                self.embedding_cache = None
+
+        if self.memory:
+            # Senkron Mem0 çağrıları event loop'u bloklamasın diye sınırlı executor üzerinden
+            self.backend = AsyncMemoryBackend(
+                self.memory,
+                max_workers=getattr(settings, "MEMORY_EXECUTOR_WORKERS", 4),
+                call_timeout=getattr(settings, "MEMORY_CALL_TIMEOUT_SECONDS", 20.0),
+                max_pending=getattr(settings, "MEMORY_MAX_PENDING", 64),
+            )
+            if getattr(settings, "MEMORY_WRITE_BEHIND", False):
+                # Yazmalar kuyruğa alınır, arka plan worker'ı toplu halde Mem0'a aktarır
+                try:
+                    self.write_queue = MemoryWriteQueue(
+                        path=settings.MEMORY_WRITE_QUEUE_PATH,
+                        batch_size=settings.MEMORY_WRITE_BATCH_SIZE,
+                        max_attempts=settings.MEMORY_WRITE_MAX_ATTEMPTS,
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to open memory write queue, writing inline: {e}")
+                    self.write_queue = None
     
     def health_check(self) -> Dict[str, Any]:
         """Memory servis durumunu kontrol et"""
@@ -95,8 +144,70 @@ class PersonalizedMemoryService:
             "service_available": self.memory is not None,
             "memory_initialized": self.memory is not None,
             "provider": self.config.get("llm", {}).get("provider", "none") if hasattr(self, 'config') else "none",
-            "model": self.config.get("llm", {}).get("config", {}).get("model", "none") if hasattr(self, 'config') else "none"
+            "model": self.config.get("llm", {}).get("config", {}).get("model", "none") if hasattr(self, 'config') else "none",
+            "backend": self.backend.stats() if self.backend else None,
+            "write_queue": self.write_queue.stats() if self.write_queue else None,
+            "context_cache": self.context_cache.stats(),
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None
         }
+
+    def start_background_tasks(self) -> None:
+        """Write-behind worker'ını başlat (uygulama lifespan'i içinden çağrılır)"""
+        if self.write_queue:
+            self.write_queue.start(self._flush_memory_writes)
+
+    async def shutdown(self) -> None:
+        """Kuyruğu boşalt ve executor'ı kapat"""
+        if self.write_queue:
+            await self.write_queue.stop()
+        if self.backend:
+            self.backend.shutdown()
+
+    async def _write(
+        self,
+        user_id: str,
+        role: str,
+        content: str,
+        metadata: Dict[str, Any]
+    ) -> None:
+        """Tek bir kaydı kuyruğa al ya da (kuyruk kapalıysa) doğrudan yaz"""
+        metadata = self._sanitize_metadata(metadata)
+        self.invalidate_user_cache(user_id)
+        if self.write_queue:
+            self.write_queue.enqueue(user_id, role, content, metadata)
+            return
+        await self.backend.add(
+            messages=[{"role": role, "content": content}],
+            user_id=user_id,
+            metadata=metadata
+        )
+
+    async def _flush_memory_writes(
+        self,
+        user_id: str,
+        messages: List[Dict[str, str]],
+        metadata: Dict[str, Any]
+    ) -> None:
+        """Kuyruk worker'ı için: birleştirilmiş kayıtları tek add çağrısıyla yaz"""
+        await self.backend.add(messages=messages, user_id=user_id, metadata=metadata)
+        # Kuyruk beklerken cache'lenmiş eski sonuçları da düşür
+        self.invalidate_user_cache(user_id)
+
+    def invalidate_user_cache(self, user_id: str) -> int:
+        """Kullanıcının cache'lenmiş hafıza sorgularını temizle"""
+        user_key = str(user_id)
+        return self.context_cache.invalidate(lambda key: key[0] == user_key)
+
+    def _cached_memories(self, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        cached = self.context_cache.get(key)
+        if cached is MISSING:
+            return None
+        # Çağıranlar kayıtları değiştirebilir; cache'teki kopyayı koru
+        return [dict(m) for m in cached]
+
+    def _cache_memories(self, key: tuple, memories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self.context_cache.set(key, [dict(m) for m in memories])
+        return memories
     
     async def store_learning_session(
         self, 
@@ -115,20 +226,18 @@ class PersonalizedMemoryService:
             performance_text = self._format_performance_data(session_data)
             
             # Mem0'a kaydet
-            self.memory.add(
-                messages=[{
-                    "role": "user",
-                    "content": performance_text
-                }],
-                user_id=user_id,
-                metadata=self._sanitize_metadata({
+            await self._write(
+                user_id,
+                "user",
+                performance_text,
+                {
                     "session_type": "learning",
                     "subject": session_data.get("subject"),
                     "topic": session_data.get("topic"),
                     "education_level": session_data.get("education_level"),
                     "accuracy": session_data.get("accuracy", 0),
                     "timestamp": session_data.get("timestamp")
-                })
+                }
             )
             
             logger.info(f"Learning session stored for user {user_id}")
@@ -159,18 +268,16 @@ class PersonalizedMemoryService:
             - Detaylı Analiz: {analysis_data.get('detailed_analysis', '')}
             """
             
-            self.memory.add(
-                messages=[{
-                    "role": "assistant", 
-                    "content": analysis_text
-                }],
-                user_id=user_id,
-                metadata=self._sanitize_metadata({
+            await self._write(
+                user_id,
+                "assistant",
+                analysis_text,
+                {
                     "session_type": "analysis",
                     "subject": analysis_data.get("subject"),
                     "topic": analysis_data.get("topic"),
                     "weakness_level": analysis_data.get("weakness_level", 0)
-                })
+                }
             )
             
             logger.info(f"Weakness analysis stored for user {user_id}")
@@ -191,12 +298,17 @@ class PersonalizedMemoryService:
             return []
             
         try:
+            cache_key = (str(user_id), "get_all")
+            cached = self._cached_memories(cache_key)
+            if cached is not None:
+                return cached
+
             if hasattr(self.memory, "get_all"):
-                memories_raw = self.memory.get_all(user_id=user_id)
+                memories_raw = await self.backend.get_all(user_id=user_id)
             else:
                 # Fallback to empty-query search when `get_all` isn't available
-                memories_raw = self.memory.search(query="", user_id=user_id, limit=100)
-            return self._normalize_memories(memories_raw)
+                memories_raw = await self.backend.search(query="", user_id=user_id, limit=100)
+            return self._cache_memories(cache_key, self._normalize_memories(memories_raw))
             
         except Exception as e:
             logger.error(f"Error retrieving all memories: {e}")
@@ -216,12 +328,17 @@ class PersonalizedMemoryService:
             return []
             
         try:
-            memories_raw = self.memory.search(
+            cache_key = (str(user_id), "search", query, limit)
+            cached = self._cached_memories(cache_key)
+            if cached is not None:
+                return cached
+
+            memories_raw = await self.backend.search(
                 query=query,
                 user_id=user_id,
                 limit=limit
             )
-            return self._normalize_memories(memories_raw)
+            return self._cache_memories(cache_key, self._normalize_memories(memories_raw))
             
         except Exception as e:
             logger.error(f"Error retrieving personalized context: {e}")
@@ -241,13 +358,17 @@ class PersonalizedMemoryService:
             
         try:
             query = f"öğrenme performansı {subject}" if subject else "öğrenme performansı"
+            cache_key = (str(user_id), "search", query, 10)
+            cached = self._cached_memories(cache_key)
+            if cached is not None:
+                return cached
             
-            memories_raw = self.memory.search(
+            memories_raw = await self.backend.search(
                 query=query,
                 user_id=user_id,
                 limit=10
             )
-            return self._normalize_memories(memories_raw)
+            return self._cache_memories(cache_key, self._normalize_memories(memories_raw))
             
         except Exception as e:
             logger.error(f"Error retrieving learning history: {e}")
@@ -274,16 +395,14 @@ class PersonalizedMemoryService:
             - Öğrenme Stili: {profile_updates.get('learning_style', '')}
             """
             
-            self.memory.add(
-                messages=[{
-                    "role": "user",
-                    "content": profile_text
-                }],
-                user_id=user_id,
-                metadata=self._sanitize_metadata({
+            await self._write(
+                user_id,
+                "user",
+                profile_text,
+                {
                     "session_type": "profile_update",
                     "timestamp": profile_updates.get("timestamp")
-                })
+                }
             )
             
             logger.info(f"User profile updated for user {user_id}")
@@ -292,6 +411,24 @@ class PersonalizedMemoryService:
             logger.error(f"Error updating user profile: {e}")
             # Don't raise, just log
     
+    async def add_memory(
+        self,
+        user_id: str,
+        content: str,
+        metadata: Dict[str, Any],
+        role: str = "assistant"
+    ) -> None:
+        """
+        Serbest metin bir kaydı hafızaya ekle (agent'ların doğrudan Mem0'a yazması yerine)
+        """
+        if not self.memory:
+            return
+
+        try:
+            await self._write(user_id, role, content, metadata)
+        except Exception as e:
+            logger.error(f"Error adding memory: {e}")
+
     def _format_performance_data(self, session_data: Dict[str, Any]) -> str:
         """
         Performans verilerini metinsel formata çevir
@@ -356,20 +493,18 @@ class PersonalizedMemoryService:
         Question agent ile AI yanıt oluştur
         """
         try:
-            # Question agent'ı kullan (concrete implementation)
-            from app.agents.question_agent import QuestionAgent
-            from langchain_google_genai import ChatGoogleGenerativeAI
-            from app.core.config import settings
-            
-            # Direkt ChatGoogleGenerativeAI kullan
-            llm = ChatGoogleGenerativeAI(
-                model="gemini-2.0-flash",
-                google_api_key=settings.GEMINI_API_KEY,
-                temperature=0.7
-            )
+            # Direkt ChatGoogleGenerativeAI kullan - istemci ilk çağrıda bir kez oluşturulur
+            if self._response_llm is None:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                
+                self._response_llm = ChatGoogleGenerativeAI(
+                    model="gemini-2.0-flash",
+                    google_api_key=settings.GEMINI_API_KEY,
+                    temperature=0.7
+                )
             
             # Prompt'u invoke et
-            response = await llm.ainvoke(prompt)
+            response = await self._response_llm.ainvoke(prompt)
             
             if response and hasattr(response, 'content'):
                 return response.content
@@ -0,0 +1,280 @@
+"""
+Mem0 yazmaları için kalıcı write-behind kuyruğu.
+
+``store_*`` çağrıları kaydı yerel bir SQLite dosyasına yazıp hemen döner. Arka
+plandaki worker bekleyen kayıtları toplar, aynı kullanıcının aynı tür ve
+ders/konudaki kayıtlarını tek bir ``memory.add`` çağrısında birleştirir ve
+başarısız olanları backoff ile yeniden dener. Süreç yeniden başladığında yarım kalan kayıtlar
+tekrar kuyruğa alınır.
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Yalnızca bu alanları aynı olan kayıtlar tek Mem0 kaydında birleştirilir
+_COALESCE_FIELDS = ("session_type", "subject", "topic")
+
+# (user_id, messages, metadata) -> None
+MemoryWriter = Callable[[str, List[Dict[str, str]], Dict[str, Any]], Awaitable[None]]
+
+
+class MemoryWriteQueue:
+    """SQLite destekli, birleştirme ve yeniden deneme yapan yazma kuyruğu"""
+
+    def __init__(
+        self,
+        path: str = "./memory_queue.db",
+        batch_size: int = 100,
+        max_attempts: int = 5,
+        poll_interval: float = 2.0,
+        retry_base_delay: float = 5.0,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retry_base_delay = retry_base_delay
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS memory_writes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_memory_writes_status_next "
+            "ON memory_writes (status, next_attempt_at)"
+        )
+
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer: Optional[MemoryWriter] = None
+        self._flushed_batches = 0
+        self._flushed_records = 0
+        self._failed_batches = 0
+
+        recovered = self._recover()
+        if recovered:
+            logger.info(f"Memory write queue: {recovered} interrupted writes requeued")
+
+    # ------------------------------------------------------------------
+    # Producer tarafı
+    # ------------------------------------------------------------------
+    def enqueue(self, user_id: str, role: str, content: str, metadata: Dict[str, Any]) -> int:
+        """Kaydı kuyruğa ekle ve worker'ı uyandır"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO memory_writes (user_id, role, content, metadata, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, role, content, json.dumps(metadata, ensure_ascii=False, sort_keys=True), time.time()),
+            )
+            row_id = cursor.lastrowid
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return row_id
+
+    # ------------------------------------------------------------------
+    # Worker yaşam döngüsü
+    # ------------------------------------------------------------------
+    def start(self, writer: MemoryWriter) -> None:
+        """Arka plan worker'ını mevcut event loop'ta başlat"""
+        if self._task and not self._task.done():
+            return
+        self._writer = writer
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="memory-write-queue")
+        logger.info("Memory write queue worker started")
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Worker'ı durdur; kalan kayıtları süre izin verdiği ölçüde yaz"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        try:
+            await asyncio.wait_for(self.flush(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Memory write queue drain timed out, remaining writes stay queued")
+        # Yarıda kalanlar bir sonraki açılışta tekrar denenir
+        self._recover()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                flushed = await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Memory write queue worker error: {e}")
+                flushed = 0
+
+            if flushed:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def flush(self) -> int:
+        """Hazır olan bir batch'i işle, yazılan kayıt sayısını döndür"""
+        rows = self._claim_batch()
+        if not rows:
+            return 0
+
+        written = 0
+        for (user_id, *_scope), group in self._coalesce(rows).items():
+            ids = [row["id"] for row in group]
+            messages = [{"role": row["role"], "content": row["content"]} for row in group]
+            metadata = self._merge_metadata([row["metadata"] for row in group])
+            try:
+                await self._writer(user_id, messages, metadata)
+            except asyncio.CancelledError:
+                self._release(ids)
+                raise
+            except Exception as e:
+                self._failed_batches += 1
+                self._mark_failed(ids, str(e))
+                logger.warning(f"Memory write for user {user_id} failed ({len(ids)} records): {e}")
+                continue
+            self._mark_done(ids)
+            self._flushed_batches += 1
+            self._flushed_records += len(ids)
+            written += len(ids)
+        return written
+
+    # ------------------------------------------------------------------
+    # Kuyruk işlemleri
+    # ------------------------------------------------------------------
+    def _claim_batch(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, user_id, role, content, metadata FROM memory_writes "
+                    "WHERE status = 'pending' AND next_attempt_at <= ? "
+                    "ORDER BY id LIMIT ?",
+                    (time.time(), self.batch_size),
+                ).fetchall()
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE memory_writes SET status = 'processing' WHERE id = ?",
+                        [(row[0],) for row in rows],
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [
+            {"id": r[0], "user_id": r[1], "role": r[2], "content": r[3], "metadata": json.loads(r[4])}
+            for r in rows
+        ]
+
+    def _mark_done(self, ids: List[int]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM memory_writes WHERE id = ?", [(i,) for i in ids])
+
+    def _mark_failed(self, ids: List[int], error: str) -> None:
+        now = time.time()
+        with self._lock:
+            for row_id in ids:
+                attempts = self._conn.execute(
+                    "SELECT attempts FROM memory_writes WHERE id = ?", (row_id,)
+                ).fetchone()[0] + 1
+                status = "failed" if attempts >= self.max_attempts else "pending"
+                delay = self.retry_base_delay * (2 ** (attempts - 1))
+                self._conn.execute(
+                    "UPDATE memory_writes SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+                    "WHERE id = ?",
+                    (status, attempts, now + delay, error[:500], row_id),
+                )
+
+    def _release(self, ids: List[int]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE memory_writes SET status = 'pending' WHERE id = ?", [(i,) for i in ids]
+            )
+
+    def _recover(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE memory_writes SET status = 'pending' WHERE status = 'processing'"
+            )
+            return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # Birleştirme
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _coalesce(rows: List[Dict[str, Any]]) -> Dict[Tuple[str, ...], List[Dict[str, Any]]]:
+        """Aynı kullanıcının aynı session_type/ders/konu kayıtlarını grupla (metadata filtrelenebilir kalsın)"""
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            metadata = row["metadata"]
+            key = (row["user_id"],) + tuple(str(metadata.get(field, "")) for field in _COALESCE_FIELDS)
+            groups.setdefault(key, []).append(row)
+        return groups
+
+    @staticmethod
+    def _merge_metadata(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Ortak alanları koru; timestamp için en yenisini al, çelişen diğer alanları bırak.
+
+        Metadata Mem0'da filtrelemede kullanıldığından değerler skaler kalmalı.
+        """
+        if len(items) == 1:
+            return items[0]
+        merged: Dict[str, Any] = {}
+        keys = {k for item in items for k in item}
+        for key in sorted(keys):
+            values = []
+            for item in items:
+                if key in item and item[key] not in values:
+                    values.append(item[key])
+            if len(values) == 1:
+                merged[key] = values[0]
+            elif key == "timestamp":
+                merged[key] = max(values, key=str)
+        merged["batched_records"] = len(items)
+        return merged
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM memory_writes GROUP BY status"
+                ).fetchall()
+            )
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "pending": counts.get("pending", 0),
+            "processing": counts.get("processing", 0),
+            "failed": counts.get("failed", 0),
+            "flushed_batches": self._flushed_batches,
+            "flushed_records": self._flushed_records,
+            "failed_batches": self._failed_batches,
+        }
@@ -4,23 +4,35 @@ Parallel Agent Service - Birden fazla agent'i paralel çalıştırmak için serv
 
 import asyncio
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator, Tuple
 from sqlalchemy.orm import Session
 import logging
 
 from app.agents.analysis_agent import AnalysisAgent
 from app.agents.book_agent import BookAgent
 from app.agents.youtube_agent import YouTubeAgent
+from app.agents.registry import AgentRegistry, agent_registry
 
 logger = logging.getLogger(__name__)
 
 class ParallelAgentService:
     """Birden fazla agent'i paralel çalıştıran servis"""
     
-    def __init__(self):
-        self.analysis_agent = AnalysisAgent()
-        self.book_agent = BookAgent()
-        self.youtube_agent = YouTubeAgent()
+    def __init__(self, registry: AgentRegistry = agent_registry):
+        # Agent'lar MasterAgent ile paylaşılır, ilk kullanımda oluşturulur
+        self._registry = registry
+    
+    @property
+    def analysis_agent(self) -> AnalysisAgent:
+        return self._registry.get("analysis")
+    
+    @property
+    def book_agent(self) -> BookAgent:
+        return self._registry.get("book")
+    
+    @property
+    def youtube_agent(self) -> YouTubeAgent:
+        return self._registry.get("youtube")
     
     async def process_exam_results_parallel(
         self,
@@ -32,6 +44,22 @@ class ParallelAgentService:
         """
         Sınav sonuçlarını paralel olarak analiz eder ve öneri getirir
         """
+        result: Dict[str, Any] = {}
+        async for event, data in self.iter_exam_results_parallel(user_id, exam_id, exam_result):
+            if event == "result":
+                result = data
+        return result
+    
+    async def iter_exam_results_parallel(
+        self,
+        user_id: int,
+        exam_id: int,
+        exam_result: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        ``process_exam_results_parallel`` ile aynı akış; her agent tamamlandığında
+        ``agent_result`` olayı, en sonda toplu ``result`` olayı üretir (SSE için)
+        """
         try:
             start_time = time.time()
             
@@ -53,9 +81,10 @@ class ParallelAgentService:
             
             # Sonuçları organize et
             organized_results = {"analysis_agent": analysis_result}
+            yield "agent_result", {"agent": "analysis_agent", "result": analysis_result}
             
             # Zayıf konuları belirle - wrong_topics'i weak_topics olarak kullan
-            weak_topics = exam_result.get("wrong_topics", [])
+            weak_topics = list(exam_result.get("wrong_topics", []))
             print(f"🔍 Exam result'tan gelen zayıf konular (wrong_topics): {weak_topics}")
             
             # Analiz sonucundan da zayıf konuları al
@@ -78,20 +107,12 @@ class ParallelAgentService:
             print(f"🎯 Final zayıf konular tespit edildi: {weak_topics}")
             
             if weak_topics:
-                # Öneri agent'lerini paralel çalıştır
-                tasks = []
-                
                 # Book agent
                 book_input = {
                     "weak_topics": weak_topics,
                     "education_level": "lise",
                     "user_id": str(user_id)  # String'e çevir
                 }
-                tasks.append(self._run_agent_safely(
-                    self.book_agent,
-                    book_input,
-                    "Book Agent"
-                ))
                 
                 # YouTube agent
                 youtube_input = {
@@ -101,25 +122,41 @@ class ParallelAgentService:
                     "language": "Turkish",
                     "user_id": str(user_id)  # String'e çevir
                 }
-                tasks.append(self._run_agent_safely(
-                    self.youtube_agent,
-                    youtube_input,
-                    "YouTube Agent"  
-                ))
                 
-                # Paralel çalıştır
-                recommendation_results = await asyncio.gather(*tasks, return_exceptions=True)
+                # Öneri agent'lerini paralel çalıştır; biten sonucu hemen ilet
+                tasks = {
+                    asyncio.ensure_future(self._run_agent_safely(
+                        self.book_agent, book_input, "Book Agent"
+                    )): "book_agent",
+                    asyncio.ensure_future(self._run_agent_safely(
+                        self.youtube_agent, youtube_input, "YouTube Agent"
+                    )): "youtube_agent",
+                }
+                try:
+                    pending = set(tasks)
+                    while pending:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            key = tasks[task]
+                            organized_results[key] = task.result()
+                            yield "agent_result", {"agent": key, "result": organized_results[key]}
+                finally:
+                    for task in tasks:
+                        if not task.done():
+                            task.cancel()
                 
-                # Sonuçları ekle
-                organized_results["book_agent"] = recommendation_results[0] if len(recommendation_results) > 0 else {"status": "error", "error": "Book agent çalışmadı"}
-                organized_results["youtube_agent"] = recommendation_results[1] if len(recommendation_results) > 1 else {"status": "error", "error": "YouTube agent çalışmadı"}
+                # Sonuç anahtar sırası önceki yanıtla aynı kalsın
+                organized_results = {
+                    key: organized_results[key]
+                    for key in ("analysis_agent", "book_agent", "youtube_agent")
+                }
                 
             else:
                 print("⚠️ Zayıf konu bulunamadı, öneri agent'ları çalıştırılmayacak")
             
             end_time = time.time()
             
-            return {
+            yield "result", {
                 "status": "success",
                 "results": organized_results,
                 "execution_summary": {
@@ -134,7 +171,7 @@ class ParallelAgentService:
             logger.error(f"Parallel agent processing failed: {str(e)}")
             import traceback
             traceback.print_exc()
-            return {
+            yield "result", {
                 "status": "error",
                 "error": str(e),
                 "results": {}
@@ -0,0 +1,233 @@
+"""
+Kullanıcı/ders/konu/gün bazında performans özetleri.
+
+``PerformanceAnalysis`` satırı eklenirken ``apply`` aynı transaction içinde ilgili
+günlük satırı artırır; dashboard tüm istatistikleri bu tablodan tek sorguyla
+okur. ``rebuild`` özetleri ham kayıtlardan yeniden hesaplar (sapma onarımı):
+
+    python -m app.services.performance_rollup_service [--user-id 42]
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+
+from app.models.performance import PerformanceAnalysis, PerformanceDailyRollup
+from app.models.subject import Subject, Topic
+
+logger = logging.getLogger(__name__)
+
+_KEY_COLUMNS = ["user_id", "subject_id", "topic_id", "day"]
+_SUM_COLUMNS = ["session_count", "total_questions", "correct_answers", "accuracy_sum", "accuracy_count"]
+
+
+def _to_day(value: Any) -> date:
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)).date()
+
+
+def _row_values(analysis: PerformanceAnalysis, day: date) -> Dict[str, Any]:
+    return {
+        "user_id": analysis.user_id,
+        "subject_id": analysis.subject_id or 0,
+        "topic_id": analysis.topic_id or 0,
+        "day": day,
+        "session_count": 1,
+        "total_questions": analysis.total_questions or 0,
+        "correct_answers": analysis.correct_answers or 0,
+        "accuracy_sum": float(analysis.accuracy) if analysis.accuracy is not None else 0.0,
+        "accuracy_count": 1 if analysis.accuracy is not None else 0,
+        "max_weakness_level": analysis.weakness_level or 0,
+    }
+
+
+class PerformanceRollupService:
+    """Günlük özet tablosunun artımlı güncellenmesi, okunması ve yeniden kurulması"""
+
+    def apply(self, db: Session, analysis: PerformanceAnalysis, day: Optional[date] = None) -> None:
+        """Yeni analizi özet satırına ekle (commit çağırana aittir)"""
+        values = _row_values(analysis, day or _to_day(analysis.created_at))
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            self._apply_orm(db, values)
+            return
+
+        table = PerformanceDailyRollup.__table__
+        stmt = insert(PerformanceDailyRollup).values(**values)
+        update = {column: table.c[column] + stmt.excluded[column] for column in _SUM_COLUMNS}
+        update["max_weakness_level"] = case(
+            (stmt.excluded.max_weakness_level > table.c.max_weakness_level, stmt.excluded.max_weakness_level),
+            else_=table.c.max_weakness_level
+        )
+        db.execute(stmt.on_conflict_do_update(index_elements=_KEY_COLUMNS, set_=update))
+
+    @staticmethod
+    def _apply_orm(db: Session, values: Dict[str, Any]) -> None:
+        row = db.query(PerformanceDailyRollup).filter_by(
+            **{column: values[column] for column in _KEY_COLUMNS}
+        ).first()
+        if row is None:
+            db.add(PerformanceDailyRollup(**values))
+            return
+        for column in _SUM_COLUMNS:
+            setattr(row, column, getattr(row, column) + values[column])
+        row.max_weakness_level = max(row.max_weakness_level, values["max_weakness_level"])
+
+    # ------------------------------------------------------------------
+    # Okuma
+    # ------------------------------------------------------------------
+    def get_dashboard_aggregates(self, db: Session, user_id: int, days: int = 7) -> Dict[str, Any]:
+        """Genel toplamlar, ders kırılımı, zayıf konular ve günlük ilerleme - tek sorgu"""
+        rows = (
+            db.query(
+                PerformanceDailyRollup,
+                Subject.name.label("subject_name"),
+                Topic.name.label("topic_name"),
+            )
+            .outerjoin(Subject, Subject.id == PerformanceDailyRollup.subject_id)
+            .outerjoin(Topic, Topic.id == PerformanceDailyRollup.topic_id)
+            .filter(PerformanceDailyRollup.user_id == user_id)
+            .all()
+        )
+
+        total_questions = total_correct = session_count = 0
+        subjects: Dict[Optional[str], List[int]] = defaultdict(lambda: [0, 0])
+        weakness: Dict[Tuple[str, str], int] = {}
+        daily: Dict[date, List[float]] = defaultdict(lambda: [0.0, 0])
+
+        for rollup, subject_name, topic_name in rows:
+            total_questions += rollup.total_questions
+            total_correct += rollup.correct_answers
+            session_count += rollup.session_count
+
+            subject = subjects[subject_name]
+            subject[0] += rollup.correct_answers
+            subject[1] += rollup.total_questions
+
+            if subject_name and topic_name:
+                key = (topic_name, subject_name)
+                weakness[key] = max(weakness.get(key, 0), rollup.max_weakness_level)
+
+            day = daily[_to_day(rollup.day)]
+            day[0] += rollup.accuracy_sum
+            day[1] += rollup.accuracy_count
+
+        subject_breakdown = [
+            {
+                "subject_name": name if name else "Genel",
+                "accuracy": (correct / total) * 100 if total else 0.0,
+                "question_count": total,
+            }
+            for name, (correct, total) in subjects.items()
+        ]
+
+        weakness_areas = [
+            {
+                "topic_name": topic_name,
+                "subject_name": subject_name,
+                "weakness_level": level,
+                "recommendation_count": 0,
+            }
+            for (topic_name, subject_name), level in sorted(weakness.items(), key=lambda item: -item[1])[:5]
+        ]
+
+        # Son ``days`` gün (bugün dahil) için kesintisiz günlük ortalama doğruluk
+        today = datetime.now(timezone.utc).date()
+        progress_chart = []
+        for offset in range(days - 1, -1, -1):
+            day = today - timedelta(days=offset)
+            accuracy_sum, accuracy_count = daily.get(day, (0.0, 0))
+            progress_chart.append({
+                "date": day.isoformat(),
+                "accuracy": float(accuracy_sum / accuracy_count) if accuracy_count else 0.0,
+            })
+
+        return {
+            "overall_stats": {
+                "total_questions": total_questions,
+                "total_correct": total_correct,
+                "overall_accuracy": (total_correct / total_questions) * 100 if total_questions > 0 else 0.0,
+                "total_sessions": session_count,
+            },
+            "subject_breakdown": subject_breakdown,
+            "weakness_areas": weakness_areas,
+            "progress_chart": progress_chart,
+        }
+
+    # ------------------------------------------------------------------
+    # Yeniden kurma
+    # ------------------------------------------------------------------
+    def rebuild(self, db: Session, user_id: Optional[int] = None) -> Dict[str, int]:
+        """Özetleri ham PerformanceAnalysis kayıtlarından yeniden hesapla ve commit et"""
+        query = db.query(PerformanceAnalysis).filter(PerformanceAnalysis.user_id.isnot(None))
+        delete = db.query(PerformanceDailyRollup)
+        if user_id is not None:
+            query = query.filter(PerformanceAnalysis.user_id == user_id)
+            delete = delete.filter(PerformanceDailyRollup.user_id == user_id)
+
+        rollups: Dict[Tuple[int, int, int, date], Dict[str, Any]] = {}
+        analyses = 0
+        for analysis in query.yield_per(1000):
+            analyses += 1
+            values = _row_values(analysis, _to_day(analysis.created_at))
+            key = tuple(values[column] for column in _KEY_COLUMNS)
+            current = rollups.get(key)
+            if current is None:
+                rollups[key] = values
+                continue
+            for column in _SUM_COLUMNS:
+                current[column] += values[column]
+            current["max_weakness_level"] = max(current["max_weakness_level"], values["max_weakness_level"])
+
+        try:
+            removed = delete.delete(synchronize_session=False)
+            if rollups:
+                db.bulk_insert_mappings(PerformanceDailyRollup, list(rollups.values()))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"Performance rollups rebuilt: {analyses} analyses -> {len(rollups)} rows (removed {removed})")
+        return {"analyses": analyses, "rollup_rows": len(rollups), "removed_rows": removed}
+
+    def backfill_if_empty(self, db: Session) -> Optional[Dict[str, int]]:
+        """Özet tablosu yeni oluşturulduysa mevcut analizlerden doldur"""
+        if db.query(PerformanceDailyRollup.id).first() is not None:
+            return None
+        if db.query(PerformanceAnalysis.id).first() is None:
+            return None
+        return self.rebuild(db)
+
+
+# Global instance
+performance_rollup_service = PerformanceRollupService()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild per-user daily performance rollups")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print(performance_rollup_service.rebuild(session, user_id=args.user_id))
+    finally:
+        session.close()
@@ -0,0 +1,350 @@
+"""
+Üretilen sorular için yakın-kopya (near-duplicate) tespiti: MinHash + LSH.
+
+Soru metni normalize edilip karakter 5-gram'larına bölünür ve ``num_perm``
+değerlik tek permütasyonlu bir MinHash imzası çıkarılır. İmza ``bands`` parçaya
+ayrılır; her parça (bölüm, band, hash) anahtarlı bir kovaya yazılır. Yeni bir
+aday yalnızca aynı bölümde en az bir kovayı paylaştığı soruların imzalarıyla
+karşılaştırılır, böylece kontrol soru bankasının boyutundan bağımsız (alt-doğrusal) kalır.
+Tahmini Jaccard benzerliği ``threshold`` ve üzerindeyse aday kopyadır.
+
+İndeks yerel bir SQLite dosyasında tutulur; bir bölüm ilk kez sorulduğunda
+``ExamQuestion`` kayıtlarından doldurulur.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import logging
+import re
+import sqlite3
+import struct
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exam import ExamQuestion
+
+logger = logging.getLogger(__name__)
+
+_MAX_HASH = (1 << 32) - 1
+_EMPTY = _MAX_HASH + 1
+_DENSIFY_OFFSET = 0x9E3779B1
+_SHINGLE_SIZE = 5
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+Signature = Tuple[int, ...]
+
+
+def normalize_question_text(text: str) -> str:
+    """Küçük harf, noktalama ve fazla boşluklardan arındırılmış metin"""
+    # "I"/"İ" büyük harf dönüşümleri tutarsız olabildiğinden i/ı tek harfe indirgenir
+    text = str(text or "").lower().replace("ı", "i").replace("i̇", "i")
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def _shingles(text: str) -> set:
+    if len(text) <= _SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + _SHINGLE_SIZE] for i in range(len(text) - _SHINGLE_SIZE + 1)}
+
+
+class MinHasher:
+    """Tek permütasyonlu MinHash (one permutation hashing + rotation densification).
+
+    Her shingle bir kez hash'lenir: hash'in kalanı kutuyu, bölümü kutu içi değeri
+    belirler. Boş kalan kutular sağdaki ilk dolu kutudan (uzaklık kadar kaydırılarak)
+    doldurulur. ``num_perm`` ayrı permütasyona göre ``num_perm`` kat daha hızlıdır.
+    """
+
+    def __init__(self, num_perm: int = 64):
+        self.num_perm = num_perm
+
+    def signature(self, text: str) -> Signature:
+        bins = [_EMPTY] * self.num_perm
+        for shingle in _shingles(normalize_question_text(text)):
+            value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+            index, value = value % self.num_perm, (value // self.num_perm) & _MAX_HASH
+            if value < bins[index]:
+                bins[index] = value
+        if all(value == _EMPTY for value in bins):
+            return tuple([_MAX_HASH] * self.num_perm)
+        for index in range(self.num_perm):
+            if bins[index] != _EMPTY:
+                continue
+            distance = 1
+            while bins[(index + distance) % self.num_perm] == _EMPTY:
+                distance += 1
+            source = bins[(index + distance) % self.num_perm]
+            bins[index] = (source + distance * _DENSIFY_OFFSET) & _MAX_HASH
+        return tuple(bins)
+
+
+def similarity(left: Signature, right: Signature) -> float:
+    """İki imzanın tahmini Jaccard benzerliği"""
+    if not left or len(left) != len(right):
+        return 0.0
+    return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+class QuestionDedupIndex:
+    """Bölüm bazlı, kalıcı MinHash/LSH yakın-kopya indeksi"""
+
+    def __init__(
+        self,
+        path: str = "./question_dedup.db",
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.8,
+        enabled: bool = True
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.path = path
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.enabled = enabled
+        self.hasher = MinHasher(num_perm)
+        self._struct = struct.Struct(f"<{num_perm}I")
+        self._lock = threading.Lock()
+        self._indexed_sections: set = set()
+        self._checks = 0
+        self._rejected = 0
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                question_id INTEGER PRIMARY KEY,
+                section_id INTEGER NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                section_id INTEGER NOT NULL,
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                question_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_buckets_lookup ON buckets (section_id, band, bucket);
+            CREATE INDEX IF NOT EXISTS ix_buckets_question ON buckets (question_id);
+            CREATE TABLE IF NOT EXISTS sections (
+                section_id INTEGER PRIMARY KEY,
+                num_perm INTEGER NOT NULL,
+                bands INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            """
+        )
+        # İmza parametreleri değiştiyse eski indeks geçersizdir; bölümler yeniden kurulur
+        stale = self._conn.execute(
+            "SELECT COUNT(*) FROM sections WHERE num_perm != ? OR bands != ?", (num_perm, bands)
+        ).fetchone()[0]
+        if stale:
+            self._conn.executescript("DELETE FROM buckets; DELETE FROM signatures; DELETE FROM sections;")
+        self._indexed_sections = {
+            row[0] for row in self._conn.execute("SELECT section_id FROM sections").fetchall()
+        }
+
+    # ------------------------------------------------------------------
+    # İmza / kova yardımcıları
+    # ------------------------------------------------------------------
+    def signature(self, text: str) -> Signature:
+        return self.hasher.signature(text)
+
+    def _band_keys(self, signature: Signature) -> List[int]:
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(struct.pack(f"<{self.rows}I", *chunk), digest_size=8).digest()
+            # SQLite INTEGER işaretli 64 bit
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    # ------------------------------------------------------------------
+    # İndeks yönetimi
+    # ------------------------------------------------------------------
+    def ensure_section(self, db: Session, section_id: int) -> None:
+        """Bölüm henüz indekslenmediyse mevcut sorulardan doldur"""
+        if section_id in self._indexed_sections:
+            return
+        started = time.perf_counter()
+        rows = (
+            db.query(ExamQuestion.id, ExamQuestion.question_text)
+            .filter(ExamQuestion.exam_section_id == section_id, ExamQuestion.is_active == True)
+            .yield_per(1000)
+        )
+        added = self.add_many(section_id, ((question_id, text) for question_id, text in rows if text))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sections (section_id, num_perm, bands, indexed_at) VALUES (?, ?, ?, ?)",
+                (section_id, self.hasher.num_perm, self.bands, time.time()),
+            )
+            self._indexed_sections.add(section_id)
+        logger.info(f"Question dedup index built for section {section_id}: {added} questions in {time.perf_counter() - started:.2f}s")
+
+    def add(self, section_id: int, question_id: int, text: str) -> None:
+        self.add_many(section_id, [(question_id, text)])
+
+    def add_many(self, section_id: int, questions: Iterable[Tuple[int, str]]) -> int:
+        signature_rows = []
+        bucket_rows = []
+        for question_id, text in questions:
+            signature = self.signature(text)
+            signature_rows.append((question_id, section_id, self._struct.pack(*signature)))
+            bucket_rows.extend(
+                (section_id, band, key, question_id) for band, key in enumerate(self._band_keys(signature))
+            )
+        if not signature_rows:
+            return 0
+        question_ids = [(row[0],) for row in signature_rows]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("DELETE FROM buckets WHERE question_id = ?", question_ids)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO signatures (question_id, section_id, signature) VALUES (?, ?, ?)",
+                    signature_rows,
+                )
+                self._conn.executemany(
+                    "INSERT INTO buckets (section_id, band, bucket, question_id) VALUES (?, ?, ?, ?)",
+                    bucket_rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(signature_rows)
+
+    def add_questions(self, questions: Iterable[ExamQuestion]) -> None:
+        """Yeni kaydedilen soruları ekle; henüz indekslenmemiş bölümler ilk kontrolde toptan kurulur"""
+        if not self.enabled:
+            return
+        by_section: Dict[int, List[Tuple[int, str]]] = {}
+        for question in questions:
+            if question.id and question.question_text and question.exam_section_id in self._indexed_sections:
+                by_section.setdefault(question.exam_section_id, []).append((question.id, question.question_text))
+        for section_id, rows in by_section.items():
+            try:
+                self.add_many(section_id, rows)
+            except Exception as e:
+                logger.warning(f"Question dedup index update failed for section {section_id}: {e}")
+
+    def remove(self, question_ids: Sequence[int]) -> None:
+        rows = [(question_id,) for question_id in question_ids]
+        with self._lock:
+            self._conn.executemany("DELETE FROM buckets WHERE question_id = ?", rows)
+            self._conn.executemany("DELETE FROM signatures WHERE question_id = ?", rows)
+
+    def drop_section(self, section_id: int) -> None:
+        """Bölümün indeksini sil; bir sonraki kontrolde veritabanından yeniden kurulur"""
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets WHERE section_id = ?", (section_id,))
+            self._conn.execute("DELETE FROM signatures WHERE section_id = ?", (section_id,))
+            self._conn.execute("DELETE FROM sections WHERE section_id = ?", (section_id,))
+            self._indexed_sections.discard(section_id)
+
+    # ------------------------------------------------------------------
+    # Sorgu
+    # ------------------------------------------------------------------
+    def find_similar(self, section_id: int, signature: Signature) -> Optional[Tuple[int, float]]:
+        """Kova paylaşan en benzer soru; eşiğin altındaysa None"""
+        keys = self._band_keys(signature)
+        placeholders = " OR ".join("(band = ? AND bucket = ?)" for _ in keys)
+        params: List[int] = [section_id]
+        for band, key in enumerate(keys):
+            params.extend((band, key))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.question_id, s.signature FROM signatures s WHERE s.question_id IN ("
+                f"SELECT DISTINCT question_id FROM buckets WHERE section_id = ? AND ({placeholders}))",
+                params,
+            ).fetchall()
+        best: Optional[Tuple[int, float]] = None
+        for question_id, blob in rows:
+            score = similarity(signature, self._struct.unpack(blob))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (question_id, score)
+        return best
+
+    def batch(self, db: Optional[Session] = None, section_id: Optional[int] = None) -> "NearDuplicateFilter":
+        """Tek üretim turu için filtre: bölüm bankası + bu turda kabul edilenler"""
+        if self.enabled and db is not None and section_id is not None:
+            try:
+                self.ensure_section(db, section_id)
+            except Exception as e:
+                logger.warning(f"Question dedup index unavailable for section {section_id}: {e}")
+                section_id = None
+        else:
+            section_id = None
+        return NearDuplicateFilter(self, section_id)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            questions = self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+        return {
+            "enabled": self.enabled,
+            "indexed_sections": len(self._indexed_sections),
+            "indexed_questions": questions,
+            "checks": self._checks,
+            "rejected": self._rejected,
+            "threshold": self.threshold,
+            "num_perm": self.hasher.num_perm,
+            "bands": self.bands,
+        }
+
+
+class NearDuplicateFilter:
+    """Adayları bankaya ve aynı turdaki önceki adaylara karşı süzer"""
+
+    def __init__(self, index: QuestionDedupIndex, section_id: Optional[int] = None):
+        self.index = index
+        self.section_id = section_id
+        self.texts: List[str] = []
+        self._signatures: List[Signature] = []
+        self._exact: set = set()
+
+    def seed(self, texts: Iterable[str]) -> "NearDuplicateFilter":
+        """Kaçınılacak metinleri (ör. istemciden gelen exclude listesi) ekle"""
+        for text in texts:
+            self.accept(text)
+        return self
+
+    def accept(self, text: str) -> bool:
+        """Yakın kopya değilse kaydet ve True döndür"""
+        normalized = normalize_question_text(text)
+        if not normalized or normalized in self._exact:
+            return False
+        if not self.index.enabled:
+            self._exact.add(normalized)
+            self.texts.append(text)
+            return True
+
+        signature = self.index.signature(normalized)
+        self.index._checks += 1
+        duplicate = any(similarity(signature, other) >= self.index.threshold for other in self._signatures)
+        if not duplicate and self.section_id is not None:
+            try:
+                duplicate = self.index.find_similar(self.section_id, signature) is not None
+            except Exception as e:
+                logger.warning(f"Question dedup lookup failed: {e}")
+        if duplicate:
+            self.index._rejected += 1
+            return False
+
+        self._exact.add(normalized)
+        self._signatures.append(signature)
+        self.texts.append(text)
+        return True
+
+
+# Global instance
+question_dedup_index = QuestionDedupIndex(
+    path=settings.QUESTION_DEDUP_INDEX_PATH,
+    num_perm=settings.QUESTION_DEDUP_NUM_PERM,
+    bands=settings.QUESTION_DEDUP_BANDS,
+    threshold=settings.QUESTION_DEDUP_THRESHOLD,
+    enabled=settings.QUESTION_DEDUP_ENABLED,
+)
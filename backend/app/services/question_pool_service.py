@@ -0,0 +1,254 @@
+"""
+Önceden üretilmiş soru havuzu.
+
+Arka plandaki doldurucu her aktif ``ExamSection`` için hedef bir stok tutar
+(bölüm soru sayısı x ``QUESTION_POOL_TARGET_EXAMS``). Hedefin konu dağılımı
+``data/subject_question_distribution.json``'dan, zorluk dağılımı
+``QUESTION_POOL_DIFFICULTY_MIX``'ten gelir. Sınav oluşturma yalnızca bu stoktan
+çeker; öğrenci AI üretimini beklemez.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.exam import ExamType, ExamSection, ExamQuestion, PracticeExam, PracticeQuestionResult
+from app.models.education_level import CourseTopic
+from app.services.question_sampler import question_sampler
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionPoolService:
+    """Bölüm bazlı soru stoğunu izler, eksikleri arka planda AI ile tamamlar"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._refill_lock: Optional[asyncio.Lock] = None
+        self._exam_agent = None
+        self.generated_total = 0
+        self.draws = 0
+        self.draw_misses = 0
+        self.last_refill_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.QUESTION_POOL_ENABLED
+
+    def _get_exam_agent(self):
+        # ExamAgent bu modülü import ettiği için döngüsel import'u önlemek adına geç yükle
+        if self._exam_agent is None:
+            from app.agents.registry import agent_registry
+            self._exam_agent = agent_registry.get("exam")
+        return self._exam_agent
+
+    # ------------------------------------------------------------------
+    # Hedef ve stok
+    # ------------------------------------------------------------------
+    def section_target(self, exam_type_name: str, section: ExamSection) -> Dict[str, Any]:
+        """Bölüm için toplam, konu ve zorluk bazında hedef stok"""
+        agent = self._get_exam_agent()
+        per_exam = section.question_count or agent.get_fixed_question_count(exam_type_name, section.name)
+        total = per_exam * settings.QUESTION_POOL_TARGET_EXAMS
+
+        distribution = agent.get_topic_distribution(exam_type_name, section.name, total)
+        topics = {name: info["question_count"] for name, info in distribution["topics"].items()}
+
+        mix = settings.QUESTION_POOL_DIFFICULTY_MIX
+        weight_sum = sum(mix.values()) or 1
+        difficulties = {str(level): int(round(total * weight / weight_sum)) for level, weight in mix.items()}
+
+        return {"per_exam": per_exam, "total": total, "topics": topics, "difficulties": difficulties}
+
+    def section_inventory(self, db: Session, section_id: int) -> Dict[str, Any]:
+        """Bölümdeki aktif soruları konu ve zorluğa göre say (tek GROUP BY sorgusu)"""
+        rows = db.query(
+            CourseTopic.name,
+            ExamQuestion.difficulty_level,
+            func.count(ExamQuestion.id)
+        ).outerjoin(
+            CourseTopic, CourseTopic.id == ExamQuestion.topic_id
+        ).filter(
+            ExamQuestion.exam_section_id == section_id,
+            ExamQuestion.is_active == True
+        ).group_by(CourseTopic.name, ExamQuestion.difficulty_level).all()
+
+        topics: Dict[str, int] = {}
+        difficulties: Dict[str, int] = {}
+        total = 0
+        for topic_name, difficulty, count in rows:
+            topics[topic_name or "Bilinmiyor"] = topics.get(topic_name or "Bilinmiyor", 0) + count
+            difficulties[str(difficulty or 2)] = difficulties.get(str(difficulty or 2), 0) + count
+            total += count
+        return {"total": total, "topics": topics, "difficulties": difficulties}
+
+    def get_status(self, db: Session) -> List[Dict[str, Any]]:
+        """Tüm aktif bölümler için hedef/stok/eksik raporu"""
+        report = []
+        for section, exam_type_name in self._active_sections(db):
+            target = self.section_target(exam_type_name, section)
+            stock = self.section_inventory(db, section.id)
+            report.append({
+                "exam_section_id": section.id,
+                "exam_type": exam_type_name,
+                "section": section.name,
+                "target": target,
+                "stock": stock,
+                "deficit": max(target["total"] - stock["total"], 0),
+                "topic_deficits": {
+                    name: max(count - stock["topics"].get(name, 0), 0)
+                    for name, count in target["topics"].items()
+                },
+            })
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "filler_running": bool(self._task and not self._task.done()),
+            "generated_total": self.generated_total,
+            "draws": self.draws,
+            "draw_misses": self.draw_misses,
+            "last_refill_at": self.last_refill_at,
+            "last_error": self.last_error,
+        }
+
+    def _active_sections(self, db: Session):
+        return db.query(ExamSection, ExamType.name).join(
+            ExamType, ExamType.id == ExamSection.exam_type_id
+        ).filter(
+            ExamSection.is_active == True,
+            ExamType.is_active == True
+        ).order_by(ExamSection.id).all()
+
+    # ------------------------------------------------------------------
+    # Stoktan çekme
+    # ------------------------------------------------------------------
+    def draw_questions(self, db: Session, exam_section_id: int, count: int, user_id: Optional[int] = None) -> Optional[List[ExamQuestion]]:
+        """Stoktan ``count`` soru çek; kullanıcının daha önce görmediği sorular önceliklidir.
+
+        Stok yetersizse None döner (çağıran senkron üretime düşebilir).
+        """
+        entries = question_sampler.entries(db, exam_section_id)
+        if len(entries) < count:
+            self.draw_misses += 1
+            self.wake()
+            return None
+
+        seen = set()
+        if user_id is not None:
+            seen = {row[0] for row in db.query(PracticeQuestionResult.question_id).join(
+                PracticeExam, PracticeExam.id == PracticeQuestionResult.practice_exam_id
+            ).filter(
+                PracticeExam.user_id == user_id,
+                PracticeExam.exam_section_id == exam_section_id
+            ).distinct().all()}
+
+        # Önce kullanıcının görmediği sorulardan katmanlı seç, eksik kalırsa görülenlerle tamamla
+        chosen = question_sampler.sample_ids(db, exam_section_id, count, stratify=True, exclude_ids=seen)
+        if len(chosen) < count:
+            chosen += question_sampler.sample_ids(
+                db, exam_section_id, count - len(chosen), exclude_ids=set(chosen)
+            )
+        unseen_left = len(entries) - len(seen) - count
+
+        self.draws += 1
+        # Kullanıcı için taze soru azaldıysa doldurucuyu erkenden uyandır
+        if unseen_left < count:
+            self.wake()
+        return question_sampler.load(db, chosen)
+
+    # ------------------------------------------------------------------
+    # Doldurucu
+    # ------------------------------------------------------------------
+    async def refill_once(self) -> int:
+        """Her bölüm için eksiğin bir parçasını üret; üretilen toplam soru sayısını döndür"""
+        if self._refill_lock is None:
+            self._refill_lock = asyncio.Lock()
+        async with self._refill_lock:
+            generated = 0
+            db = SessionLocal()
+            try:
+                sections = self._active_sections(db)
+                # En çok eksiği olan bölümden başla
+                deficits = []
+                for section, exam_type_name in sections:
+                    target = self.section_target(exam_type_name, section)["total"]
+                    stock = self.section_inventory(db, section.id)["total"]
+                    if stock < target:
+                        deficits.append((1 - stock / max(target, 1), section, target - stock))
+                deficits.sort(key=lambda item: item[0], reverse=True)
+
+                agent = self._get_exam_agent()
+                for _ratio, section, deficit in deficits:
+                    batch = min(deficit, settings.QUESTION_POOL_BATCH_SIZE)
+                    try:
+                        questions = await agent.generate_ai_questions_async(db, section.id, batch)
+                        generated += len(questions)
+                        logger.info(f"Question pool: {len(questions)} questions added to section {section.id}")
+                    except Exception as e:
+                        db.rollback()
+                        self.last_error = str(e)
+                        logger.warning(f"Question pool refill failed for section {section.id}: {e}")
+            finally:
+                db.close()
+
+            self.generated_total += generated
+            self.last_refill_at = datetime.utcnow().isoformat()
+            return generated
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Doldurucu döngüsünü başlat (uygulama lifespan'i içinden)"""
+        if not self.enabled or not settings.QUESTION_POOL_FILLER_ENABLED:
+            return
+        if self._task and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="question-pool-filler")
+        logger.info("Question pool filler started")
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                generated = await self.refill_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Question pool filler error: {e}")
+                generated = 0
+
+            # Üretim olduysa hâlâ eksik olabilir; kısa aralıkla devam et
+            if generated:
+                await asyncio.sleep(1)
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.QUESTION_POOL_REFILL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global instance
+question_pool_service = QuestionPoolService()
@@ -0,0 +1,154 @@
+"""
+Sınav oluşturma için indeksli rastgele soru örnekleme.
+
+Her bölüm için yalnızca ``(id, topic_id, difficulty_level)`` üçlülerinden oluşan
+bir dizi bellekte tutulur. Örnekleme bu dizi üzerinde yapılır; ORM satırları
+sadece seçilen ID'ler için yüklenir. ExamQuestion yazmaları commit edildiğinde
+ilgili bölümün dizisi geçersiz sayılır.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import random
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.exam import ExamQuestion
+
+# (question_id, topic_id, difficulty_level)
+Entry = Tuple[int, Optional[int], int]
+
+
+class QuestionSampler:
+    """Bölüm bazlı ID dizileri üzerinde (katmanlı) rastgele örnekleme"""
+
+    def __init__(self):
+        self._sections: Dict[int, Tuple[float, List[Entry]]] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def invalidate(self, section_id: Optional[int] = None) -> None:
+        with self._lock:
+            if section_id is None:
+                self._sections.clear()
+            else:
+                self._sections.pop(section_id, None)
+
+    def entries(self, db: Session, section_id: int) -> List[Entry]:
+        """Bölümün aktif soru ID dizisi (gerekirse tek kolon sorgusuyla yüklenir)"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._sections.get(section_id)
+            if cached and now - cached[0] < settings.QUESTION_SAMPLER_REFRESH_SECONDS:
+                return cached[1]
+
+        rows = db.query(
+            ExamQuestion.id, ExamQuestion.topic_id, ExamQuestion.difficulty_level
+        ).filter(
+            ExamQuestion.exam_section_id == section_id,
+            ExamQuestion.is_active == True
+        ).all()
+        entries = [(row[0], row[1], row[2] or 2) for row in rows]
+        with self._lock:
+            self._sections[section_id] = (now, entries)
+            self.loads += 1
+        return entries
+
+    def sample_ids(
+        self,
+        db: Session,
+        section_id: int,
+        count: int,
+        difficulty_level: Optional[int] = None,
+        stratify: bool = False,
+        exclude_ids: Optional[Iterable[int]] = None,
+    ) -> List[int]:
+        entries = self.entries(db, section_id)
+        if difficulty_level:
+            entries = [e for e in entries if e[2] == difficulty_level]
+        if exclude_ids:
+            excluded: Set[int] = set(exclude_ids)
+            entries = [e for e in entries if e[0] not in excluded]
+
+        if len(entries) <= count:
+            chosen = [e[0] for e in entries]
+            random.shuffle(chosen)
+            return chosen
+        if not stratify:
+            return [e[0] for e in random.sample(entries, count)]
+        return self._stratified(entries, count)
+
+    @staticmethod
+    def _stratified(entries: List[Entry], count: int) -> List[int]:
+        """Konu x zorluk katmanlarına, havuzdaki oranlarıyla (largest remainder) dağıt"""
+        strata: Dict[Tuple[Optional[int], int], List[int]] = {}
+        for question_id, topic_id, difficulty in entries:
+            strata.setdefault((topic_id, difficulty), []).append(question_id)
+
+        total = len(entries)
+        allocation = {}
+        remainders = []
+        for key, ids in strata.items():
+            raw = count * len(ids) / total
+            allocation[key] = int(raw)
+            remainders.append((raw - int(raw), key))
+        left = count - sum(allocation.values())
+        for _frac, key in sorted(remainders, key=lambda item: item[0], reverse=True)[:left]:
+            allocation[key] += 1
+
+        chosen: List[int] = []
+        for key, ids in strata.items():
+            chosen.extend(random.sample(ids, min(allocation[key], len(ids))))
+        random.shuffle(chosen)
+        return chosen
+
+    def sample(
+        self,
+        db: Session,
+        section_id: int,
+        count: int,
+        difficulty_level: Optional[int] = None,
+        stratify: bool = False,
+        exclude_ids: Optional[Iterable[int]] = None,
+    ) -> List[ExamQuestion]:
+        """Seçilen ID'lerin ORM satırlarını (seçim sırasıyla) getir"""
+        ids = self.sample_ids(db, section_id, count, difficulty_level, stratify, exclude_ids)
+        return self.load(db, ids)
+
+    @staticmethod
+    def load(db: Session, ids: List[int]) -> List[ExamQuestion]:
+        if not ids:
+            return []
+        by_id = {q.id: q for q in db.query(ExamQuestion).filter(ExamQuestion.id.in_(ids)).all()}
+        return [by_id[qid] for qid in ids if qid in by_id]
+
+
+# Global instance
+question_sampler = QuestionSampler()
+
+
+# ExamQuestion yazmalarını commit anında bölüm bazlı geçersiz kıl
+_DIRTY_KEY = "question_sampler_dirty_sections"
+
+
+def _mark_section_dirty(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None and target.exam_section_id is not None:
+        session.info.setdefault(_DIRTY_KEY, set()).add(target.exam_section_id)
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(ExamQuestion, _event_name, _mark_section_dirty)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dirty_sections(session) -> None:
+    for section_id in session.info.pop(_DIRTY_KEY, ()):
+        question_sampler.invalidate(section_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_sections(session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,128 @@
+"""
+Kullanıcı başına "daha önce önerildi" indeksi.
+
+Her öneri ``(user_id, resource_type, canonical_id)`` anahtarıyla tek satır olarak
+tutulur. Agent'lar kullanıcının önerilmiş ID kümesini tek sorguyla alır ve
+adayları küme üyeliğiyle eler; memory araması ya da URL regex'i gerekmez.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+import re
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.models.performance import RecommendationHistory
+
+_YOUTUBE_PATH_ID = re.compile(r"^/(?:embed|shorts|live|v)/([\w-]{6,})")
+_TRENDYOL_PRODUCT_ID = re.compile(r"-p-(\d+)")
+
+
+def canonical_id(resource_type: str, url: Optional[str]) -> Optional[str]:
+    """Kaynağın URL biçiminden bağımsız kimliği (None: tanımlanamadı)"""
+    if not url:
+        return None
+    url = str(url).strip()
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.startswith("m."):
+        host = host[2:]
+
+    if resource_type == "youtube":
+        if host == "youtu.be":
+            video_id = parts.path.lstrip("/").split("/")[0]
+            return video_id or None
+        if host.endswith("youtube.com"):
+            video_id = parse_qs(parts.query).get("v", [None])[0]
+            if video_id:
+                return video_id
+            match = _YOUTUBE_PATH_ID.match(parts.path)
+            if match:
+                return match.group(1)
+
+    if resource_type == "book":
+        match = _TRENDYOL_PRODUCT_ID.search(parts.path)
+        if match and host.endswith("trendyol.com"):
+            return f"trendyol:{match.group(1)}"
+
+    # Bilinen biçim değilse sorgu/fragment'siz, normalize URL
+    path = parts.path.rstrip("/")
+    return f"{host}{path}" if host else None
+
+
+class RecommendationHistoryService:
+    """Önerilmiş kaynak kaydı ve kullanıcı bazlı küme sorguları"""
+
+    def record(self, db: Session, user_id: int, resource_type: str, urls: Iterable[str]) -> int:
+        """Önerileri indekse ekle (commit çağırana aittir); yeni eklenen kayıt sayısını döndür"""
+        by_id: Dict[str, str] = {}
+        for url in urls:
+            cid = canonical_id(resource_type, url)
+            if cid and cid not in by_id:
+                by_id[cid] = str(url)
+        if not by_id:
+            return 0
+
+        existing = db.query(RecommendationHistory).filter(
+            RecommendationHistory.user_id == user_id,
+            RecommendationHistory.resource_type == resource_type,
+            RecommendationHistory.canonical_id.in_(list(by_id))
+        ).all()
+        for row in existing:
+            row.times_recommended = (row.times_recommended or 0) + 1
+            row.last_recommended_at = func.now()
+            by_id.pop(row.canonical_id, None)
+
+        if not by_id:
+            return 0
+        rows = [
+            {"user_id": user_id, "resource_type": resource_type, "canonical_id": cid, "url": url}
+            for cid, url in by_id.items()
+        ]
+        # Aynı kullanıcı için eşzamanlı kayıtlarda unique ihlali tüm transaction'ı düşürmesin
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            db.add_all([RecommendationHistory(**row) for row in rows])
+            return len(rows)
+        db.execute(
+            insert(RecommendationHistory).values(rows).on_conflict_do_nothing(
+                index_elements=["user_id", "resource_type", "canonical_id"]
+            )
+        )
+        return len(rows)
+
+    @staticmethod
+    def _ids_query(user_id: int, resource_type: str):
+        return select(RecommendationHistory.canonical_id).where(
+            and_(
+                RecommendationHistory.user_id == user_id,
+                RecommendationHistory.resource_type == resource_type
+            )
+        )
+
+    def get_recommended_ids(self, db: Session, user_id: int, resource_type: str) -> Set[str]:
+        return set(db.execute(self._ids_query(user_id, resource_type)).scalars().all())
+
+    async def get_recommended_ids_async(self, db: AsyncSession, user_id: int, resource_type: str) -> Set[str]:
+        result = await db.execute(self._ids_query(user_id, resource_type))
+        return set(result.scalars().all())
+
+    @staticmethod
+    def filter_new(resource_type: str, items: List[dict], seen: Set[str], url_key: str) -> Tuple[List[dict], int]:
+        """Daha önce önerilmiş öğeleri çıkar; (kalanlar, elenen sayısı)"""
+        if not seen:
+            return items, 0
+        kept = [item for item in items if canonical_id(resource_type, item.get(url_key)) not in seen]
+        return kept, len(items) - len(kept)
+
+
+# Global instance
+recommendation_history_service = RecommendationHistoryService()
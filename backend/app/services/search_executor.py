@@ -0,0 +1,135 @@
+"""
+Tavily aramaları için paylaşılan async yürütücü.
+
+Sorgular normalize edilip (küçük harf, tek boşluk) TTL cache'te tutulur; aynı
+sorgu farklı öğrenciler için tekrar aranmaz. Aynı anda gelen özdeş sorgular tek
+bir çağrıda birleştirilir. Çağrılar eşzamanlılık limiti ve token-bucket ile
+Tavily kotası içinde tutulur.
+"""
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.utils.cache import TTLCache, MISSING
+from app.utils.rate_limit import AsyncTokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.casefold().split())
+
+
+class AsyncSearchExecutor:
+    """Rate-limit'li, eşzamanlılığı sınırlı ve cache'li arama yürütücüsü"""
+
+    def __init__(
+        self,
+        search_tool: Any,
+        max_concurrency: int = 4,
+        rate_per_second: float = 5.0,
+        cache_ttl: float = 21600.0,
+        cache_size: int = 512,
+        name: str = "tavily_search",
+    ):
+        self.search_tool = search_tool
+        self.max_concurrency = max_concurrency
+        self.bucket = AsyncTokenBucket(rate_per_second)
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl, name=name)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.failures = 0
+        self.coalesced = 0
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        """Tek sorgu için sonuç listesi; hata durumunda exception fırlatır"""
+        key = normalize_query(query)
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            results = await self._call(query)
+            self.cache.set(key, results)
+            future.set_result(results)
+            return results
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Bekleyen yoksa "exception never retrieved" uyarısını önle
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def search_many(self, queries: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Sorguları paralel çalıştır; başarısız olanlar sonuçta yer almaz"""
+        unique = list(dict.fromkeys(queries))
+        outcomes = await asyncio.gather(*(self.search(q) for q in unique), return_exceptions=True)
+        results = {}
+        for query, outcome in zip(unique, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning(f"Search failed for query '{query}': {outcome}")
+                continue
+            results[query] = outcome
+        return results
+
+    async def _call(self, query: str) -> List[Dict[str, Any]]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            await self.bucket.acquire()
+            self.calls += 1
+            try:
+                response = await self.search_tool.ainvoke({"query": query})
+            except Exception:
+                self.failures += 1
+                raise
+        if isinstance(response, dict):
+            return response.get("results", [])
+        return []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "max_concurrency": self.max_concurrency,
+            "rate_limiter": self.bucket.stats(),
+            "cache": self.cache.stats(),
+        }
+
+
+_tavily_executor: Optional[AsyncSearchExecutor] = None
+
+
+def get_tavily_executor() -> Optional[AsyncSearchExecutor]:
+    """Process genelinde paylaşılan Tavily yürütücüsü; API key yoksa None"""
+    global _tavily_executor
+    if _tavily_executor is None and settings.TAVILY_API_KEY:
+        from langchain_tavily import TavilySearch
+
+        _tavily_executor = AsyncSearchExecutor(
+            TavilySearch(
+                max_results=35,  # Daha fazla sonuç al
+                topic="general",
+                tavily_api_key=settings.TAVILY_API_KEY,
+            ),
+            max_concurrency=settings.TAVILY_MAX_CONCURRENCY,
+            rate_per_second=settings.TAVILY_RATE_PER_SECOND,
+            cache_ttl=settings.TAVILY_CACHE_TTL_SECONDS,
+            cache_size=settings.TAVILY_CACHE_SIZE,
+        )
+    return _tavily_executor
@@ -0,0 +1,121 @@
+"""
+Senkron koddan async coroutine çalıştırmak için paylaşılan arka plan event loop'u.
+
+Her çağrıda ``asyncio.new_event_loop()`` kurmak yerine tek bir daemon thread
+içinde sürekli çalışan loop kullanılır; böylece LLM/HTTP istemcilerinin bağlantı
+havuzları çağrılar arasında korunur ve çağıran thread'in loop'u değişmez.
+Loop ilk kullanımda başlatılır, uygulama kapanışında ``stop()`` ile durdurulur.
+"""
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Dict, Optional
+import asyncio
+import logging
+import threading
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBridge:
+    """Arka plan loop thread'i ve ``run_coroutine_threadsafe`` tabanlı çağrı API'si"""
+
+    def __init__(self, name: str = "async-bridge", default_timeout: Optional[float] = None):
+        self.name = name
+        self.default_timeout = default_timeout
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._submitted = 0
+        self._timeouts = 0
+        self._failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and not self._loop.is_closed():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self._thread.start()
+            started.wait()
+            self._loop = loop
+            logger.info(f"Async bridge loop started ({self.name})")
+            return loop
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """Coroutine'i arka plan loop'una gönder; ``concurrent.futures.Future`` döndürür"""
+        loop = self._ensure_loop()
+        self._submitted += 1
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Coroutine'i çalıştır ve sonucunu bekle (çağıran thread bloklanır).
+
+        Süre aşılırsa coroutine iptal edilir ve ``TimeoutError`` fırlatılır.
+        """
+        if self._thread is not None and threading.current_thread() is self._thread:
+            # Loop kendi thread'inden beklenirse kilitlenir
+            coro.close()
+            raise RuntimeError("AsyncBridge.run cannot be called from the bridge loop; await the coroutine instead")
+
+        future = self.submit(coro)
+        timeout = timeout if timeout is not None else self.default_timeout
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._timeouts += 1
+            raise TimeoutError(f"Coroutine did not finish within {timeout}s")
+        except Exception:
+            self._failed += 1
+            raise
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Bekleyen görevleri iptal et, loop'u durdur ve thread'i kapat"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or loop.is_closed():
+            return
+
+        async def cancel_pending() -> None:
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_pending(), loop).result(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Async bridge tasks could not be cancelled cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=timeout)
+        if not loop.is_running():
+            loop.close()
+        logger.info(f"Async bridge loop stopped ({self.name})")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "submitted": self._submitted,
+            "timeouts": self._timeouts,
+            "failed": self._failed,
+            "default_timeout": self.default_timeout,
+        }
+
+
+# Global instance
+async_bridge = AsyncBridge(default_timeout=settings.ASYNC_BRIDGE_TIMEOUT_SECONDS)
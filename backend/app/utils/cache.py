@@ -0,0 +1,105 @@
+"""
+Process içi LRU + TTL cache yardımcıları
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import threading
+import time
+
+# get() ile "kayıt yok" durumunu None değerinden ayırmak için
+MISSING = object()
+
+# İsimle kaydedilen cache'ler - admin istatistik endpoint'i buradan okur
+_registry: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    Thread-safe, boyutu sınırlı LRU cache. Her kaydın bir son kullanma süresi vardır;
+    ``ttl=None`` kayıtların yalnızca LRU ile düşürülmesi anlamına gelir.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300.0, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        if name:
+            _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = MISSING) -> None:
+        ttl = self.ttl if ttl is MISSING else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return MISSING
+            self.invalidations += 1
+            return entry[0]
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Anahtarı predicate'i sağlayan tüm kayıtları sil"""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Kayıtlı tüm cache'lerin istatistikleri"""
+    return {name: cache.stats() for name, cache in sorted(_registry.items())}
@@ -0,0 +1,218 @@
+"""
+Yavaş SQL ifadelerini yakalayan yerleşik index danışmanı.
+
+Engine'e bağlanan ``before/after_cursor_execute`` olayları her ifadenin
+süresini ölçer; eşiği aşanlar literal'lerden arındırılmış metinleriyle
+gruplanır. Rapor, bu ifadelerin WHERE/JOIN/ORDER BY kolonlarını veritabanındaki
+gerçek index'lerle karşılaştırır ve hiçbir index'in ön ekiyle karşılanmayan
+kolon gruplarını aday olarak listeler.
+"""
+from typing import Any, Dict, List, Tuple
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\bIN\s*\((?:[^()]*)\)", re.IGNORECASE)
+_TABLES = re.compile(r'\b(?:FROM|JOIN|UPDATE)\s+"?(\w+)"?(?:\s+AS\s+"?(\w+)"?)?', re.IGNORECASE)
+_WHERE = re.compile(r"\bWHERE\b(.*?)(?=\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|\bOFFSET\b|$)", re.IGNORECASE | re.DOTALL)
+_ON = re.compile(r"\bON\b(.*?)(?=\b(?:LEFT OUTER JOIN|LEFT JOIN|JOIN|WHERE|GROUP BY|ORDER BY|LIMIT)\b|$)", re.IGNORECASE | re.DOTALL)
+_ORDER_BY = re.compile(r"\bORDER BY\b(.*?)(?=\bLIMIT\b|\bOFFSET\b|$)", re.IGNORECASE | re.DOTALL)
+_PREDICATE = re.compile(
+    r'"?(\w+)"?\."?(\w+)"?\s*(=|!=|<>|<=|>=|<|>|\bIN\b|\bIS\b|\bLIKE\b|\bBETWEEN\b)',
+    re.IGNORECASE
+)
+_COLUMN = re.compile(r'"?(\w+)"?\."?(\w+)"?')
+_EQUALITY_OPS = {"=", "IN", "IS"}
+
+
+def normalize_statement(statement: str) -> str:
+    """Literal ve IN listelerini ``?`` ile değiştir; aynı şekilli ifadeler tek satırda toplanır"""
+    text = _WHITESPACE.sub(" ", statement).strip()
+    text = _IN_LISTS.sub("IN (?)", text)
+    return _LITERALS.sub("?", text)
+
+
+def extract_access_columns(statement: str) -> Dict[str, Dict[str, List[str]]]:
+    """Tablo başına eşitlik, aralık ve sıralama kolonları (alias'lar tablo adına çözülür)"""
+    aliases: Dict[str, str] = {}
+    for table, alias in _TABLES.findall(statement):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+
+    access: Dict[str, Dict[str, List[str]]] = {}
+
+    def add(alias: str, column: str, kind: str) -> None:
+        table = aliases.get(alias)
+        if table is None:
+            return
+        columns = access.setdefault(table, {"equality": [], "range": [], "join": [], "order": []})[kind]
+        if column not in columns:
+            columns.append(column)
+
+    for clause in _WHERE.findall(statement):
+        for alias, column, op in _PREDICATE.findall(clause):
+            add(alias, column, "equality" if op.upper() in _EQUALITY_OPS else "range")
+    for clause in _ON.findall(statement):
+        for alias, column in _COLUMN.findall(clause):
+            add(alias, column, "join")
+    for clause in _ORDER_BY.findall(statement):
+        for alias, column in _COLUMN.findall(clause):
+            add(alias, column, "order")
+    return access
+
+
+def _candidate_columns(columns: Dict[str, List[str]]) -> Tuple[str, ...]:
+    """Eşitlik kolonları, ardından tek aralık kolonu ya da sıralama kolonları.
+
+    Filtresi olmayan tablo join'in iç tarafıdır; join kolonunun index'i yeterli.
+    """
+    candidate = list(columns["equality"])
+    if not candidate and not columns["range"]:
+        return tuple(columns["join"][:1])
+    tail = columns["range"][:1] or columns["order"]
+    candidate.extend(column for column in tail if column not in candidate)
+    return tuple(candidate)
+
+
+def _covered(candidate: Tuple[str, ...], indexes: List[Tuple[str, ...]]) -> bool:
+    """Aynı kolonla başlayan ve adayın tüm kolonlarını önekinde içeren bir index varsa aday gereksiz.
+
+    Adaydan kısa bir index (ör. yalnızca ``user_id``) karşılamaz; aday onu genişletme önerisidir.
+    """
+    for index in indexes:
+        if index and index[0] == candidate[0] and set(index[:len(candidate)]) >= set(candidate):
+            return True
+    return False
+
+
+class IndexAdvisor:
+    """Yavaş ifade istatistikleri ve eksik index adayları"""
+
+    def __init__(self, threshold_ms: float = 100.0, max_statements: int = 200, enabled: bool = True):
+        self.threshold = threshold_ms / 1000
+        self.max_statements = max_statements
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._statements: Dict[str, Dict[str, Any]] = {}
+        self._observed = 0
+
+    def attach(self, engine: Engine) -> None:
+        """Engine'in cursor execute olaylarına zamanlayıcıyı bağla"""
+        if not self.enabled:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("index_advisor_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info.get("index_advisor_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        self._observed += 1
+        if elapsed >= self.threshold and statement.lstrip()[:6].upper() in ("SELECT", "UPDATE", "DELETE"):
+            self.record(statement, elapsed)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        key = normalize_statement(statement)
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                if len(self._statements) >= self.max_statements:
+                    # En az toplam süreye sahip ifade yer açar
+                    del self._statements[min(self._statements, key=lambda k: self._statements[k]["total"])]
+                entry = self._statements[key] = {
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "access": extract_access_columns(key),
+                }
+            entry["count"] += 1
+            entry["total"] += elapsed
+            entry["max"] = max(entry["max"], elapsed)
+            entry["last_seen"] = time.time()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._observed = 0
+
+    @staticmethod
+    def _existing_indexes(inspector, table: str) -> List[Tuple[str, ...]]:
+        indexes = [tuple(index["column_names"]) for index in inspector.get_indexes(table)]
+        indexes.extend(tuple(unique["column_names"]) for unique in inspector.get_unique_constraints(table))
+        primary_key = inspector.get_pk_constraint(table).get("constrained_columns")
+        if primary_key:
+            indexes.append(tuple(primary_key))
+        return indexes
+
+    def report(self, engine: Engine, limit: int = 20) -> Dict[str, Any]:
+        """En yavaş ifadeler ve mevcut index'lerle karşılanmayan kolon grupları"""
+        with self._lock:
+            statements = sorted(self._statements.items(), key=lambda item: -item[1]["total"])
+
+        inspector = inspect(engine)
+        known_tables = set(inspector.get_table_names())
+        index_cache: Dict[str, List[Tuple[str, ...]]] = {}
+        candidates: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = {}
+
+        for statement, entry in statements:
+            for table, columns in entry["access"].items():
+                candidate = _candidate_columns(columns)
+                if not candidate or table not in known_tables:
+                    continue
+                if table not in index_cache:
+                    index_cache[table] = self._existing_indexes(inspector, table)
+                if _covered(candidate, index_cache[table]):
+                    continue
+                item = candidates.setdefault((table, candidate), {
+                    "table": table,
+                    "columns": list(candidate),
+                    "suggested_ddl": f"CREATE INDEX ix_{table}_{'_'.join(candidate)} ON {table} ({', '.join(candidate)})",
+                    "statements": 0,
+                    "total_ms": 0.0,
+                })
+                item["statements"] += 1
+                item["total_ms"] += entry["total"] * 1000
+
+        ranked = sorted(candidates.values(), key=lambda item: -item["total_ms"])
+        for item in ranked:
+            item["total_ms"] = round(item["total_ms"], 2)
+
+        return {
+            "threshold_ms": round(self.threshold * 1000, 2),
+            "observed_statements": self._observed,
+            "slow_statements": [
+                {
+                    "statement": statement,
+                    "count": entry["count"],
+                    "total_ms": round(entry["total"] * 1000, 2),
+                    "avg_ms": round(entry["total"] / entry["count"] * 1000, 2),
+                    "max_ms": round(entry["max"] * 1000, 2),
+                }
+                for statement, entry in statements[:limit]
+            ],
+            "missing_index_candidates": ranked,
+        }
+
+
+# Global instance
+index_advisor = IndexAdvisor(
+    threshold_ms=settings.INDEX_ADVISOR_SLOW_QUERY_MS,
+    max_statements=settings.INDEX_ADVISOR_MAX_STATEMENTS,
+    enabled=settings.INDEX_ADVISOR_ENABLED,
+)
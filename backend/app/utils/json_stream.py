@@ -0,0 +1,79 @@
+"""
+Akan (parça parça gelen) LLM JSON çıktısından dizi elemanlarını erken çıkarma
+"""
+from typing import Any, List, Optional
+import json
+import re
+
+
+class StreamingArrayParser:
+    """
+    ``{"<key>": [ {...}, {...} ]}`` biçimindeki metin parça parça beslenirken
+    dizinin tamamlanan her nesne elemanını döndürür. String içindeki parantez ve
+    kaçış karakterleri dikkate alınır; tam metnin geçerli JSON olması beklenmez.
+    """
+
+    def __init__(self, key: str):
+        self._key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start: Optional[int] = None
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, text: str) -> List[Any]:
+        """Yeni parçayı ekle; bu parçayla tamamlanan elemanları döndür"""
+        self._buffer += text
+        items: List[Any] = []
+        if self._finished:
+            return items
+        if not self._in_array:
+            match = self._key_pattern.search(self._buffer)
+            if not match:
+                return items
+            self._in_array = True
+            self._pos = match.end()
+
+        buffer = self._buffer
+        i = self._pos
+        while i < len(buffer):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._start is not None:
+                    try:
+                        items.append(json.loads(buffer[self._start:i + 1]))
+                    except ValueError:
+                        pass
+                    self._start = None
+            elif ch == "]" and self._depth == 0:
+                self._finished = True
+                i += 1
+                break
+            i += 1
+        self._pos = i
+        return items
+
+    @property
+    def text(self) -> str:
+        return self._buffer
@@ -0,0 +1,93 @@
+"""
+Basit sürümlü şema migration'ları.
+
+``create_all`` yalnızca eksik tabloları oluşturur; mevcut tablolara eklenen
+kolon ve index'ler için sıralı migration listesi kullanılır. Uygulanan sürümler
+``schema_migrations`` tablosunda tutulur, her migration bir kez çalışır.
+Kolon ve index migration'ları mevcut şemayı kontrol ettiğinden idempotenttir.
+"""
+from typing import Callable, List, Tuple
+import logging
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import func
+
+logger = logging.getLogger(__name__)
+
+Migration = Callable[[Connection], None]
+
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("version", String(100), primary_key=True),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def _create_model_indexes(*table_names: str) -> Migration:
+    """Modellerde ``__table_args__`` ile tanımlı index'leri mevcut tablolara ekle"""
+    def migrate(connection: Connection) -> None:
+        from app.database import Base
+
+        for table_name in table_names:
+            table = Base.metadata.tables[table_name]
+            for index in sorted(table.indexes, key=lambda ix: ix.name):
+                index.create(bind=connection, checkfirst=True)
+    return migrate
+
+
+def _add_model_columns(table_name: str, *column_names: str) -> Migration:
+    """Modelde tanımlı (nullable) kolonları mevcut tabloya ``ALTER TABLE`` ile ekle"""
+    def migrate(connection: Connection) -> None:
+        from app.database import Base
+
+        table = Base.metadata.tables[table_name]
+        existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+        for column_name in column_names:
+            if column_name in existing:
+                continue
+            column_type = table.c[column_name].type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+    return migrate
+
+
+def _chain(*migrations: Migration) -> Migration:
+    def migrate(connection: Connection) -> None:
+        for step in migrations:
+            step(connection)
+    return migrate
+
+
+MIGRATIONS: List[Tuple[str, Migration]] = [
+    (
+        "0001_exam_access_indexes",
+        _create_model_indexes("practice_exams", "practice_question_results", "exam_questions"),
+    ),
+    (
+        "0002_performance_analysis_practice_exam",
+        _chain(
+            _add_model_columns("performance_analyses", "practice_exam_id"),
+            _create_model_indexes("performance_analyses"),
+        ),
+    ),
+]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Uygulanmamış migration'ları sırayla çalıştır; uygulananların sürümlerini döndür"""
+    _migration_metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        applied = {row[0] for row in connection.execute(schema_migrations.select())}
+
+    executed = []
+    for version, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as connection:
+            migrate(connection)
+            connection.execute(schema_migrations.insert().values(version=version))
+        logger.info(f"Migration applied: {version}")
+        executed.append(version)
+    return executed
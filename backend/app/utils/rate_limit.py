@@ -0,0 +1,56 @@
+"""
+Harici API çağrıları için asyncio tabanlı token-bucket hız sınırlayıcı
+"""
+from typing import Optional
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """
+    Saniyede ``rate`` token üreten, en fazla ``capacity`` token biriktiren kova.
+    ``acquire()`` token yoksa bir sonraki token üretilene kadar bekler (bloklamadan).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self.waits = 0
+        self.total_wait = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Token al; beklenen süreyi (saniye) döndür"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        waited = 0.0
+        # Kilit sırayı korur: bekleyenler token'ları geliş sırasıyla alır
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= tokens
+        if waited:
+            self.waits += 1
+            self.total_wait += waited
+        return waited
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "waits": self.waits,
+            "total_wait_seconds": round(self.total_wait, 3),
+        }
@@ -0,0 +1,75 @@
+"""
+Yerel SQLite dosyası üzerinde basit, kalıcı key-value deposu
+"""
+from typing import Iterator, Optional, Tuple
+import re
+import sqlite3
+import threading
+import time
+
+
+class SQLiteKVStore:
+    """
+    Süreç yeniden başlasa da korunan cache katmanları için anahtar -> BLOB deposu.
+    Değerlerin serileştirilmesi çağıranın sorumluluğundadır.
+    """
+
+    def __init__(self, path: str, table: str = "kv"):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"Invalid table name: {table}")
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, created_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl if ttl is not None else None, now),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            return cursor.rowcount
+
+    def items(self) -> Iterator[Tuple[str, bytes]]:
+        """Süresi dolmamış tüm kayıtlar (anahtar sırasıyla)"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM {self.table} WHERE expires_at IS NULL OR expires_at > ? ORDER BY key",
+                (time.time(),),
+            ).fetchall()
+        return iter(rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
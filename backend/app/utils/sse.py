@@ -0,0 +1,83 @@
+"""
+Server-Sent Events yardımcıları.
+
+Uzun süren agent endpoint'leri ``(event, data)`` çiftleri üreten bir async
+iterator'ı ``sse_response`` ile akıtır. Akış her zaman ``done`` olayıyla biter;
+hata olursa önce ``error`` olayı gönderilir. Uzun sessizliklerde proxy'lerin
+bağlantıyı kapatmaması için yorum satırı (heartbeat) yazılır.
+"""
+from typing import Any, AsyncIterator, Optional, Tuple
+import asyncio
+import json
+import logging
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# timeout_middleware bu sonekle biten yolları kesmez
+STREAM_PATH_SUFFIX = "/stream"
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # nginx tamponlamasını kapat
+}
+
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in payload.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+_END = object()
+
+
+async def _encode(events: AsyncIterator[Tuple[str, Any]], heartbeat: float) -> AsyncIterator[str]:
+    # Üretici tek bir task içinde tüketilir (contextvar'lar olaylar arasında korunur);
+    # kuyruk beklemesi heartbeat aralığıyla sınırlanır
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def _pump() -> None:
+        try:
+            async for item in events:
+                await queue.put(item)
+        except Exception as e:
+            logger.error(f"SSE stream failed: {e}")
+            await queue.put(("error", {"status": "error", "error": str(e)}))
+        finally:
+            await queue.put(_END)
+
+    producer = asyncio.create_task(_pump())
+    event_id = 0
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item is _END:
+                break
+            event, data = item
+            event_id += 1
+            yield format_sse(event, data, event_id)
+        yield format_sse("done", {})
+    finally:
+        # İstemci bağlantıyı kestiyse üreticiyi de durdur
+        if not producer.done():
+            producer.cancel()
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]], heartbeat: float = 15.0) -> StreamingResponse:
+    """``(event, data)`` akışını text/event-stream yanıtına çevir"""
+    return StreamingResponse(
+        _encode(events, heartbeat),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
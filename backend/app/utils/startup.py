@@ -167,6 +167,22 @@ def create_sample_data():
     finally:
         db.close()
 
+def backfill_performance_rollups():
+    """
+    Fill performance_daily_rollups from existing analyses when it is empty
+    """
+    from app.services.performance_rollup_service import performance_rollup_service
+    
+    db = SessionLocal()
+    try:
+        result = performance_rollup_service.backfill_if_empty(db)
+        if result:
+            logger.info(f"Performance rollups backfilled: {result}")
+    except Exception as e:
+        logger.error(f"Performance rollup backfill failed: {str(e)}")
+    finally:
+        db.close()
+
 def initialize_application():
     """
     Initialize the application with default data
@@ -180,6 +196,9 @@ def initialize_application():
         # Create sample data
         create_sample_data()
         
+        # Backfill dashboard rollups if the table was just created
+        backfill_performance_rollups()
+        
         logger.info("Application initialization completed successfully")
         
     except Exception as e:
@@ -0,0 +1,20 @@
+"""
+Uygulama modülleri import edilirken oluşturulan global örneklerin (iş kuyruğu,
+cache'ler, indeksler) SQLite dosyaları çalışma dizini yerine geçici bir dizine yazılsın.
+Ayarlar modül import'unda okunduğundan ortam değişkenleri test modüllerinden önce atanır.
+"""
+import os
+import tempfile
+
+_STATE_DIR = tempfile.mkdtemp(prefix="eduai-tests-")
+
+for _name, _filename in (
+    ("JOB_QUEUE_PATH", "job_queue.db"),
+    ("MEMORY_WRITE_QUEUE_PATH", "memory_queue.db"),
+    ("EMBEDDING_CACHE_PATH", "embedding_cache.db"),
+    ("LLM_CACHE_PATH", "llm_cache.db"),
+    ("YOUTUBE_CACHE_PATH", "youtube_cache.db"),
+    ("INTENT_ROUTER_PATH", "intent_router.db"),
+    ("QUESTION_DEDUP_INDEX_PATH", "question_dedup.db"),
+):
+    os.environ.setdefault(_name, os.path.join(_STATE_DIR, _filename))
@@ -0,0 +1,58 @@
+import asyncio
+
+from app.agents import book_agent
+from app.agents.book_agent import BookAgent
+from app.models.book_recommendation import BookRecommendation, StockStatus
+
+PRODUCT_URL = "https://www.trendyol.com/yayinevi/tyt-matematik-soru-bankasi-p-123456"
+
+
+def _recommendation() -> BookRecommendation:
+    return BookRecommendation(
+        title="TYT Matematik Soru Bankası",
+        author="Yazar Adı",
+        publisher="Yayınevi",
+        description="Zayıf konular için bol soru içeren kaynak",
+        relevance_score=8,
+        book_type="Soru Bankası",
+        target_audience="Lise",
+        key_topics=["Problemler"],
+        stock_status=StockStatus.CHECK_REQUIRED,
+        stock_confidence=5,
+        url=PRODUCT_URL,
+        availability_note="Kontrol edilmedi",
+    )
+
+
+def test_stock_is_fetched_on_miss_and_served_from_cache_on_hit(monkeypatch):
+    calls = []
+
+    async def fake_fetch_text(url, max_bytes=None):
+        calls.append(url)
+        return "<html><body><button>Sepete Ekle</button></body></html>"
+
+    monkeypatch.setattr(book_agent.http_client, "fetch_text", fake_fetch_text)
+    book_agent._stock_cache.clear()
+    agent = BookAgent.model_construct()
+
+    first = asyncio.run(agent._update_stock_info([_recommendation()]))
+    assert calls == [PRODUCT_URL]
+    assert first[0].stock_status == StockStatus.AVAILABLE
+    assert first[0].stock_confidence == 8
+
+    second = asyncio.run(agent._update_stock_info([_recommendation()]))
+    assert calls == [PRODUCT_URL]
+    assert second[0].stock_status == StockStatus.AVAILABLE
+
+
+def test_fetch_error_is_not_cached(monkeypatch):
+    async def failing_fetch_text(url, max_bytes=None):
+        raise RuntimeError("network down")
+
+    monkeypatch.setattr(book_agent.http_client, "fetch_text", failing_fetch_text)
+    book_agent._stock_cache.clear()
+    agent = BookAgent.model_construct()
+
+    result = asyncio.run(agent._update_stock_info([_recommendation()]))
+    assert result[0].stock_status == StockStatus.CHECK_REQUIRED
+    assert len(book_agent._stock_cache) == 0
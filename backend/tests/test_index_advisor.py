@@ -0,0 +1,43 @@
+from app.utils.index_advisor import _candidate_columns, _covered, extract_access_columns, normalize_statement
+
+
+def test_extracts_equality_range_and_order_columns_by_table():
+    statement = normalize_statement(
+        "SELECT practice_exams.id FROM practice_exams "
+        "WHERE practice_exams.user_id = 5 AND practice_exams.status = 'completed' "
+        "ORDER BY practice_exams.created_at DESC LIMIT 10"
+    )
+
+    access = extract_access_columns(statement)
+
+    assert access["practice_exams"]["equality"] == ["user_id", "status"]
+    assert access["practice_exams"]["order"] == ["created_at"]
+    assert _candidate_columns(access["practice_exams"]) == ("user_id", "status", "created_at")
+
+
+def test_join_columns_resolve_aliases_and_only_drive_unfiltered_tables():
+    statement = normalize_statement(
+        "SELECT r.id FROM practice_question_results AS r "
+        "JOIN exam_questions AS q ON q.id = r.question_id "
+        "WHERE r.practice_exam_id = 3"
+    )
+
+    access = extract_access_columns(statement)
+
+    assert _candidate_columns(access["practice_question_results"]) == ("practice_exam_id",)
+    assert _candidate_columns(access["exam_questions"]) == ("id",)
+
+
+def test_shorter_index_does_not_cover_composite_candidate():
+    candidate = ("user_id", "status", "created_at")
+
+    assert not _covered(candidate, [("user_id",)])
+    assert not _covered(candidate, [("user_id", "status")])
+    assert not _covered(candidate, [("status", "user_id", "created_at")])
+
+
+def test_index_with_candidate_columns_as_prefix_covers_it():
+    assert _covered(("user_id", "status", "created_at"), [("user_id", "status", "created_at")])
+    assert _covered(("user_id", "status"), [("user_id", "status", "created_at")])
+    # Tablodaki index'lerden birinin karşılaması yeterli
+    assert _covered(("user_id", "status"), [("user_id",), ("user_id", "status")])
@@ -0,0 +1,44 @@
+import pytest
+
+from app.services.intent_router import IntentRouter, NaiveBayesIntentModel, normalize_query
+
+
+@pytest.fixture
+def router() -> IntentRouter:
+    return IntentRouter(store_path=None)
+
+
+@pytest.mark.parametrize("query", ["merhaba", "selam", "günaydın", "iyi akşamlar", "teşekkürler", "nasılsın"])
+def test_greetings_are_left_to_the_llm(router, query):
+    assert router.classify(query)[0] is None
+
+
+@pytest.mark.parametrize("query", [
+    "hava bugün nasıl",
+    "bugün ne yapsam",
+    "how are you",
+    "what is the capital of france",
+])
+def test_off_topic_queries_are_left_to_the_llm(router, query):
+    assert router.classify(query)[0] is None
+
+
+@pytest.mark.parametrize("query", ["merhaba", "selam"])
+def test_single_char_ngram_match_is_not_evidence(router, query):
+    assert router.model.predict(normalize_query(query)) == (None, 0.0)
+
+
+def test_model_predicts_learned_phrasing():
+    model = NaiveBayesIntentModel()
+    for _ in range(3):
+        model.learn("zayıf olduğum konular neler", "analysis")
+        model.learn("bana matematikten 5 soru hazırla", "question")
+    label, confidence = model.predict("zayıf olduğum konular neler")
+    assert label == "analysis"
+    assert confidence > 0.9
+
+
+def test_keyword_rules_route_clear_requests(router):
+    agent, confidence, source = router.classify("kimya videosu öner")
+    assert (agent, source) == ("youtube", "rules")
+    assert confidence >= router.min_confidence
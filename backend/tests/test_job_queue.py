@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.services.job_queue import JobQueue
+
+
+@pytest.fixture
+def queue_path(tmp_path) -> str:
+    return str(tmp_path / "jobs.db")
+
+
+def _next_attempt_at(queue: JobQueue, job_id: int) -> float:
+    return queue._conn.execute("SELECT next_attempt_at FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+
+
+def test_same_idempotency_key_returns_existing_job(queue_path):
+    queue = JobQueue(path=queue_path)
+
+    first = queue.enqueue("analysis", {"exam_id": 1}, idempotency_key="exam-analysis:1")
+    second = queue.enqueue("analysis", {"exam_id": 1}, idempotency_key="exam-analysis:1")
+    other = queue.enqueue("analysis", {"exam_id": 2}, idempotency_key="exam-analysis:2")
+
+    assert second["id"] == first["id"]
+    assert other["id"] != first["id"]
+    assert queue.stats()["pending"] == 2
+
+
+def test_completed_job_is_not_run_again_for_same_key(queue_path):
+    queue = JobQueue(path=queue_path)
+    calls = []
+
+    async def handler(payload):
+        calls.append(payload)
+        return {"ok": True}
+
+    queue.register("analysis", handler)
+    job = queue.enqueue("analysis", {"exam_id": 1}, idempotency_key="exam-analysis:1")
+    assert asyncio.run(queue.run_next()) is True
+
+    again = queue.enqueue("analysis", {"exam_id": 1}, idempotency_key="exam-analysis:1")
+    assert again["id"] == job["id"]
+    assert again["status"] == "done"
+    assert again["result"] == {"ok": True}
+    assert asyncio.run(queue.run_next()) is False
+    assert len(calls) == 1
+
+
+def test_failed_job_backs_off_then_fails_permanently(queue_path):
+    queue = JobQueue(path=queue_path, max_attempts=2, retry_base_delay=10.0)
+
+    async def handler(payload):
+        raise RuntimeError("agent unavailable")
+
+    queue.register("analysis", handler)
+    job = queue.enqueue("analysis", {"exam_id": 1})
+
+    assert asyncio.run(queue.run_next()) is True
+    retried = queue.get(job["id"])
+    assert retried["status"] == "pending"
+    assert retried["attempts"] == 1
+    assert retried["error"] == "agent unavailable"
+    # Backoff süresi dolmadan tekrar alınmaz
+    assert _next_attempt_at(queue, job["id"]) >= retried["updated_at"] + 10.0
+    assert asyncio.run(queue.run_next()) is False
+
+    queue._conn.execute("UPDATE jobs SET next_attempt_at = 0 WHERE id = ?", (job["id"],))
+    assert asyncio.run(queue.run_next()) is True
+    failed = queue.get(job["id"])
+    assert failed["status"] == "failed"
+    assert failed["attempts"] == 2
+    assert queue.stats()["failed_permanently"] == 1
+
+    assert queue.retry(job["id"]) is True
+    assert queue.get(job["id"])["status"] == "pending"
+
+
+def test_interrupted_job_is_requeued_on_restart(queue_path):
+    queue = JobQueue(path=queue_path)
+    queue.register("analysis", lambda payload: None)
+    job = queue.enqueue("analysis", {"exam_id": 1}, idempotency_key="exam-analysis:1")
+
+    # Worker işi aldı ve süreç handler bitmeden öldü
+    assert queue._claim()["id"] == job["id"]
+    assert queue.get(job["id"])["status"] == "processing"
+
+    restarted = JobQueue(path=queue_path)
+    assert restarted.get(job["id"])["status"] == "pending"
+
+    async def handler(payload):
+        return {"exam_id": payload["exam_id"]}
+
+    restarted.register("analysis", handler)
+    assert asyncio.run(restarted.run_next()) is True
+    done = restarted.get(job["id"])
+    assert done["status"] == "done"
+    assert done["result"] == {"exam_id": 1}
@@ -148,8 +148,14 @@ const PracticeExamResultsPage: React.FC = () => {
       updateProgress('processing', 35);
       await new Promise(resolve => setTimeout(resolve, 1000));
       
-      // Start actual analysis
-      const analysisResponse = await examService.getExamAnalysis(parseInt(examId!), user.id);
+      // Analysis runs as a background job after submit; fall back to on-demand analysis if there is none
+      let analysisResponse: { status: string; data?: any } = { status: 'error' };
+      const jobData = await examService.waitForExamAnalysis(parseInt(examId!));
+      if (jobData) {
+        analysisResponse = { status: 'success', data: jobData };
+      } else {
+        analysisResponse = await examService.getExamAnalysis(parseInt(examId!), user.id);
+      }
       
       updateProgress('processing', 50);
 
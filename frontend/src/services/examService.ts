@@ -126,7 +126,8 @@ class ExamService {
     total_questions: number;
     results: any;
     analysis?: any; // Analiz sonuçları
-    analysis_status?: string;
+    analysis_status?: string; // pending | processing | done | failed | error
+    analysis_job_id?: number;
     analysis_error?: string;
     youtube_recommendations?: any; // YouTube önerileri
     youtube_status?: string;
@@ -180,6 +181,42 @@ class ExamService {
     return response.data;
   }
 
+  // Get background analysis job status (analysis runs once per exam after submit)
+  async getExamAnalysisStatus(examId: number): Promise<{
+    exam_id: number;
+    job_id: number;
+    status: 'pending' | 'processing' | 'done' | 'failed';
+    attempts: number;
+    data?: any;
+    error?: string;
+  } | null> {
+    try {
+      const response = await apiClient.get(`${this.baseUrl}/practice-exam/${examId}/analysis`);
+      return response.data;
+    } catch (err: any) {
+      if (err?.status === 404) {
+        return null;
+      }
+      throw err;
+    }
+  }
+
+  // Wait for the background analysis job; resolves with the analysis data or null
+  async waitForExamAnalysis(examId: number, intervalMs: number = 2000, timeoutMs: number = 180000): Promise<any | null> {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+      const job = await this.getExamAnalysisStatus(examId);
+      if (!job || job.status === 'failed') {
+        return null;
+      }
+      if (job.status === 'done') {
+        return job.data ?? null;
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    return null;
+  }
+
   // Get exam analysis (separate endpoint)
   async getExamAnalysis(examId: number, userId?: number): Promise<{
     status: string;